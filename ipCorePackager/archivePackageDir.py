@@ -0,0 +1,208 @@
+"""
+Writing of IP-core package directly to zip/tar archive streamed to a file object
+"""
+from contextlib import contextmanager
+import gzip
+import io
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import time
+from typing import BinaryIO, Callable, ContextManager, Dict, List, Optional, \
+    TextIO
+import zipfile
+
+from ipCorePackager.packageDir import PackageDir
+
+
+# permissions of all files in archive
+_FILE_MODE = 0o644
+# content of tar entries larger than this is spooled to a temporary file
+# (tar header has to contain the size of the file)
+_TAR_SPOOL_SIZE = 16 << 20
+# the oldest time which can be stored in zip
+_ZIP_MIN_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class ARCHIVE_FORMAT:
+    ZIP = "zip"
+    TAR = "tar"
+    TAR_GZ = "tar.gz"
+
+
+class _ZipArchiveWriter():
+    """
+    Writes entries to zip archive (entries are deflated)
+
+    :ivar ~.sizes: entry name -> size of uncompressed content
+    """
+
+    def __init__(self, fileObj: BinaryIO, mtime: int):
+        self._zip = zipfile.ZipFile(fileObj, "w", zipfile.ZIP_DEFLATED)
+        self._dateTime = max(tuple(time.gmtime(mtime)[:6]), _ZIP_MIN_DATE_TIME)
+        self.sizes: Dict[str, int] = {}
+
+    def _info(self, name: str) -> zipfile.ZipInfo:
+        i = zipfile.ZipInfo(name, self._dateTime)
+        i.compress_type = zipfile.ZIP_DEFLATED
+        # unix, so the permissions are stored and do not depend on current platform
+        i.create_system = 3
+        i.external_attr = (0o100000 | _FILE_MODE) << 16
+        return i
+
+    @contextmanager
+    def openEntry(self, name: str):
+        i = self._info(name)
+        with self._zip.open(i, "w") as f:
+            yield f
+        self.sizes[name] = i.file_size
+
+    def addFile(self, name: str, src: str):
+        with open(src, "rb") as fIn, self.openEntry(name) as fOut:
+            shutil.copyfileobj(fIn, fOut)
+
+    def close(self):
+        self._zip.close()
+
+
+class _TarArchiveWriter():
+    """
+    Writes entries to tar stream (optionally gzip compressed),
+    the entries are owned by root and they have the same modification time
+
+    :ivar ~.sizes: entry name -> size of content
+    """
+
+    def __init__(self, fileObj: BinaryIO, mtime: int, compress: bool):
+        self._gz = None
+        if compress:
+            # mtime and the name of the file would be stored in gzip header otherwise
+            fileObj = self._gz = gzip.GzipFile(
+                filename="", mode="wb", fileobj=fileObj, mtime=mtime)
+        self._tar = tarfile.open(fileobj=fileObj, mode="w|", format=tarfile.PAX_FORMAT)
+        self._mtime = mtime
+        self.sizes: Dict[str, int] = {}
+
+    def _info(self, name: str, size: int) -> tarfile.TarInfo:
+        i = tarfile.TarInfo(name)
+        i.size = size
+        i.mtime = self._mtime
+        i.mode = _FILE_MODE
+        i.uid = i.gid = 0
+        i.uname = i.gname = ""
+        return i
+
+    @contextmanager
+    def openEntry(self, name: str):
+        with tempfile.SpooledTemporaryFile(_TAR_SPOOL_SIZE) as buff:
+            yield buff
+            size = buff.tell()
+            buff.seek(0)
+            self._tar.addfile(self._info(name, size), buff)
+        self.sizes[name] = size
+
+    def addFile(self, name: str, src: str):
+        size = os.path.getsize(src)
+        with open(src, "rb") as f:
+            self._tar.addfile(self._info(name, size), f)
+        self.sizes[name] = size
+
+    def close(self):
+        self._tar.close()
+        if self._gz is not None:
+            self._gz.close()
+
+
+class ArchivePackageDir(PackageDir):
+    """
+    :class:`~.PackageDir` which writes the files as entries of zip/tar archive
+    streamed to a file object, nothing is written to the file system
+    (except HDL files of the packagers which do not implement
+    :meth:`ipCorePackager.packager.IpCorePackager.toHdlConversionStream`)
+
+    The entries are named "<root>/<path in package>" and all of them have the same
+    modification time and permissions, the archive depends only on the content
+    and on the order of the files.
+
+    :note: The entries are written one after another (the lock is held while
+        the entry is written), the files should not be written from multiple threads
+        as the order of the entries would not be deterministic.
+    :note: The file object is not closed, the archive is complete after :meth:`~.finish`.
+
+    :ivar ~.root: name of the directory in archive (the paths of the files in package
+        returned by :meth:`~.path` are relative to the current working directory
+        but there is nothing in file system)
+    """
+
+    def __init__(self, root: str, fileObj: BinaryIO,
+                 format: str=ARCHIVE_FORMAT.ZIP, mtime: int=0):
+        """
+        :param root: name of the directory in archive
+        :param fileObj: writable binary stream where the archive is written
+            (it does not have to be seekable)
+        :param format: :class:`~.ARCHIVE_FORMAT`
+        :param mtime: modification time of the entries (seconds since epoch)
+        """
+        super(ArchivePackageDir, self).__init__(root)
+        if format == ARCHIVE_FORMAT.ZIP:
+            self._writer = _ZipArchiveWriter(fileObj, mtime)
+        elif format in (ARCHIVE_FORMAT.TAR, ARCHIVE_FORMAT.TAR_GZ):
+            self._writer = _TarArchiveWriter(fileObj, mtime, format == ARCHIVE_FORMAT.TAR_GZ)
+        else:
+            raise ValueError("Unknown archive format", format)
+        self.format = format
+
+    def entryName(self, relPath: str) -> str:
+        """
+        :return: name of the archive entry for the file in package
+        """
+        return posixpath.normpath(self.path(relPath).replace(os.sep, "/"))
+
+    def prepare(self):
+        pass
+
+    @contextmanager
+    def openText(self, relPath: str):
+        with self._lock, self._writer.openEntry(self.entryName(relPath)) as f:
+            # no newline translation, the content does not depend on the platform
+            t = io.TextIOWrapper(f, encoding="utf-8", newline="")
+            yield t
+            t.flush()
+            t.detach()
+
+    def placeFile(self, src: str, relPath: str):
+        """
+        Copy the content of the file to archive (the file placement method is not used)
+        """
+        with self._lock:
+            self._writer.addFile(self.entryName(relPath), src)
+
+    def fileSize(self, relPath: str) -> int:
+        return self._writer.sizes[self.entryName(relPath)]
+
+    def convertHdl(self, conversionFn: Callable[[str], List[str]],
+                   relDir: str, designFingerprint: Optional[str],
+                   streamConversionFn: Optional[Callable[
+                       [Callable[[str], ContextManager[TextIO]]], List[str]]]=None
+                   ) -> List[str]:
+        if streamConversionFn is not None:
+            files = streamConversionFn(
+                lambda fileName: self.openText(os.path.join(relDir, fileName)))
+            return [self.path(os.path.join(relDir, f)) for f in files]
+
+        # the conversion can write only to file system
+        staging = tempfile.mkdtemp(prefix="ipCorePackager_")
+        try:
+            res = []
+            for f in conversionFn(staging):
+                relPath = os.path.join(relDir, os.path.relpath(f, staging))
+                self.placeFile(f, relPath)
+                res.append(self.path(relPath))
+            return res
+        finally:
+            shutil.rmtree(staging)
+
+    def finish(self):
+        self._writer.close()
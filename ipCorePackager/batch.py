@@ -0,0 +1,189 @@
+"""
+Packaging of many IP-cores in parallel
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import os
+from time import perf_counter
+import traceback
+from typing import Callable, List, Optional, Sequence, Union
+
+from ipCorePackager.packager import IpCorePackager
+
+
+class PackagingJob():
+    """
+    Specification of IP-core which should be packaged
+
+    :ivar ~.packager: :class:`ipCorePackager.packager.IpCorePackager` instance
+        or picklable callable without arguments which returns it
+        (the callable is evaluated in the worker, this allows to build
+        the design in parallel and to avoid pickling of the design)
+    :ivar ~.name: name of IP-core, if specified it overrides the name of the packager,
+        it is required if the packager is specified by a callable
+    :ivar ~.vendor: vendor name of IP-Core
+    :ivar ~.library: library name of IP-Core
+    :ivar ~.description: description of IP-Core
+    """
+    __slots__ = ["packager", "name", "vendor", "library", "description"]
+
+    def __init__(self, packager: Union[IpCorePackager, Callable[[], IpCorePackager]],
+                 name: Optional[str]=None, vendor: str="hwt", library: str="mylib",
+                 description: Optional[str]=None):
+        if name is None and not isinstance(packager, IpCorePackager):
+            raise ValueError("Name has to be specified for a job with the packager"
+                             " specified by a callable", packager)
+        self.packager = packager
+        self.name = name
+        self.vendor = vendor
+        self.library = library
+        self.description = description
+
+    def getName(self) -> str:
+        if self.name is not None:
+            return self.name
+        else:
+            return self.packager.name
+
+    def __getstate__(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self.getName()}>"
+
+
+class PackagingResult():
+    """
+    :ivar ~.job: job which this result belongs to
+    :ivar ~.name: name of IP-core
+    :ivar ~.ipDir: directory of the IP-core package
+    :ivar ~.hdlFiles: HDL files in package (in compile order)
+    :ivar ~.error: None or string with formatted traceback of the exception
+        which occurred during the packaging
+    :ivar ~.elapsed: time spent on this job in seconds
+    """
+    __slots__ = ["job", "name", "ipDir", "hdlFiles", "error", "elapsed"]
+
+    def __init__(self, job: PackagingJob, name: str):
+        self.job = job
+        self.name = name
+        self.ipDir = None
+        self.hdlFiles = []
+        self.error = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __getstate__(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def __repr__(self):
+        status = "ok" if self.ok else "error"
+        return f"<{self.__class__.__name__:s} {self.name} {status:s}>"
+
+
+def runPackagingJob(job: PackagingJob, repoDir: str, **createPackageKwargs) -> PackagingResult:
+    """
+    Package a single IP-core, exceptions are not raised but stored in the result
+    """
+    start = perf_counter()
+    res = PackagingResult(job, job.getName())
+    try:
+        p = job.packager
+        if not isinstance(p, IpCorePackager):
+            p = p()
+        run = p.createPackage(repoDir, vendor=job.vendor, library=job.library,
+                              description=job.description, name=job.name,
+                              **createPackageKwargs)
+        res.ipDir = os.path.join(repoDir, run.name)
+        res.hdlFiles = list(run.hdlFiles)
+    except Exception:
+        res.error = traceback.format_exc()
+    res.elapsed = perf_counter() - start
+    # do not send the design back from the worker
+    res.job = None
+    return res
+
+
+def packageBatch(jobs: Sequence[PackagingJob], repoDir: str,
+                 executor: Optional[Executor]=None, maxWorkers: Optional[int]=None,
+                 **createPackageKwargs) -> List[PackagingResult]:
+    """
+    Package many IP-cores in parallel into the same repository directory
+
+    Each job is packaged by :meth:`ipCorePackager.packager.IpCorePackager.createPackage`
+    in a worker of a process pool (the output is the same as for serial packaging).
+    Jobs with a name which is already used by some previous job are not executed
+    and an error is reported for them, because they would write into the same directory.
+
+    :param jobs: jobs to execute
+    :param repoDir: directory where IP-cores should be stored
+    :param executor: optional executor to use instead of a new process pool
+    :param maxWorkers: number of workers of a process pool if the executor is not specified
+    :param createPackageKwargs: additional arguments for createPackage
+    :return: list of results in the order of jobs
+    """
+    os.makedirs(repoDir, exist_ok=True)
+    results: List[Optional[PackagingResult]] = [None for _ in jobs]
+    usedNames = {}
+    ownExecutor = executor is None
+    if ownExecutor:
+        executor = ProcessPoolExecutor(max_workers=maxWorkers)
+
+    try:
+        futures = []
+        for i, job in enumerate(jobs):
+            name = job.getName()
+            prev = usedNames.setdefault(name, i)
+            if prev != i:
+                res = PackagingResult(job, name)
+                res.error = (f"IP-core with name {name:s} is already packaged by job {prev:d}"
+                             " (both jobs would write to the same directory)")
+                results[i] = res
+                continue
+            futures.append((i, executor.submit(runPackagingJob, job, repoDir,
+                                               **createPackageKwargs)))
+
+        for i, f in futures:
+            try:
+                res = f.result()
+            except Exception:
+                # job or result could not be transferred
+                res = PackagingResult(jobs[i], jobs[i].getName())
+                res.error = traceback.format_exc()
+            res.job = jobs[i]
+            results[i] = res
+    finally:
+        if ownExecutor:
+            executor.shutdown()
+
+    return results
+
+
+def packageBatchInThreads(jobs: Sequence[PackagingJob], repoDir: str,
+                          maxWorkers: Optional[int]=None,
+                          **createPackageKwargs) -> List[PackagingResult]:
+    """
+    Same as :func:`~.packageBatch` but the jobs are packaged by a pool of threads
+    in this process (e.g. in a long-running build server), the designs
+    and packagers are not pickled
+
+    The packaging does not modify the packagers or the designs
+    (:see: :class:`ipCorePackager.packager.PackagingRun`), the jobs may share the design,
+    but the methods of the packagers have to be thread safe. The threads run
+    concurrently only while they do not hold the GIL (file I/O, HDL conversion
+    by external tools, ...), use :func:`~.packageBatch` for CPU bound packaging.
+
+    :param maxWorkers: number of threads
+    """
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        return packageBatch(jobs, repoDir, executor=executor, **createPackageKwargs)
@@ -1,8 +1,76 @@
+from threading import Lock
+from typing import Callable, Dict, Union
+from weakref import WeakKeyDictionary
+
 from ipCorePackager.constants import INTF_DIRECTION
-from ipCorePackager.helpers import appendSpiElem, mkSpiElm
+from ipCorePackager.helpers import appendSpiElem, elmText, findS, mkSpiElm
+from ipCorePackager.hwIOTree import iterHwIOLeafs
+from ipCorePackager.otherXmlObjs import Parameter
+from ipCorePackager.type import Type
+
+
+class BusInterfaceTemplate():
+    """
+    Part of the bus interface which depends only on the IntfIpMeta class,
+    it is computed once per class by :meth:`~.forBiClass`
+
+    :ivar ~.abstractionType: :class:`ipCorePackager.type.Type` of the abstraction
+        type ("<bus type name>_rtl"), shared by all bus interfaces of this class
+    :ivar ~.map: logical map of the class
+        (:attr:`ipCorePackager.intfIpMeta.IntfIpMeta.map` format)
+    """
+    __slots__ = ["abstractionType", "map"]
+
+    # IntfIpMeta class -> BusInterfaceTemplate
+    _cache = WeakKeyDictionary()
+    _cacheLock = Lock()
+
+    def __init__(self, biType: "IntfIpMeta"):
+        at = self.abstractionType = Type()
+        at.name = biType.name + "_rtl"
+        at.version = biType.version
+        at.vendor = biType.vendor
+        at.library = biType.library
+        self.map: Union[str, Dict] = biType.map
+
+    @classmethod
+    def forBiClass(cls, biClass: Callable[[], "IntfIpMeta"]) -> "BusInterfaceTemplate":
+        """
+        :param biClass: IntfIpMeta class (or other factory of IntfIpMeta
+            which returns the same metadata on each call)
+        :return: cached template for the class
+        """
+        try:
+            t = cls._cache.get(biClass, None)
+        except TypeError:
+            # the factory is not hashable or weakly referencable, can not be cached
+            return cls(biClass())
+        if t is None:
+            t = cls(biClass())
+            with cls._cacheLock:
+                t = cls._cache.setdefault(biClass, t)
+        return t
+
+    def portMap(self, intf: "HwIO", packager: "IpCorePackager") -> Dict[str, str]:
+        """
+        :return: dictionary logical name -> physical name
+        """
+        return _portMap(self.map, intf, packager)
+
+
+def _portMap(nameMap: Union[str, Dict], intf: "HwIO",
+             packager: "IpCorePackager") -> Dict[str, str]:
+    # only logical names and HDL names are resolved for the leafs
+    return {
+        leaf.logicalName: leaf.hwIO._getHdlName()
+        for leaf in iterHwIOLeafs(intf, packager, nameMap, onlyExtern=True,
+                                  resolvePorts=False)
+    }
 
 
 class BusInterface():
+    __slots__ = ["name", "busType", "abstractionType", "isMaster", "_portMaps",
+                 "parameters", "endianness"]
 
     def __init__(self):
         self.name = None
@@ -14,66 +82,68 @@ class BusInterface():
         self.parameters = []
         self.endianness = None
 
-    # @classmethod
-    # def fromElem(cls, elm):
-    #    self = cls()
-    #    self.name = elm.find('spirit:name', ns).text
-    #    self.busType = Type.fromElem(elm.find('spirit:busType', ns))
-    #    self.abstractionType = Type.fromElem(elm.find('spirit:abstractionType', ns))
-    #    if elm.find('spirit:master', ns) is not None:
-    #        self.isMaster = True
-    #    elif elm.find('spirit:slave', ns) is not None:
-    #        self.isMaster = False
-    #    else:
-    #        raise Exception("buss missing master/slave specification")
-    #    self._portMaps = []
-    #    for m in elm.find('spirit:_portMaps', ns):
-    #        pm = PortMap.fromElem(m)
-    #        self._portMaps.append(pm)
-    #
-    #    self.parameters = []
-    #    for p in elm.find('spirit:parameters', ns):
-    #        p_obj = Parameter.fromElem(p)
-    #        self.parameters.append(p_obj)
-    #
-    #    return self
+    @classmethod
+    def fromElem(cls, elm):
+        """
+        :note: bus and abstraction types are loaded as :class:`ipCorePackager.type.Type`
+        """
+        self = cls()
+        self.name = elmText(findS(elm, 'name'))
+        self.busType = Type.fromElem(findS(elm, 'busType'))
+        at = findS(elm, 'abstractionType')
+        if at is not None:
+            self.abstractionType = Type.fromElem(at)
+        if findS(elm, 'master') is not None:
+            self.isMaster = True
+        elif findS(elm, 'slave') is not None:
+            self.isMaster = False
+        else:
+            raise ValueError("Bus interface is missing master/slave specification",
+                             self.name)
+
+        portMaps = findS(elm, 'portMaps')
+        if portMaps is not None:
+            for m in portMaps:
+                lName = elmText(findS(findS(m, 'logicalPort'), 'name'))
+                pName = elmText(findS(findS(m, 'physicalPort'), 'name'))
+                self._portMaps[lName] = pName
+
+        e = findS(elm, 'endianness')
+        if e is not None:
+            self.endianness = elmText(e)
+
+        params = findS(elm, 'parameters')
+        if params is not None:
+            self.parameters = [Parameter.fromElem(p) for p in params]
+
+        return self
 
     @staticmethod
     def generatePortMap(biType, intf, packager: "IpCorePackager"):
-
-        def processIntf(mapDict, intf):
-            if not intf._hwIOs:
-                assert(isinstance(mapDict, str))
-                return {mapDict: intf._getHdlName()}
-            else:
-                d = {}
-                logicName = packager.getInterfaceLogicalName
-                for i in intf._hwIOs:
-                    if i._isExtern:
-                        n = logicName(i)
-                        try:
-                            m = mapDict[n]
-                        except KeyError:
-                            raise Exception(
-                                "Interface %s has interface %s which is not defined in ipcore interface class"
-                                % (packager.getObjDebugName(intf), n)
-                            )
-
-                        d.update(processIntf(m, i))
-                return d
-
-        return processIntf(biType.map, intf)
+        """
+        :return: dictionary logical name -> physical name
+        """
+        return _portMap(biType.map, intf, packager)
 
     @classmethod
-    def fromBiClass(cls, intf, biClass, packager: "IpCorePackager"):
+    def fromBiClass(cls, intf, biClass, packager: "IpCorePackager",
+                    withPortMap: bool=True):
+        """
+        :param withPortMap: if False the port map is left empty
+            (it can be filled later from :class:`~.BusInterfaceTemplate`)
+        :note: the abstraction type and the logical map are taken from
+            :class:`~.BusInterfaceTemplate` of the biClass, only the bus type
+            (which collects the parameters of this interface) is instantiated
+        """
         self = BusInterface()
+        template = BusInterfaceTemplate.forBiClass(biClass)
         biType = biClass()
         self.name = packager.getInterfaceLogicalName(intf)
         self.busType = biType
-        self.abstractionType = biClass()
-        self.abstractionType.name += "_rtl"
+        self.abstractionType = template.abstractionType
         self.isMaster = intf._direction == INTF_DIRECTION.MASTER
-        self._portMaps = BusInterface.generatePortMap(biType, intf, packager)
+        if withPortMap:
+            self._portMaps = template.portMap(intf, packager)
         self.parameters = biType.parameters
         return self
 
@@ -91,7 +161,8 @@ class BusInterface():
 
         appendSpiElem(e, 'name').text = self.name
         e.append(self.busType.asElem('busType'))
-        e.append(self.abstractionType.asElem('abstractionType'))
+        if self.abstractionType is not None:
+            e.append(self.abstractionType.asElem('abstractionType'))
         if self.isMaster:
             appendSpiElem(e, "master")
         else:
@@ -0,0 +1,291 @@
+"""
+Persistent index of IP-cores in IP repository directory
+
+The catalog stores the identification of each core (vendor, library, name, version),
+types of its bus interfaces and the number of ports in a compact JSON file
+in the repository. The update of the catalog parses only component.xml files
+which were added or modified since the last update (detected by size and mtime,
+confirmed by content digest).
+"""
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from ipCorePackager.ipXactLoader import iterComponentFiles, loadComponent
+from ipCorePackager.packageDir import FileRecord
+import xml.etree.ElementTree as etree
+
+
+CATALOG_FILE_NAME = ".ipCorePackager_catalog.json"
+# version of the format of the catalog file, if it changes the catalog is rebuilt
+CATALOG_FORMAT = 1
+
+
+def vlnv(vendor: str, library: str, name: str, version: str) -> str:
+    """
+    :return: "vendor:library:name:version" identifier
+    """
+    return f"{vendor:s}:{library:s}:{name:s}:{version:s}"
+
+
+class CatalogEntry():
+    """
+    Record about single IP-core in :class:`~.IpCatalog`
+
+    :ivar ~.path: path of the component.xml relative to the repository
+        (with "/" separators)
+    :ivar ~.file: :class:`ipCorePackager.packageDir.FileRecord` of the component.xml
+    :ivar ~.busTypes: tuple of VLNV of the bus types of bus interfaces (:func:`~.vlnv`)
+    :ivar ~.portCount: number of ports
+    :ivar ~.error: message if the component.xml could not be loaded
+        (other properties are then empty)
+    """
+    __slots__ = ["path", "file", "vendor", "library", "name", "version",
+                 "busTypes", "portCount", "error"]
+
+    def __init__(self, path: str, file: FileRecord,
+                 vendor: str="", library: str="", name: str="", version: str="",
+                 busTypes: Tuple[str, ...]=(), portCount: int=0,
+                 error: Optional[str]=None):
+        self.path = path
+        self.file = file
+        self.vendor = vendor
+        self.library = library
+        self.name = name
+        self.version = version
+        self.busTypes = busTypes
+        self.portCount = portCount
+        self.error = error
+
+    @classmethod
+    def fromComponent(cls, path: str, file: FileRecord, c: "Component"):
+        busTypes = []
+        for bi in c._busInterfaceObjs():
+            t = bi.busType
+            busTypes.append(vlnv(t.vendor, t.library, t.name, t.version))
+        return cls(path, file, c.vendor, c.library, c.name, c.version,
+                   tuple(busTypes), len(c.model.ports))
+
+    @property
+    def vlnv(self) -> str:
+        return vlnv(self.vendor, self.library, self.name, self.version)
+
+    def toJson(self):
+        return [self.file.toJson(), self.vendor, self.library, self.name, self.version,
+                self.busTypes, self.portCount, self.error]
+
+    @classmethod
+    def fromJson(cls, path: str, v):
+        f, vendor, library, name, version, busTypes, portCount, error = v
+        return cls(path, FileRecord.fromJson(f), vendor, library, name, version,
+                   tuple(busTypes), portCount, error)
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"<{self.__class__.__name__:s} {self.path:s} error: {self.error:s}>"
+        return f"<{self.__class__.__name__:s} {self.path:s} {self.vlnv:s}>"
+
+
+class CatalogChanges():
+    """
+    Result of :meth:`IpCatalog.update`
+
+    :ivar ~.added: paths of new components
+    :ivar ~.updated: paths of components which content changed
+    :ivar ~.removed: paths of components which do not exist anymore
+    :ivar ~.unchanged: number of components which were not parsed
+    """
+    __slots__ = ["added", "updated", "removed", "unchanged"]
+
+    def __init__(self):
+        self.added: List[str] = []
+        self.updated: List[str] = []
+        self.removed: List[str] = []
+        self.unchanged = 0
+
+    def __bool__(self):
+        return bool(self.added or self.updated or self.removed)
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__:s} added:{len(self.added):d}"
+                f" updated:{len(self.updated):d} removed:{len(self.removed):d}"
+                f" unchanged:{self.unchanged:d}>")
+
+
+class IpCatalog():
+    """
+    Index of IP-cores (component.xml files) in repository directory
+    stored in :data:`~.CATALOG_FILE_NAME` file in the repository
+
+    .. code-block:: python
+
+        cat = IpCatalog(repoDir)
+        cat.update()  # parses only new/modified components and saves the catalog
+        cat.find(busType="xilinx.com:interface:aximm:1.0")
+
+    :ivar ~.repoDir: path of the repository
+    :ivar ~.catalogFile: path of the file with the catalog
+    :ivar ~.entries: path relative to repository -> :class:`~.CatalogEntry`
+    """
+
+    def __init__(self, repoDir: str, catalogFile: Optional[str]=None):
+        """
+        :param catalogFile: path of the catalog file,
+            default is :data:`~.CATALOG_FILE_NAME` in the repository
+        """
+        self.repoDir = repoDir
+        if catalogFile is None:
+            catalogFile = os.path.join(repoDir, CATALOG_FILE_NAME)
+        self.catalogFile = catalogFile
+        self.entries: Dict[str, CatalogEntry] = {}
+        # property name -> value -> paths of entries
+        self._index: Optional[Dict[str, Dict[str, Set[str]]]] = None
+        self.load()
+
+    def load(self) -> bool:
+        """
+        Load the catalog from :attr:`~.catalogFile`
+
+        :return: True if the catalog was loaded, False if the file does not exist
+            or is not valid (the catalog is then empty)
+        """
+        self.entries = {}
+        self._index = None
+        try:
+            with open(self.catalogFile) as f:
+                d = json.load(f)
+            if d["format"] != CATALOG_FORMAT:
+                return False
+            self.entries = {p: CatalogEntry.fromJson(p, v) for p, v in d["entries"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            self.entries = {}
+            return False
+        return True
+
+    def save(self):
+        d = {
+            "format": CATALOG_FORMAT,
+            "entries": {p: e.toJson() for p, e in sorted(self.entries.items())},
+        }
+        tmp = self.catalogFile + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(d, f, separators=(",", ":"))
+        os.replace(tmp, self.catalogFile)
+
+    def _loadEntry(self, path: str, fileName: str, file: FileRecord) -> CatalogEntry:
+        try:
+            c = loadComponent(fileName)
+        except (ValueError, KeyError, AttributeError, etree.ParseError) as e:
+            return CatalogEntry(path, file, error=f"{e.__class__.__name__:s}: {e}")
+        return CatalogEntry.fromComponent(path, file, c)
+
+    def update(self, save: bool=True,
+               onError: Optional[Callable[[str, str], None]]=None) -> CatalogChanges:
+        """
+        Scan the repository and update the catalog, only component.xml files
+        which size or mtime changed are read and only the files which content
+        changed are parsed
+
+        :param save: if True the catalog is saved if anything changed
+        :param onError: function(path, message) called for each new/modified
+            component which could not be loaded (it is kept in the catalog
+            with the error and it is not parsed again until it changes)
+        """
+        changes = CatalogChanges()
+        old = self.entries
+        entries = {}
+        statChanged = False
+        for fileName in iterComponentFiles(self.repoDir):
+            path = os.path.relpath(fileName, self.repoDir).replace(os.sep, "/")
+            e = old.get(path, None)
+            if e is not None and e.file.isValidFor(fileName):
+                entries[path] = e
+                changes.unchanged += 1
+                continue
+
+            try:
+                file = FileRecord.fromFile(fileName)
+            except FileNotFoundError:
+                # removed during the scan
+                continue
+            if e is not None and e.file.digest == file.digest:
+                # only touched
+                e.file = file
+                entries[path] = e
+                changes.unchanged += 1
+                statChanged = True
+                continue
+
+            e2 = self._loadEntry(path, fileName, file)
+            if e2.error is not None and onError is not None:
+                onError(path, e2.error)
+            entries[path] = e2
+            if e is None:
+                changes.added.append(path)
+            else:
+                changes.updated.append(path)
+
+        changes.removed = [p for p in old.keys() if p not in entries]
+        self.entries = entries
+        if changes:
+            self._index = None
+        if save and (changes or statChanged or not os.path.exists(self.catalogFile)):
+            self.save()
+        return changes
+
+    def _getIndex(self) -> Dict[str, Dict[str, Set[str]]]:
+        index = self._index
+        if index is None:
+            index = {k: {} for k in ("vendor", "library", "name", "version", "vlnv", "busType")}
+            for p, e in self.entries.items():
+                if e.error is not None:
+                    continue
+                for k in ("vendor", "library", "name", "version", "vlnv"):
+                    index[k].setdefault(getattr(e, k), set()).add(p)
+                bt = index["busType"]
+                for t in e.busTypes:
+                    bt.setdefault(t, set()).add(p)
+                    # also by the name of the bus type only
+                    bt.setdefault(t.split(":")[2], set()).add(p)
+            self._index = index
+        return index
+
+    def find(self, vendor: Optional[str]=None, library: Optional[str]=None,
+             name: Optional[str]=None, version: Optional[str]=None,
+             vlnv: Optional[str]=None, busType: Optional[str]=None) -> List[CatalogEntry]:
+        """
+        Find components which match all specified properties
+
+        :param vlnv: "vendor:library:name:version" of the component
+        :param busType: VLNV or name of the bus type of some bus interface of the component
+        :return: list of matching entries sorted by path
+            (components which could not be loaded are never returned)
+        """
+        index = self._getIndex()
+        res: Optional[Set[str]] = None
+        for k, v in (("vendor", vendor), ("library", library), ("name", name),
+                     ("version", version), ("vlnv", vlnv), ("busType", busType)):
+            if v is None:
+                continue
+            paths = index[k].get(v, ())
+            if res is None:
+                res = set(paths)
+            else:
+                res.intersection_update(paths)
+            if not res:
+                return []
+        if res is None:
+            res = (p for p, e in self.entries.items() if e.error is None)
+        return [self.entries[p] for p in sorted(res)]
+
+    def errors(self) -> List[CatalogEntry]:
+        """
+        :return: entries of components which could not be loaded
+        """
+        return [e for _, e in sorted(self.entries.items()) if e.error is not None]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self.entries.values())
@@ -1,17 +1,21 @@
+from io import StringIO
 from itertools import islice
 from os.path import basename
-from time import time
+from time import time, gmtime
+from typing import BinaryIO, Dict, Iterable, List, Optional, TextIO, Tuple, Union
 
 from ipCorePackager.busInterface import BusInterface
 from ipCorePackager.constants import INTF_DIRECTION
+from ipCorePackager.fileKinds import DEFAULT_FILE_KINDS, FILE_SET, FileKind
 from ipCorePackager.helpers import appendSpiElem, \
-    appendStrElements, mkSpiElm, ns, whereEndsWithExt, whereEndsWithExts
+    appendStrElements, mkSpiElm, mkXmlWriter, spi_ns_prefix, \
+    writeStrElements
+from ipCorePackager.hwIOTree import iterHwIOLeafs
 from ipCorePackager.intfIpMeta import IntfIpMetaNotSpecifiedError, VALUE_RESOLVE
 from ipCorePackager.model import Model
 from ipCorePackager.otherXmlObjs import VendorExtensions, \
     FileSet, File, Parameter, Value
-from ipCorePackager.port import Port
-import xml.etree.ElementTree as etree
+from ipCorePackager.paramTable import ParamTable
 
 
 any_syn_fileSetName = "xilinx_anylanguagesynthesis"
@@ -36,24 +40,48 @@ def tcl_set_module_property(name: str, value, escapeStr=True):
     return f"set_module_property {name:s} {value:s}"
 
 
-def tcl_add_fileset_file(filename: str):
+def tcl_add_fileset_file(filename: str, kind: Optional[FileKind]=None):
     """
     :param filename: relative filename with .vhdl or .v
+    :param kind: kind of the file, if not specified it is resolved from
+        :data:`ipCorePackager.fileKinds.DEFAULT_FILE_KINDS`
 
     :return: add_fileset_file command string
     """
-    if filename.endswith(".vhd"):
-        t = "VHDL"
-    elif filename.endswith(".v") or filename.endswith(".sv") or filename.endswith(".svh"):
-        t = "VERILOG"
-    elif filename.endswith(".xdc"):
-        t = "XDC"
-    else:
+    if kind is None:
+        kind = DEFAULT_FILE_KINDS.classify(filename)
+    if kind is None or kind.quartusType is None:
         raise NotImplementedError(
             "Can not resolve type of file by extension", filename)
     name = basename(filename)
 
-    return f"add_fileset_file {name:s} {t:s} PATH {filename:s}"
+    return f"add_fileset_file {name:s} {kind.quartusType:s} PATH {filename:s}"
+
+
+class TclLineWriter():
+    """
+    Line buffer for Quartus tcl generators which writes the lines to text stream
+    immediately (lines are separated by a newline, as if joined by "\\n")
+
+    It has the list methods used by the generators (append, extend),
+    so it can be passed as the "buff" argument of the asQuartusTcl methods.
+    """
+    __slots__ = ["_out", "_first"]
+
+    def __init__(self, out: TextIO):
+        self._out = out
+        self._first = True
+
+    def append(self, line: str):
+        if self._first:
+            self._first = False
+        else:
+            self._out.write("\n")
+        self._out.write(line)
+
+    def extend(self, lines: Iterable[str]):
+        for line in lines:
+            self.append(line)
 
 
 class Component():
@@ -61,6 +89,13 @@ class Component():
     Containers of informations about IP core
 
     :attention: Xilinx IP-XACT is element position dependent
+
+    :ivar ~.busInterfaces: interfaces of the top (only interfaces with IntfIpMeta
+        have bus interface, :see: :meth:`~.getBusInterface`)
+        or :class:`ipCorePackager.busInterface.BusInterface`
+        objects if the component was loaded (:meth:`~.load`)
+    :ivar ~.fileSets: list of :class:`ipCorePackager.otherXmlObjs.FileSet`,
+        if empty the file sets are generated from :attr:`~._files`
     """
     _strValues = ["vendor", "library", "name", "version", "description"]
     # _iterableValues = ["fileSets", "parameters" ]
@@ -78,108 +113,224 @@ class Component():
         self.parameters = []
         self.vendorExtensions = VendorExtensions()
         self._files = []
+        self._fileKindsCache = None
+        self._timestamp = None
         self._top = None
         self._packager = packager
+        # id of interface of the top -> BusInterface, the design is not modified
+        # so it can be described by multiple components concurrently
+        self._bis: Dict[int, BusInterface] = {}
 
-    # @classmethod
-    # def load(cls, xmlStr):
-    #    self = cls()
-    #    for prefix, uri in ns.items():
-    #        etree.register_namespace(prefix, uri)
-    #    self.root = etree.fromstring(xmlStr)
-    #    self.name = findS(self.root, "name").text
-    #
-    #    intf = findS(self.root, "busInterfaces")
-    #    self.interfaces = {}
-    #    for i in intf:
-    #        i = BusInterface.fromElem(i)
-    #        if i.name in self.interfaces.keys():
-    #            raise Exception("Multiple interfaces with same name")
-    #        self.interfaces[i.name] = i
-    #    self.model = Model.fromElem(findS(self.root, "model"))
-    #
-    #    return self
-
-    def _xmlFileSets(self, componentElem):
-
-        def fileSetFromFiles(name, files):
-            fileSet = FileSet()
-            fileSet.name = name
-            for fn in files:
-                f = File.fromFileName(fn)
-                fileSet.files.append(f)
-            return fileSet
-
-        filesets = appendSpiElem(componentElem, "fileSets")
-        hdlExtensions = [".vhd", '.v', '.sv', '.svh', '.xdc']
-
-        hdl_fs = fileSetFromFiles(
-            any_syn_fileSetName,
-            whereEndsWithExts(self._files, hdlExtensions))
-        hdl_sim_fs = fileSetFromFiles(
-            any_sim_fileSetName,
-            whereEndsWithExts(self._files, hdlExtensions))
-        tclFileSet = fileSetFromFiles(
-            tcl_fileSetName,
-            whereEndsWithExt(self._files, ".tcl"))
-        for fs in [hdl_fs, hdl_sim_fs, tclFileSet]:
+    def _newModel(self) -> Model:
+        return Model(self._packager, any_syn_fileSetName,
+                     any_sim_fileSetName, tcl_fileSetName)
+
+    @classmethod
+    def load(cls, source: Union[str, BinaryIO],
+             packager: Optional["IpPackager"]=None) -> "Component":
+        """
+        Load component from IP-XACT component.xml
+        (:see: :func:`ipCorePackager.ipXactLoader.loadComponent`)
+        """
+        from ipCorePackager.ipXactLoader import loadComponent
+        return loadComponent(source, packager)
+
+    def _classifiedFiles(self) -> List[Tuple[str, Optional[FileKind]]]:
+        """
+        :return: list of tuples (file name, kind or None) for :attr:`~._files`
+            (cached until the list of files changes)
+        """
+        files = self._files
+        c = self._fileKindsCache
+        if c is None or c[0] is not files or c[1] != len(files):
+            if self._packager is None:
+                fileKinds = DEFAULT_FILE_KINDS
+            else:
+                fileKinds = self._packager.fileKinds
+            kinds = fileKinds.classifyAll(files)
+            c = self._fileKindsCache = (files, len(files), kinds)
+        return c[2]
+
+    def getBusInterface(self, intf: "HwIO") -> Optional[BusInterface]:
+        """
+        :return: bus interface generated for the interface of the top
+            (None if the interface does not have IntfIpMeta)
+        """
+        return self._bis.get(id(intf), None)
+
+    def _busInterfaceObjs(self) -> List[BusInterface]:
+        """
+        :return: bus interfaces of :attr:`~.busInterfaces` (the items are the interfaces
+            of the top which have bus interface (:meth:`~.getBusInterface`)
+            or :class:`ipCorePackager.busInterface.BusInterface` if the component was loaded)
+        """
+        res = []
+        bis = self._bis
+        for intf in self.busInterfaces:
+            if isinstance(intf, BusInterface):
+                res.append(intf)
+            else:
+                bi = bis.get(id(intf), None)
+                if bi is not None:
+                    res.append(bi)
+        return res
+
+    def _xmlFileSets(self):
+        if self.fileSets:
+            # explicitly specified (loaded) file sets
+            filesets = mkSpiElm("fileSets")
+            for fs in self.fileSets:
+                filesets.append(fs.asElem())
+            return filesets
+
+        files = {
+            FILE_SET.SYNTHESIS: [],
+            FILE_SET.SIMULATION: [],
+            FILE_SET.GUI: [],
+        }
+        for fn, kind in self._classifiedFiles():
+            if kind is None or not kind.fileSets:
+                continue
+            # same object is used in all file sets, it is not modified
+            f = File.fromFileName(fn, kind)
+            for fs in kind.fileSets:
+                files[fs].append(f)
+
+        filesets = mkSpiElm("fileSets")
+        for fsName, fsKind in [(any_syn_fileSetName, FILE_SET.SYNTHESIS),
+                               (any_sim_fileSetName, FILE_SET.SIMULATION),
+                               (tcl_fileSetName, FILE_SET.GUI)]:
+            fs = FileSet()
+            fs.name = fsName
+            fs.files = files[fsKind]
             filesets.append(fs.asElem())
+        return filesets
 
-    def _xmlParameters(self, compElem):
-        parameters = appendSpiElem(compElem, "parameters")
+    def _xmlParameters(self):
+        parameters = mkSpiElm("parameters")
         for p in self.parameters:
             parameters.append(p.asElem())
+        return parameters
+
+    def setTimestamp(self, timestamp: Optional[int]):
+        """
+        :param timestamp: time (seconds since epoch) used as revision
+            and creation time of the core, None to use the current time
+            (:see: :func:`ipCorePackager.helpers.resolveTimestamp`)
+        """
+        self._timestamp = timestamp
+        ce = self.vendorExtensions.coreExtensions
+        ce.coreCreationDateTime = gmtime(timestamp)
+
+    def _xmlVendorExtensions(self):
+        ce = self.vendorExtensions.coreExtensions
+        if ce.coreRevision:
+            revision = ce.coreRevision
+        elif self._timestamp is None:
+            revision = str(int(time()))
+        else:
+            revision = str(self._timestamp)
+        displayName = ce.displayName
+        if not displayName:
+            displayName = self.name + "_v" + self.version
+        return self.vendorExtensions.asElem(displayName, revision=revision)
 
     def ip_xact(self):
         # Vivado 2015.2 bug - order of all elements is NOT optional
-        for prefix, uri in ns.items():
-            etree.register_namespace(prefix, uri)
         c = mkSpiElm("component")
         appendStrElements(c, self, self._strValues[:-1])
-        for intf in self.busInterfaces:
-            if hasattr(intf, "_bi"):
-                bi = appendSpiElem(c, "busInterfaces")
-                for intf in self.busInterfaces:  # for all interfaces which have bus interface class
-                    if hasattr(intf, "_bi"):
-                        bi.append(intf._bi.asElem())
-                break
+        bis = self._busInterfaceObjs()
+        if bis:
+            e = appendSpiElem(c, "busInterfaces")
+            for bi in bis:
+                e.append(bi.asElem())
 
         c.append(self.model.asElem())
-        self._xmlFileSets(c)
+        c.append(self._xmlFileSets())
 
         appendStrElements(c, self, [self._strValues[-1]])
-        self._xmlParameters(c)
-        c.append(self.vendorExtensions.asElem(
-            self.name + "_v" + self.version, revision=str(int(time()))))
+        c.append(self._xmlParameters())
+        c.append(self._xmlVendorExtensions())
 
         return c
 
+    def write_ip_xact(self, out: TextIO):
+        """
+        Write IP-XACT component.xml to text stream
+
+        The output is the same as ``prettify(self.ip_xact())``
+        but only small parts of the document exist in memory at once.
+        """
+        w = mkXmlWriter(out)
+        w.declaration()
+        w.start(spi_ns_prefix + "component", nsDecl=("spirit", "xilinx"))
+        writeStrElements(w, self, self._strValues[:-1])
+        bis = self._busInterfaceObjs()
+        if bis:
+            w.start(spi_ns_prefix + "busInterfaces")
+            for bi in bis:
+                w.element(bi.asElem())
+            w.end()
+
+        self.model.write_ip_xact(w)
+        w.element(self._xmlFileSets())
+
+        writeStrElements(w, self, [self._strValues[-1]])
+        w.element(self._xmlParameters())
+        w.element(self._xmlVendorExtensions())
+        w.end()
+
     def registerHwIO(self, hwIO: 'HwIO'):
-        if hwIO._hwIOs:
-            for cHwIO in hwIO._hwIOs:
-                self.registerHwIO(cHwIO)
-        else:
-            pack = self._packager
-            name = pack.getInterfacePhysicalName(hwIO)
-            d = pack.getInterfaceDirection(hwIO)
-            t = pack.getInterfaceType(hwIO)
-            p = Port.fromParams(name,
-                                INTF_DIRECTION.asDirection(d),
-                                t,
-                                pack)
-            self.model.ports.append(p)
-
-    def asignTopHwModule(self, top: "HwModule", topName: str):
+        pack = self._packager
+        ports = self.model.ports
+        for leaf in iterHwIOLeafs(hwIO, pack):
+            ports.add(leaf.physicalName,
+                      INTF_DIRECTION.asDirection(leaf.direction),
+                      pack.getInterfaceType(leaf.hwIO),
+                      pack)
+
+    def asignTopHwModule(self, top: "HwModule", topName: str,
+                         params: Optional[ParamTable]=None,
+                         withModel: bool=True):
         """
         Set hwt unit as template for component
+
+        :param params: table of parameters of the top,
+            :meth:`ipCorePackager.packager.IpCorePackager.getParamTable` if not specified
+        :param withModel: if False the views and ports of the :attr:`~.model`
+            and the port maps of the bus interfaces are not built
+            (only IP-XACT uses them, Quartus output does not need them)
+        :note: If an error occurs the component is left as it was before the call,
+            (the description is built into new containers which replace the old ones)
+            so the call can be repeated.
         """
+        prev = (self._top, self.name, self.model, self.busInterfaces, self._bis,
+                self.parameters)
+        try:
+            self._asignTopHwModule(top, topName, params, withModel)
+        except BaseException:
+            (self._top, self.name, self.model, self.busInterfaces, self._bis,
+             self.parameters) = prev
+            raise
+
+    def _asignTopHwModule(self, top: "HwModule", topName: str,
+                          params: Optional[ParamTable],
+                          withModel: bool):
         self._top = top
         self.name = topName
         pack = self._packager
-        self.model.addDefaultViews(topName, pack.iterParams(top))
+        if params is None:
+            params = pack.getParamTable(top)
+        self.busInterfaces = list(self.busInterfaces)
+        self._bis = dict(self._bis)
+        self.parameters = list(self.parameters)
+        if withModel:
+            self.model = self._newModel()
+            self.model.addDefaultViews(topName, params)
 
         for intf in pack.iterInterfaces(self._top):
-            self.registerHwIO(intf)
+            if withModel:
+                self.registerHwIO(intf)
             if intf._isExtern:
                 self.busInterfaces.append(intf)
 
@@ -191,8 +342,9 @@ class Component():
             except IntfIpMetaNotSpecifiedError:
                 pass
             if biClass is not None:
-                bi = BusInterface.fromBiClass(intf, biClass, self._packager)
-                intf._bi = bi
+                bi = BusInterface.fromBiClass(intf, biClass, self._packager,
+                                              withPortMap=withModel)
+                self._bis[id(intf)] = bi
                 bi.busType.postProcess(self, self._packager, intf)
 
         # generate component parameters
@@ -205,11 +357,10 @@ class Component():
         v.text = self.name
         self.parameters.append(compNameParam)
         # generic as parameters
-        for _p in pack.iterParams(self._top):
+        for row in params:
             p = Parameter()
-            p.name = pack.getParamPhysicalName(_p)
-            p.value = self._packager.paramToIpValue(
-                "PARAM_VALUE.", _p, Value.RESOLVE_USER)
+            p.name = row.name
+            p.value = row.userValue
             self.parameters.append(p)
 
         # for bi in self.busInterfaces:
@@ -219,10 +370,25 @@ class Component():
         #        p.value.id = removeUndescores_witSep(p.value.id , ".")
         #        p.value.text = removeUndescores_witSep(p.value.text , ".")
 
-    def quartus_tcl(self, quartus_version=None):
+    def quartus_tcl(self, quartus_version=None) -> str:
+        """
+        :return: content of Quartus _hw.tcl file
+        """
+        buff = StringIO()
+        self.write_quartus_tcl(buff, quartus_version)
+        return buff.getvalue()
+
+    def write_quartus_tcl(self, out: TextIO, quartus_version=None):
+        """
+        Write Quartus _hw.tcl to text stream
+
+        The output is the same as :meth:`~.quartus_tcl`, the lines are written
+        to the stream as the parameters and interfaces are processed.
+        """
         if quartus_version is None:
             quartus_version = DEFAULT_QUARTUS_VERSION
-        buff = [
+        buff = TclLineWriter(out)
+        buff.extend([
             tcl_comment("module properties"),
             f"package require -exact qsys {quartus_version:s}",
             tcl_set_module_property("DESCRIPTION", self.description),
@@ -238,7 +404,7 @@ class Component():
             tcl_set_module_property("REPORT_TO_TALKBACK", False),
             tcl_set_module_property("ALLOW_GREYBOX_GENERATION", False),
             tcl_set_module_property("REPORT_HIERARCHY", False),
-        ]
+        ])
 
         buff.extend([
             'add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""',
@@ -246,10 +412,11 @@ class Component():
             "set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false",
             "set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false"
         ])
-        for f in self._files:
-            if not f.endswith(".tcl"):
-                s = tcl_add_fileset_file(f)
-                buff.append(s)
+        for f, kind in self._classifiedFiles():
+            if kind is not None and kind.quartusType is None:
+                # file which is not a part of Quartus file set (e.g. GUI)
+                continue
+            buff.append(tcl_add_fileset_file(f, kind))
 
         buff.append(tcl_comment("params"))
         # first is name of this component
@@ -259,9 +426,8 @@ class Component():
         buff.append(tcl_comment("interfaces"))
         for intf in self.busInterfaces:
             # for all interfaces which have bus interface class
-            if hasattr(intf, "_bi"):
-                bi = intf._bi
+            bi = self._bis.get(id(intf), None)
+            if bi is not None:
                 bi.busType.asQuartusTcl(buff, quartus_version,
                                         self, self._packager, intf)
                 buff.append("")
-        return "\n".join(buff)
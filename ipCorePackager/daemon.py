@@ -0,0 +1,455 @@
+"""
+Resident packaging service which accepts jobs over a Unix socket
+
+The packaging of a small IP-core is usually dominated by the startup of the Python
+process and by the imports of the libraries. :class:`~.PackagingDaemon` keeps
+the imports, the factories of packagers and the caches warm between the jobs
+and it packages the jobs on a pool of threads (:see: :func:`ipCorePackager.batch.packageBatchInThreads`).
+
+The protocol is line based, each line is a JSON object. The client sends requests:
+
+.. code-block:: text
+
+    {"cmd": "package", "factory": "pkg.module:mkPackager", "args": [], "kwargs": {},
+     "repoDir": "/path/to/repo", "name": null, "vendor": "hwt", "library": "mylib",
+     "description": null, "options": {"reproducible": true}}
+    {"cmd": "ping"}
+    {"cmd": "shutdown"}
+
+"factory" is a reference "module:qualified.name" to a callable which returns
+:class:`ipCorePackager.packager.IpCorePackager` (it is called with args and kwargs)
+and "options" are additional arguments of :meth:`ipCorePackager.packager.IpCorePackager.createPackage`.
+The daemon answers with events, each job gets "queued", "started" and "finished"
+event (with the result and timing), the events of jobs of the same connection
+may be interleaved, they are identified by "id" which is the index of the request
+in the connection.
+The packager returned by the factory is not modified (it may be shared between the jobs),
+the jobs which write into the same package directory are packaged one after another.
+
+.. code-block:: bash
+
+    python3 -m ipCorePackager.daemon serve /tmp/ipCorePackager.sock --workers 4
+    python3 -m ipCorePackager.daemon package /tmp/ipCorePackager.sock pkg.module:mkPackager ip_repo
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import copy
+import errno
+import importlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+from threading import Lock, Thread
+from time import perf_counter
+import traceback
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ipCorePackager.packager import IpCorePackager
+from ipCorePackager.stats import PackagingStats
+
+
+class DaemonError(Exception):
+    """
+    The daemon reported an error for the request (not for the packaging itself)
+    """
+
+
+def resolveFactory(ref: str) -> Callable[..., IpCorePackager]:
+    """
+    :param ref: "module:qualified.name" of the object
+    :return: the object
+    """
+    try:
+        modName, qualName = ref.split(":", 1)
+    except ValueError:
+        raise ValueError("Factory reference has to be in \"module:name\" format", ref)
+    obj = importlib.import_module(modName)
+    for n in qualName.split("."):
+        obj = getattr(obj, n)
+    if not callable(obj):
+        raise TypeError("Factory is not callable", ref)
+    return obj
+
+
+class _PackagingDaemonHandler(socketserver.StreamRequestHandler):
+    """
+    Reads requests of a single connection and submits the jobs to the pool of the daemon,
+    the connection is closed after all jobs of the connection are finished
+    """
+
+    def setup(self):
+        super(_PackagingDaemonHandler, self).setup()
+        self._wlock = Lock()
+
+    def send(self, msg: dict):
+        data = json.dumps(msg).encode("utf-8") + b"\n"
+        with self._wlock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                # client disconnected, the job is finished anyway
+                pass
+
+    def handle(self):
+        daemon: PackagingDaemon = self.server.packagingDaemon
+        futures = []
+        for i, line in enumerate(self.rfile):
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+                cmd = req.get("cmd", "package")
+            except (ValueError, AttributeError) as e:
+                self.send({"event": "error", "id": i, "error": f"Invalid request: {e}"})
+                continue
+
+            if cmd == "package":
+                try:
+                    futures.append(daemon.submit(
+                        req, lambda msg, i=i: self.send({**msg, "id": i})))
+                except RuntimeError:
+                    # executor is already shut down
+                    self.send({"event": "error", "id": i, "error": "Daemon is shutting down"})
+            elif cmd == "ping":
+                self.send({"event": "pong", "id": i, **daemon.status()})
+            elif cmd == "shutdown":
+                self.send({"event": "shutdown", "id": i})
+                daemon.requestShutdown()
+                break
+            else:
+                self.send({"event": "error", "id": i, "error": f"Unknown command {cmd}"})
+
+        for f in futures:
+            f.result()
+
+
+class PackagingDaemon():
+    """
+    Packaging service listening on a Unix socket (:see: module documentation for the protocol)
+
+    .. code-block:: python
+
+        d = PackagingDaemon("/tmp/ipCorePackager.sock", maxWorkers=4)
+        d.serveForever()  # until "shutdown" request or :meth:`~.shutdown`
+
+    :ivar ~.socketPath: path of the Unix socket
+    :ivar ~.jobsFinished: number of finished jobs
+    """
+
+    def __init__(self, socketPath: str, maxWorkers: Optional[int]=None):
+        """
+        :param socketPath: path of the socket, a socket file left by a daemon
+            which is not running anymore is replaced,
+            the socket is accessible only by the current user
+        :param maxWorkers: number of threads which package the jobs
+        :raise FileExistsError: if the path exists and it is not a socket
+            or if other daemon is listening on it
+        """
+        self._removeStaleSocket(socketPath)
+        self.socketPath = socketPath
+        self.maxWorkers = maxWorkers
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers,
+                                            thread_name_prefix="ipCorePackager_daemon")
+        # reference -> factory
+        self._factories: Dict[str, Callable[..., IpCorePackager]] = {}
+        self._lock = Lock()
+        self.jobsFinished = 0
+        self._jobsRunning = 0
+        # package directory -> (lock, number of jobs which use it)
+        self._packageDirLocks: Dict[str, Tuple[Lock, int]] = {}
+
+        server = self._server = socketserver.ThreadingUnixStreamServer(
+            socketPath, _PackagingDaemonHandler, bind_and_activate=False)
+        try:
+            server.server_bind()
+            # connections are refused until listen, the permissions are set before it
+            os.chmod(socketPath, 0o600)
+            server.server_activate()
+        except BaseException:
+            server.server_close()
+            raise
+        server.daemon_threads = True
+        server.packagingDaemon = self
+
+    @staticmethod
+    def _removeStaleSocket(socketPath: str):
+        """
+        Remove the socket file if no daemon is listening on it
+
+        :raise FileExistsError: if the path is not a socket or if some daemon
+            is listening on it
+        """
+        try:
+            st = os.lstat(socketPath)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(st.st_mode):
+            raise FileExistsError(errno.EEXIST, "Path exists and it is not a socket",
+                                  socketPath)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            try:
+                s.connect(socketPath)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # socket of a terminated daemon
+                pass
+            else:
+                raise FileExistsError(errno.EADDRINUSE,
+                                      "Other daemon is listening on the socket", socketPath)
+        os.unlink(socketPath)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"pid": os.getpid(), "jobsRunning": self._jobsRunning,
+                    "jobsFinished": self.jobsFinished}
+
+    def _getFactory(self, ref: str) -> Callable[..., IpCorePackager]:
+        f = self._factories.get(ref, None)
+        if f is None:
+            f = resolveFactory(ref)
+            with self._lock:
+                self._factories[ref] = f
+        return f
+
+    @contextmanager
+    def _packageDirLock(self, ipDir: str):
+        """
+        Serialize the jobs which write into the same package directory
+        """
+        with self._lock:
+            lock, users = self._packageDirLocks.get(ipDir, (None, 0))
+            if lock is None:
+                lock = Lock()
+            self._packageDirLocks[ipDir] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                _, users = self._packageDirLocks[ipDir]
+                if users == 1:
+                    del self._packageDirLocks[ipDir]
+                else:
+                    self._packageDirLocks[ipDir] = (lock, users - 1)
+
+    def submit(self, req: dict, send: Callable[[dict], None]):
+        """
+        Submit packaging job to the pool of workers
+
+        :param req: "package" request
+        :param send: function which sends the event to the client
+        :return: future of the job
+        """
+        queued = perf_counter()
+        send({"event": "queued"})
+        return self._executor.submit(self._runJob, req, send, queued)
+
+    def _runJob(self, req: dict, send: Callable[[dict], None], queued: float):
+        start = perf_counter()
+        with self._lock:
+            self._jobsRunning += 1
+        send({"event": "started", "queued": start - queued})
+        res = {"event": "finished", "ok": False, "name": req.get("name", None),
+               "ipDir": None, "hdlFiles": [], "error": None}
+        timing = res["timing"] = {"queued": start - queued, "build": 0.0, "wait": 0.0,
+                                  "package": 0.0}
+        try:
+            factory = self._getFactory(req["factory"])
+            p = factory(*req.get("args", ()), **req.get("kwargs", {}))
+            if not isinstance(p, IpCorePackager):
+                raise TypeError("Factory did not return IpCorePackager", req["factory"], p)
+            name = req.get("name", None)
+            if name is None:
+                name = p.name
+            if p.stats is None:
+                # the factory may return a shared packager, the stats of this job
+                # are set on a shallow copy
+                p = copy(p)
+                p.stats = PackagingStats()
+            built = perf_counter()
+            timing["build"] = built - start
+
+            repoDir = req["repoDir"]
+            ipDir = os.path.join(repoDir, name)
+            with self._packageDirLock(os.path.realpath(ipDir)):
+                locked = perf_counter()
+                timing["wait"] = locked - built
+                run = p.createPackage(repoDir,
+                                      vendor=req.get("vendor", "hwt"),
+                                      library=req.get("library", "mylib"),
+                                      description=req.get("description", None),
+                                      name=name,
+                                      **req.get("options", {}))
+            timing["package"] = perf_counter() - locked
+            res.update(ok=True, name=name, ipDir=ipDir,
+                       hdlFiles=list(run.hdlFiles), upToDate=run.upToDate,
+                       phases=p.stats.elapsed())
+        except Exception:
+            res["error"] = traceback.format_exc()
+        finally:
+            with self._lock:
+                self._jobsRunning -= 1
+                self.jobsFinished += 1
+        send(res)
+
+    def serveForever(self):
+        """
+        Serve the requests until :meth:`~.shutdown` (or "shutdown" request)
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def requestShutdown(self):
+        """
+        Stop :meth:`~.serveForever` (can be called from any thread, it does not wait)
+        """
+        Thread(target=self._server.shutdown, daemon=True).start()
+
+    def shutdown(self):
+        """
+        Stop :meth:`~.serveForever` and wait for it (must not be called from the thread
+        which serves)
+        """
+        self._server.shutdown()
+
+    def close(self):
+        """
+        Wait for running jobs and release the socket
+        """
+        self._executor.shutdown(wait=True)
+        self._server.server_close()
+        try:
+            os.unlink(self.socketPath)
+        except FileNotFoundError:
+            pass
+
+
+class PackagingClient():
+    """
+    Client of :class:`~.PackagingDaemon`, each call uses a new connection
+    """
+
+    def __init__(self, socketPath: str, timeout: Optional[float]=None):
+        self.socketPath = socketPath
+        self.timeout = timeout
+
+    def _request(self, requests: List[dict]) -> Iterator[dict]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(self.timeout)
+            s.connect(self.socketPath)
+            s.sendall(b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in requests))
+            # no more requests, the daemon closes the connection after the last job
+            s.shutdown(socket.SHUT_WR)
+            with s.makefile("rb") as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def packageMany(self, jobs: List[dict],
+                    onEvent: Optional[Callable[[dict], None]]=None) -> List[dict]:
+        """
+        Package multiple IP-cores (the jobs are packaged concurrently)
+
+        :param jobs: "package" requests (:see: :meth:`~.package` for the keys)
+        :param onEvent: function called for each event received from the daemon
+        :return: "finished" events in the order of jobs
+        :raise DaemonError: if some request was rejected by the daemon
+        """
+        results: List[Optional[dict]] = [None for _ in jobs]
+        for e in self._request([{"cmd": "package", **j} for j in jobs]):
+            if onEvent is not None:
+                onEvent(e)
+            ev = e["event"]
+            if ev == "finished":
+                results[e["id"]] = e
+            elif ev == "error":
+                raise DaemonError(e["error"])
+        if any(r is None for r in results):
+            raise DaemonError("Connection closed before all jobs finished")
+        return results
+
+    def package(self, factory: str, repoDir: str, name: Optional[str]=None,
+                vendor: str="hwt", library: str="mylib",
+                description: Optional[str]=None,
+                args: tuple=(), kwargs: Optional[dict]=None,
+                onEvent: Optional[Callable[[dict], None]]=None,
+                **options) -> dict:
+        """
+        Package single IP-core
+
+        :param factory: "module:qualified.name" of a callable which returns the packager
+        :param repoDir: directory where the IP-core should be stored
+            (relative paths are resolved by the daemon)
+        :param name: name of the IP-core, if specified it overrides the name of the packager
+        :param args: positional arguments for the factory (JSON serializable)
+        :param kwargs: keyword arguments for the factory (JSON serializable)
+        :param options: additional arguments of createPackage
+        :return: "finished" event ("ok", "error", "ipDir", "hdlFiles", "timing", "phases")
+        """
+        job = {"factory": factory, "args": list(args), "kwargs": kwargs or {},
+               "repoDir": repoDir, "name": name, "vendor": vendor,
+               "library": library, "description": description, "options": options}
+        return self.packageMany([job], onEvent)[0]
+
+    def ping(self) -> dict:
+        e, = self._request([{"cmd": "ping"}])
+        return e
+
+    def shutdown(self):
+        """
+        Ask the daemon to stop (it finishes the running jobs)
+        """
+        for _ in self._request([{"cmd": "shutdown"}]):
+            pass
+
+
+def main(argv: Optional[List[str]]=None):
+    parser = argparse.ArgumentParser(description="IP-core packaging daemon")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="run the daemon")
+    s.add_argument("socket")
+    s.add_argument("--workers", type=int, default=None)
+    s = sub.add_parser("package", help="package IP-core by the daemon")
+    s.add_argument("socket")
+    s.add_argument("factory", help="module:name of a function which returns the packager")
+    s.add_argument("repoDir")
+    s.add_argument("--name")
+    s.add_argument("--vendor", default="hwt")
+    s.add_argument("--library", default="mylib")
+    s.add_argument("--reproducible", action="store_true")
+    s.add_argument("--target", action="append", dest="targets",
+                   help="output file to generate (ipxact, xgui, quartus, ...),"
+                        " can be specified multiple times, all if not specified")
+    s = sub.add_parser("shutdown", help="stop the daemon")
+    s.add_argument("socket")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "serve":
+        PackagingDaemon(args.socket, args.workers).serveForever()
+    elif args.cmd == "package":
+
+        def printEvent(e):
+            if e["event"] == "finished" and e["ok"]:
+                t = e["timing"]
+                print(f"{e['name']:s}: {e['ipDir']:s} (queued {t['queued']:.3f}s,"
+                      f" build {t['build']:.3f}s, wait {t['wait']:.3f}s, package {t['package']:.3f}s)")
+            elif e["event"] == "finished":
+                print(e["error"], file=sys.stderr, end="")
+
+        res = PackagingClient(args.socket).package(
+            args.factory, os.path.abspath(args.repoDir), name=args.name,
+            vendor=args.vendor, library=args.library, onEvent=printEvent,
+            reproducible=args.reproducible, targets=args.targets)
+        return 0 if res["ok"] else 1
+    else:
+        PackagingClient(args.socket).shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
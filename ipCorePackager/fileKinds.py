@@ -0,0 +1,98 @@
+"""
+Classification of files of IP-core package by their extensions
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class FILE_SET:
+    """
+    Kinds of file sets where files of the package are placed
+    """
+    SYNTHESIS = "synthesis"
+    SIMULATION = "simulation"
+    GUI = "gui"
+
+
+class FileKind():
+    """
+    Kind of file in IP-core package
+
+    :ivar ~.name: name of the kind
+    :ivar ~.extensions: lower case file extensions including the dot (e.g. ".vhd")
+    :ivar ~.fileSets: file sets where this file belongs (:class:`~.FILE_SET`),
+        empty if it should not be in IP-XACT file sets
+    :ivar ~.ipXactFileType: spirit:fileType or None if it should not be specified
+    :ivar ~.ipXactUserFileType: spirit:userFileType
+    :ivar ~.quartusType: file type in Quartus add_fileset_file,
+        None if the file should not be added to Quartus file set
+    """
+    __slots__ = ["name", "extensions", "fileSets", "ipXactFileType",
+                 "ipXactUserFileType", "quartusType"]
+
+    def __init__(self, name: str, extensions: Iterable[str],
+                 fileSets: Iterable[str],
+                 ipXactFileType: Optional[str], ipXactUserFileType: Optional[str],
+                 quartusType: Optional[str]):
+        self.name = name
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.fileSets = frozenset(fileSets)
+        self.ipXactFileType = ipXactFileType
+        self.ipXactUserFileType = ipXactUserFileType
+        self.quartusType = quartusType
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self.name:s} {self.extensions}>"
+
+
+class FileKindRegistry():
+    """
+    Registry of :class:`~.FileKind` with precomputed lookup by file extension
+    """
+
+    def __init__(self, kinds: Iterable[FileKind]=()):
+        self._byExt: Dict[str, FileKind] = {}
+        self.kinds: List[FileKind] = []
+        for k in kinds:
+            self.register(k)
+
+    def register(self, kind: FileKind):
+        """
+        Add new kind, it overrides previously registered kinds with the same extension
+        """
+        self.kinds.append(kind)
+        for e in kind.extensions:
+            self._byExt[e] = kind
+
+    def copy(self) -> "FileKindRegistry":
+        c = FileKindRegistry()
+        c.kinds = list(self.kinds)
+        c._byExt = dict(self._byExt)
+        return c
+
+    def classify(self, fileName: str) -> Optional[FileKind]:
+        """
+        :return: kind of the file or None if the extension is not known
+        """
+        return self._byExt.get(os.path.splitext(fileName)[1].lower(), None)
+
+    def classifyAll(self, fileNames: Iterable[str]) -> List[Tuple[str, Optional[FileKind]]]:
+        """
+        :return: list of tuples (file name, kind or None)
+        """
+        get = self._byExt.get
+        splitext = os.path.splitext
+        return [(f, get(splitext(f)[1].lower(), None)) for f in fileNames]
+
+
+_HDL_SETS = (FILE_SET.SYNTHESIS, FILE_SET.SIMULATION)
+IMPORTED_FILE = "IMPORTED_FILE"
+
+DEFAULT_FILE_KINDS = FileKindRegistry([
+    FileKind("vhdl", [".vhd"], _HDL_SETS, "vhdlSource", IMPORTED_FILE, "VHDL"),
+    FileKind("verilog", [".v"], _HDL_SETS, "verilogSource", IMPORTED_FILE, "VERILOG"),
+    FileKind("systemVerilog", [".sv", ".svh"], _HDL_SETS,
+             "systemVerilogSource", IMPORTED_FILE, "VERILOG"),
+    FileKind("xdc", [".xdc"], _HDL_SETS, None, "xdc", "XDC"),
+    FileKind("tcl", [".tcl"], [FILE_SET.GUI], "tclSource", "XGUI_VERSION_2", None),
+])
@@ -0,0 +1,142 @@
+"""
+Strategies for placing of extra files into IP-core package
+"""
+from enum import Enum
+import errno
+import os
+import shutil
+
+
+class FILE_PLACEMENT(Enum):
+    """
+    Method used to place extra files to package
+
+    :cvar COPY: regular copy of the file
+    :cvar HARDLINK: hard link to the source file (no data is written,
+        but the package and the source share the file, modification of one
+        modifies also the other)
+    :cvar SYMLINK: symbolic link to the absolute path of the source file
+    :cvar REFLINK: copy on write clone of the source file (btrfs, xfs, ...)
+    :cvar COPY_FILE_RANGE: in-kernel copy (:func:`os.copy_file_range`),
+        which may use server side copy on network file systems
+    """
+    COPY = 0
+    HARDLINK = 1
+    SYMLINK = 2
+    REFLINK = 3
+    COPY_FILE_RANGE = 4
+
+
+# ioctl which clones the file (linux/fs.h)
+FICLONE = 0x40049409
+
+# errors which mean that the method is not supported for this file/file system
+_UNSUPPORTED_ERRNOS = frozenset(
+    e for e in (
+        getattr(errno, n, None) for n in [
+            "EXDEV", "EPERM", "EACCES", "EOPNOTSUPP", "ENOTSUP", "ENOSYS",
+            "EINVAL", "EMLINK", "ENOTTY", "EBADF", "ETXTBSY",
+        ]
+    ) if e is not None
+)
+
+
+class FilePlacementNotSupported(Exception):
+    """
+    The placement method is not supported on this platform/file system
+    """
+    pass
+
+
+def _copy(src: str, dst: str):
+    shutil.copy(src, dst)
+
+
+def _hardlink(src: str, dst: str):
+    os.link(src, dst)
+
+
+def _symlink(src: str, dst: str):
+    os.symlink(os.path.abspath(src), dst)
+
+
+def _reflink(src: str, dst: str):
+    try:
+        import fcntl
+    except ImportError:
+        raise FilePlacementNotSupported()
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+    shutil.copymode(src, dst)
+
+
+def _copy_file_range(src: str, dst: str):
+    try:
+        copy_file_range = os.copy_file_range
+    except AttributeError:
+        raise FilePlacementNotSupported()
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            while copy_file_range(s.fileno(), d.fileno(), 1 << 30):
+                pass
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+    shutil.copymode(src, dst)
+
+
+_PLACEMENT_FN = {
+    FILE_PLACEMENT.COPY: _copy,
+    FILE_PLACEMENT.HARDLINK: _hardlink,
+    FILE_PLACEMENT.SYMLINK: _symlink,
+    FILE_PLACEMENT.REFLINK: _reflink,
+    FILE_PLACEMENT.COPY_FILE_RANGE: _copy_file_range,
+}
+
+# methods which are tried if the method is not supported
+FILE_PLACEMENT_FALLBACK = {
+    FILE_PLACEMENT.COPY: None,
+    FILE_PLACEMENT.HARDLINK: FILE_PLACEMENT.COPY,
+    FILE_PLACEMENT.SYMLINK: FILE_PLACEMENT.COPY,
+    FILE_PLACEMENT.REFLINK: FILE_PLACEMENT.COPY_FILE_RANGE,
+    FILE_PLACEMENT.COPY_FILE_RANGE: FILE_PLACEMENT.COPY,
+}
+
+
+def placeFile(src: str, dst: str, placement: FILE_PLACEMENT=FILE_PLACEMENT.COPY) -> FILE_PLACEMENT:
+    """
+    Place file to destination path, if the placement method is not supported
+    the methods from :data:`~.FILE_PLACEMENT_FALLBACK` are tried
+
+    :note: existing destination file is replaced
+    :return: placement method which was actually used
+    """
+    if not os.path.isfile(src):
+        raise FileNotFoundError(errno.ENOENT, "Source file does not exist", src)
+
+    if os.path.lexists(dst):
+        if placement == FILE_PLACEMENT.HARDLINK and not os.path.islink(dst)\
+                and os.path.samefile(src, dst):
+            return placement
+        os.remove(dst)
+
+    while True:
+        fallback = FILE_PLACEMENT_FALLBACK[placement]
+        try:
+            _PLACEMENT_FN[placement](src, dst)
+            return placement
+        except FilePlacementNotSupported:
+            if fallback is None:
+                raise
+        except OSError as e:
+            if fallback is None or e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+        placement = fallback
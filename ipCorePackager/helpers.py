@@ -1,5 +1,8 @@
-import xml.dom.minidom
+from io import StringIO
+import os
+from typing import Optional
 
+from ipCorePackager.xmlWriter import PrettyXmlWriter
 import xml.etree.ElementTree as etree
 
 
@@ -9,16 +12,74 @@ ns = {"spirit": "http://www.spiritconsortium.org/XMLSchema/SPIRIT/1685-2009",
 spi_ns_prefix = "{" + ns["spirit"] + "}"
 xi_ns_prefix = "{" + ns["xilinx"] + "}"
 
+# the registry of prefixes is global, the prefixes are registered just once
+# (for serialization of the elements by xml.etree.ElementTree.tostring,
+# this library writes the prefixes explicitly, :see: :func:`~.mkXmlWriter`)
+for _prefix, _uri in ns.items():
+    etree.register_namespace(_prefix, _uri)
+del _prefix, _uri
+
+
+def resolveTimestamp(timestamp: Optional[int]=None,
+                     reproducible: bool=False) -> Optional[int]:
+    """
+    Resolve time which should be used as revision and creation time of the IP-core
+
+    :param timestamp: explicitly specified time (seconds since epoch)
+    :param reproducible: if True the current time is never used
+    :return: timestamp if specified, else the value of SOURCE_DATE_EPOCH
+        environment variable if set (https://reproducible-builds.org/specs/source-date-epoch/),
+        else 0 in reproducible mode and None (use current time) otherwise
+    """
+    if timestamp is not None:
+        return int(timestamp)
+    sde = os.environ.get("SOURCE_DATE_EPOCH", "")
+    if sde:
+        try:
+            return int(sde)
+        except ValueError:
+            raise ValueError("SOURCE_DATE_EPOCH has to be an integer", sde)
+    if reproducible:
+        return 0
+    return None
+
 
 def findS(elm, name):
-    return elm.find("spirit:" + name, ns)
+    # tag in Clark notation is looked up directly, without parsing of the path
+    return elm.find(spi_ns_prefix + name)
+
+
+def findX(elm, name):
+    return elm.find(xi_ns_prefix + name)
+
+
+def elmText(elm) -> str:
+    """
+    :return: text of the element, "" if element has no text
+    """
+    t = elm.text
+    if t is None:
+        return ""
+    return t
+
+
+def mkXmlWriter(out):
+    """
+    :return: :class:`PrettyXmlWriter` for IP-XACT namespaces writing to specified text stream
+    """
+    return PrettyXmlWriter(out, ns)
 
 
 def prettify(elm):
-    # or xml.dom.minidom.parseString(xml_string)
-    s = xml.dom.minidom.parseString(etree.tostring(elm))
-    pretty_xml_as_string = s.toprettyxml()
-    return pretty_xml_as_string
+    """
+    Format element tree as indented XML document
+    (same format as xml.dom.minidom toprettyxml())
+    """
+    buff = StringIO()
+    w = mkXmlWriter(buff)
+    w.declaration()
+    w.element(elm, nsDecl=w.usedNamespaces(elm))
+    return buff.getvalue()
 
 
 def mkSpiElm(elemName):
@@ -76,8 +137,34 @@ def appendSpiAtribs(obj, elm, prefix='', reqPropNames=[], optPropNames=[]):
             elm.attrib[prefix + p] = getattr(obj, p)
 
 
-def appendSpiArray(root, arrName, arr):
+def appendSpiArray(root, arrName, arr, *asElemArgs):
     if arr:
         elmArr = appendSpiElem(root, arrName)
         for o in arr:
-            elmArr.append(o.asElem())
+            elmArr.append(o.asElem(*asElemArgs))
+
+
+def writeSpiArray(w: PrettyXmlWriter, arrName, arr, *asElemArgs):
+    """
+    Streaming variant of :func:`~.appendSpiArray`
+    """
+    if arr:
+        w.start(spi_ns_prefix + arrName)
+        for o in arr:
+            w.element(o.asElem(*asElemArgs))
+        w.end()
+
+
+def writeStrElements(w: PrettyXmlWriter, obj, reqPropNames=[], optPropNames=[]):
+    """
+    Streaming variant of :func:`~.appendStrElements`
+    """
+    for p in reqPropNames:
+        text = getattr(obj, p)
+        assert text is not None, (obj, p)
+        w.textElement(spi_ns_prefix + p, text)
+    for p in optPropNames:
+        if hasattr(obj, p):
+            text = getattr(obj, p)
+            assert text is not None, (obj, p)
+            w.textElement(spi_ns_prefix + p, text)
@@ -0,0 +1,112 @@
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+from ipCorePackager.constants import INTF_DIRECTION
+
+
+class HwIOLeaf():
+    """
+    Record about the leaf of HwIO tree produced by :func:`~.iterHwIOLeafs`
+
+    :ivar ~.hwIO: the leaf HwIO instance
+    :ivar ~.logicalName: name from the name map which belongs to this leaf
+        (None if the name map was not specified)
+    :ivar ~.physicalName: name of the port in HDL (None if not resolved)
+    :ivar ~.direction: direction of the leaf (None if not resolved)
+    """
+    __slots__ = ["hwIO", "logicalName", "physicalName", "direction", "_path"]
+
+    def __init__(self, hwIO: "HwIO", logicalName: Optional[str],
+                 physicalName: Optional[str], direction: Optional[INTF_DIRECTION],
+                 path: Optional[tuple]):
+        self.hwIO = hwIO
+        self.logicalName = logicalName
+        self.physicalName = physicalName
+        self.direction = direction
+        self._path = path
+
+    @property
+    def path(self) -> Tuple[str, ...]:
+        """
+        Names of the HwIO instances on the way from the root (excluding) to this leaf
+        """
+        names = []
+        p = self._path
+        while p is not None:
+            p, n = p
+            names.append(n)
+        names.reverse()
+        return tuple(names)
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__:s} {'.'.join(self.path):s}"
+                f" {self.logicalName} {self.physicalName}"
+                f" {None if self.direction is None else self.direction.name}>")
+
+
+def iterHwIOLeafs(root: "HwIO", packager: "IpCorePackager",
+                  nameMap: Union[None, str, Dict]=None,
+                  onlyExtern: bool=False,
+                  mapKey: Optional[Callable[["HwIO"], str]]=None,
+                  resolvePorts: bool=True,
+                  compositeLeafs: bool=False) -> Iterator[HwIOLeaf]:
+    """
+    Iterate the leafs of the HwIO tree in order of definition without recursion,
+    each HwIO is visited exactly once
+
+    :param root: HwIO instance where the walk starts
+    :param packager: packager which is used to resolve names and directions
+    :param nameMap: None or logical name or dictionary of logical names of children
+        (:attr:`ipCorePackager.intfIpMeta.IntfIpMeta.map` format), if specified
+        the HwIO is a leaf when its item is a string
+    :param onlyExtern: if True the children which are not external are skipped
+    :param mapKey: function which returns the key for the child HwIO in the nameMap
+        (:meth:`ipCorePackager.packager.IpCorePackager.getInterfaceLogicalName` by default)
+    :param resolvePorts: if False the physical name and the direction of the leafs
+        are not resolved by the packager (they are None), for walks which need
+        just the structure of the tree
+    :param compositeLeafs: if True a string in the nameMap makes the HwIO a leaf
+        even if it has children (Quartus interface ports),
+        otherwise such nameMap is an error
+    """
+    if mapKey is None:
+        mapKey = packager.getInterfaceLogicalName
+    if resolvePorts:
+        physicalName = packager.getInterfacePhysicalName
+        direction = packager.getInterfaceDirection
+    useMap = nameMap is not None
+
+    # (HwIO, name map for it, path node), path node is (parent path node, name)
+    stack = [(root, nameMap, None)]
+    while stack:
+        hwIO, m, path = stack.pop()
+        if useMap and isinstance(m, str) and hwIO._hwIOs and not compositeLeafs:
+            raise Exception(
+                f"Interface {packager.getObjDebugName(hwIO):s} has children"
+                " but the ipcore interface class specifies a single name for it")
+        if (useMap and isinstance(m, str)) or (not useMap and not hwIO._hwIOs):
+            if resolvePorts:
+                yield HwIOLeaf(hwIO, m, physicalName(hwIO), direction(hwIO), path)
+            else:
+                yield HwIOLeaf(hwIO, m, None, None, path)
+            continue
+
+        if not hwIO._hwIOs:
+            raise Exception(
+                f"Interface {packager.getObjDebugName(hwIO):s} has no children"
+                " but the ipcore interface class specifies a dictionary for it")
+
+        for c in reversed(hwIO._hwIOs):
+            if onlyExtern and not c._isExtern:
+                continue
+            n = mapKey(c)
+            if useMap:
+                try:
+                    cm = m[n]
+                except KeyError:
+                    raise Exception(
+                        "Interface %s has interface %s which is not defined in ipcore interface class"
+                        % (packager.getObjDebugName(hwIO), n)
+                    )
+            else:
+                cm = None
+            stack.append((c, cm, (path, n)))
@@ -1,6 +1,7 @@
 from typing import List, Dict, Union
 
 from ipCorePackager.constants import INTF_DIRECTION
+from ipCorePackager.hwIOTree import iterHwIOLeafs
 from ipCorePackager.otherXmlObjs import Parameter
 from ipCorePackager.type import Type
 
@@ -16,6 +17,10 @@ class IntfIpMetaNotSpecifiedError(Exception):
     pass
 
 
+def _getHwIOName(hwIO: 'HwIO') -> str:
+    return hwIO._name
+
+
 class VALUE_RESOLVE:
     IMMEDIATE = "immediate"
     USER = "user"
@@ -49,14 +54,10 @@ class IntfIpMeta(Type):
             or dictionary to map child HwIO instances
         """
 
-        if isinstance(intfMapOrName, str):
+        for leaf in iterHwIOLeafs(thisIf, packager, intfMapOrName,
+                                  mapKey=_getHwIOName, compositeLeafs=True):
             self.quartus_add_interface_port(
-                buff, intfName, thisIf, intfMapOrName, packager)
-        else:
-            for thisIf_ in thisIf._hwIOs:
-                v = intfMapOrName[thisIf_._name]
-                self._asQuartusTcl(buff, version, intfName, component,
-                                   packager, thisIf_, v)
+                buff, intfName, leaf.hwIO, leaf.logicalName, packager)
 
     def asQuartusTcl(self, buff: List[str], version: str, component: "Component",
                      packager: "IpPackager", thisIf: 'HwIO'):
@@ -103,7 +104,7 @@ class IntfIpMeta(Type):
             return self.quartus_name
 
     def addWidthParam(self, thisIntfName: str, name: str, value, packager: "IpCorePackager"):
-        _, v_str, v_is_const = packager.serialzeValueToTCL(value, do_eval=True)
+        _, v_str, v_is_const = packager.typeCache.serialzeValueToTCL(value, do_eval=True)
         p = self.addSimpleParam(thisIntfName, name, v_str)
         if v_is_const:
             p.value.resolve = VALUE_RESOLVE.USER
@@ -182,7 +183,8 @@ class IntfIpMeta(Type):
         else:
             raise ValueError(d)
 
-        _, width, _ = packager.getTypeWidth(packager.getInterfaceType(signal), do_eval=True)
+        _, width, _ = packager.typeCache.getTypeWidth(
+            packager.getInterfaceType(signal), do_eval=True)
 
         phy_name = packager.getInterfacePhysicalName(signal)
         buff.append(f"add_interface_port {intfName:s} {phy_name:s} {logicName:s} {dir_:s} {width:s}")
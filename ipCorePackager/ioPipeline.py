@@ -0,0 +1,69 @@
+"""
+Execution of I/O tasks of the packaging on a thread pool
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+
+class IoPipeline():
+    """
+    Runs tasks immediately (if there are no workers) or on a thread pool.
+    Errors are reported in order of submission of the tasks,
+    so the reported error does not depend on the scheduling of the threads
+    and it is the same as if the tasks were executed immediately.
+
+    Use as a context manager, the exit waits for all tasks.
+    """
+
+    def __init__(self, workers: int=0):
+        """
+        :param workers: number of threads, 0 to run tasks immediately in the calling thread
+        """
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="ipCorePackager_io")
+        self._futures: List[Future] = []
+
+    @property
+    def isConcurrent(self) -> bool:
+        return self._executor is not None
+
+    def submit(self, fn: Callable, *args):
+        if self._executor is None:
+            fn(*args)
+        else:
+            self._futures.append(self._executor.submit(fn, *args))
+
+    def wait(self):
+        """
+        Wait for all submitted tasks
+
+        :raise: the exception of the first failed task (in order of submission)
+        """
+        futures = self._futures
+        self._futures = []
+        err = None
+        for f in futures:
+            e = f.exception()
+            if e is not None and err is None:
+                err = e
+        if err is not None:
+            raise err
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            # all tasks were submitted before the error of the calling thread (if any)
+            # occurred, their errors would be raised first if they were executed immediately
+            self.wait()
+        finally:
+            self.shutdown()
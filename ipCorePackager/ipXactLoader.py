@@ -0,0 +1,180 @@
+"""
+Loading of IP-XACT component.xml (IEEE 1685-2009 with Xilinx extensions)
+back to :class:`ipCorePackager.component.Component`
+
+The document is parsed by :func:`xml.etree.ElementTree.iterparse`,
+each item (port, bus interface, parameter, ...) is converted to the object
+by its fromElem method as soon as it is parsed and then it is removed from the tree,
+so only the currently parsed item is kept in memory.
+
+Elements which do not have a counterpart in the object model are ignored
+(e.g. memory maps, address spaces and non-wire ports are not loaded).
+"""
+import os
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from ipCorePackager.busInterface import BusInterface
+from ipCorePackager.component import Component
+from ipCorePackager.helpers import elmText, spi_ns_prefix
+from ipCorePackager.model import ModelParameter, View
+from ipCorePackager.otherXmlObjs import FileSet, Parameter, VendorExtensions, \
+    Value
+from ipCorePackager.port import Port
+import xml.etree.ElementTree as etree
+
+
+COMPONENT_FILE_NAME = "component.xml"
+_COMPONENT = spi_ns_prefix + "component"
+
+
+def _valueKey(v: Value) -> Tuple:
+    return tuple(getattr(v, n, None) for n in Value.__slots__)
+
+
+class _ComponentLoader():
+    """
+    Callbacks for the parsed elements of the component
+
+    :ivar ~.handlers: tuple of tags from the root to the element -> function(element)
+    """
+
+    def __init__(self, packager: Optional["IpPackager"]):
+        c = self.component = Component(packager)
+        # loaded ports share the type and vector objects, so they share
+        # the type in the PortTable
+        self._vectors: Dict[Tuple, List[Value]] = {}
+        self._types = {}
+
+        def s(*names):
+            return (_COMPONENT, *(spi_ns_prefix + n for n in names))
+
+        def strSetter(name):
+            def setStr(elm):
+                setattr(c, name, elmText(elm))
+            return setStr
+
+        model = c.model
+        self.handlers: Dict[Tuple[str, ...], Callable[[etree.Element], None]] = {
+            **{s(n): strSetter(n) for n in Component._strValues},
+            s("busInterfaces", "busInterface"):
+                lambda e: c.busInterfaces.append(BusInterface.fromElem(e)),
+            s("model", "views", "view"):
+                lambda e: model.views.append(View.fromElem(e)),
+            s("model", "ports", "port"): self._addPort,
+            s("model", "modelParameters", "modelParameter"):
+                lambda e: model.modelParameters.append(ModelParameter.fromElem(e)),
+            s("fileSets", "fileSet"): self._addFileSet,
+            s("parameters", "parameter"):
+                lambda e: c.parameters.append(Parameter.fromElem(e)),
+            s("vendorExtensions"): self._setVendorExtensions,
+        }
+
+    def _addPort(self, elm: etree.Element):
+        p = Port.fromElem(elm)
+        if p.type is not None:
+            k = (p.type.typeName, p.type.viewNameRefs)
+            p.type = self._types.setdefault(k, p.type)
+        if p.vector:
+            k = (_valueKey(p.vector[0]), _valueKey(p.vector[1]))
+            p.vector = self._vectors.setdefault(k, p.vector)
+        self.component.model.ports.append(p)
+
+    def _addFileSet(self, elm: etree.Element):
+        c = self.component
+        fs = FileSet.fromElem(elm)
+        c.fileSets.append(fs)
+        files = c._files
+        for f in fs.files:
+            if f.name not in files:
+                files.append(f.name)
+
+    def _setVendorExtensions(self, elm: etree.Element):
+        self.component.vendorExtensions = VendorExtensions.fromElem(elm)
+
+    def load(self, source: Union[str, BinaryIO]) -> Component:
+        handlers = self.handlers
+        maxDepth = max(len(k) for k in handlers.keys())
+        stack: List[etree.Element] = []
+        for event, elm in etree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if not stack and elm.tag != _COMPONENT:
+                    raise ValueError("Not an IP-XACT component", elm.tag)
+                stack.append(elm)
+                continue
+
+            depth = len(stack)
+            handled = False
+            if depth <= maxDepth:
+                h = handlers.get(tuple(e.tag for e in stack), None)
+                if h is not None:
+                    h(elm)
+                    handled = True
+            stack.pop()
+            if handled or depth == 2:
+                # the element is the last child of its parent, release it
+                del stack[-1][-1]
+
+        return self.component
+
+
+def loadComponent(source: Union[str, BinaryIO],
+                  packager: Optional["IpPackager"]=None) -> Component:
+    """
+    Load component from IP-XACT component.xml
+
+    The loaded component produces the same IP-XACT (:meth:`Component.ip_xact`,
+    :meth:`Component.write_ip_xact`) if the file was generated by this library.
+    The bus interfaces are loaded as :class:`ipCorePackager.busInterface.BusInterface`
+    objects and the file sets are used as they are, the Quartus _hw.tcl of the loaded
+    component does not contain interfaces (they are generated from the interfaces of the design).
+
+    :param source: file name or binary stream with the XML
+    :param packager: packager which should be used by the component (optional)
+    :raise ValueError: if the document is not an IP-XACT component
+        or if it contains constructs which can not be represented
+    """
+    return _ComponentLoader(packager).load(source)
+
+
+def iterComponentFiles(repoDir: str):
+    """
+    :return: generator of paths of component.xml files in repository directory
+        (in sorted order), subdirectories of the directory of the IP-core are not searched
+    """
+    dirs = [repoDir]
+    while dirs:
+        d = dirs.pop()
+        subDirs = []
+        isCore = False
+        with os.scandir(d) as it:
+            for e in sorted(it, key=lambda e: e.name):
+                if e.name == COMPONENT_FILE_NAME:
+                    isCore = True
+                    yield e.path
+                elif not isCore and e.is_dir(follow_symlinks=False):
+                    subDirs.append(e.path)
+        if not isCore:
+            dirs.extend(reversed(subDirs))
+
+
+def loadRepository(repoDir: str, packager: Optional["IpPackager"]=None,
+                   onError: Optional[Callable[[str, Exception], None]]=None
+                   ) -> List[Tuple[str, Component]]:
+    """
+    Load all components from IP repository directory
+
+    :param onError: function(file name, exception) called if the component
+        can not be loaded, if not specified the exception is raised
+    :return: list of tuples (path of component.xml, component)
+    """
+    res = []
+    for f in iterComponentFiles(repoDir):
+        try:
+            c = loadComponent(f, packager)
+        except (ValueError, KeyError, AttributeError, etree.ParseError) as e:
+            if onError is None:
+                raise
+            onError(f, e)
+            continue
+        res.append((f, c))
+    return res
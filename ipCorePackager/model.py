@@ -1,16 +1,21 @@
-from typing import List
+from typing import Optional
 
 from ipCorePackager.helpers import appendSpiElem, \
-    appendStrElements, findS, mkSpiElm, spi_ns_prefix, appendSpiArray
+    appendStrElements, elmText, findS, mkSpiElm, spi_ns_prefix, appendSpiArray, \
+    writeSpiArray
+from ipCorePackager.xmlWriter import PrettyXmlWriter
 from ipCorePackager.otherXmlObjs import Value
+from ipCorePackager.port import Port, PortTable
 import xml.etree.ElementTree as etree
 
 
 class FileSetRef():
+    __slots__ = ["localName"]
+
     @classmethod
     def fromElem(cls, elm):
         self = cls()
-        self.localName = findS(elm, 'localName').text
+        self.localName = elmText(findS(elm, 'localName'))
         return self
 
     def asElem(self):
@@ -20,6 +25,8 @@ class FileSetRef():
 
 
 class View():
+    __slots__ = ["name", "displayName", "envIdentifier", "language", "modelName",
+                 "fileSetRef"]
     _requiredVal = ["name", "displayName", "envIdentifier"]
     _optionalVal = ["language", "modelName"]
 
@@ -30,14 +37,18 @@ class View():
             e = findS(elm, n)
             if e is None:
                 raise Exception("View is missing " + n)
-            setattr(self, n, e.text)
+            setattr(self, n, elmText(e))
         for n in self._optionalVal:
             e = findS(elm, n)
             if e is None:
                 continue
-            setattr(self, n, e.text)
+            setattr(self, n, elmText(e))
 
-        self.fileSetRef = FileSetRef.fromElem(findS(elm, "fileSetRef"))
+        fsr = findS(elm, "fileSetRef")
+        if fsr is None:
+            self.fileSetRef = None
+        else:
+            self.fileSetRef = FileSetRef.fromElem(fsr)
         return self
 
     def asElem(self):
@@ -45,11 +56,54 @@ class View():
         appendStrElements(e, self,
                           reqPropNames=self._requiredVal,
                           optPropNames=self._optionalVal)
-        e.append(self.fileSetRef.asElem())
+        if self.fileSetRef is not None:
+            e.append(self.fileSetRef.asElem())
         return e
 
 
+class ViewTemplate():
+    """
+    Immutable description of a view of the model
+
+    :ivar ~.fileSet: name of the attribute of :class:`~.Model` with the name
+        of the file set of this view
+        ("any_syn_fileSetName", "any_sim_fileSetName" or "tcl_fileSetName")
+    """
+    __slots__ = ["name", "displayName", "envIdentifier", "fileSet"]
+
+    def __init__(self, name: str, displayName: str, envIdentifier: str, fileSet: str):
+        self.name = name
+        self.displayName = displayName
+        self.envIdentifier = envIdentifier
+        self.fileSet = fileSet
+
+    def instantiate(self, model: "Model", modelName: str) -> View:
+        v = View()
+        v.name = self.name
+        v.displayName = self.displayName
+        v.envIdentifier = self.envIdentifier
+        v.modelName = modelName
+        fsr = v.fileSetRef = FileSetRef()
+        fsr.localName = getattr(model, self.fileSet)
+        return v
+
+
+# https://adaptivesupport.amd.com/s/question/0D52E00006hpUquSAE/create-custom-ip-vhdl2008
+# https://adaptivesupport.amd.com/s/question/0D52E00006iHl8JSAS/issue-packaging-a-vhdl-2008-ip-in-vivado-20162
+# https://adaptivesupport.amd.com/s/article/68737?language=en_US
+DEFAULT_VIEW_TEMPLATES = (
+    ViewTemplate("xilinx_anylanguagesynthesis", "Synthesis",
+                 "vhdlSource:vivado.xilinx.com:synthesis", "any_syn_fileSetName"),
+    ViewTemplate("xilinx_anylanguagebehavioralsimulation", "Simulation",
+                 "vhdlSource:vivado.xilinx.com:simulation", "any_sim_fileSetName"),
+    ViewTemplate("xilinx_xpgui", "UI Layout",
+                 ":vivado.xilinx.com:xgui.ui", "tcl_fileSetName"),
+)
+
+
 class ModelParameter():
+    __slots__ = ["name", "displayName", "datatype", "value"]
+
     def __init__(self, name: str, displayName: str, datatype: str,
                  value: Value):
         self.name = name
@@ -66,9 +120,25 @@ class ModelParameter():
 
         return cls(name,
                    name.replace("_", " "),
-                   packager.serializeType(gType).lower(),
+                   packager.typeCache.serializeType(gType).lower(),
                    val)
 
+    @classmethod
+    def fromElem(cls, elm):
+        name = elmText(findS(elm, "name"))
+        dn = findS(elm, "displayName")
+        return cls(name,
+                   name if dn is None else elmText(dn),
+                   elm.attrib.get(spi_ns_prefix + "dataType", ""),
+                   Value.fromElem(findS(elm, "value")))
+
+    @classmethod
+    def fromParamTableRow(cls, row: "ParamTableRow"):
+        return cls(row.name,
+                   row.name.replace("_", " "),
+                   row.typeName,
+                   row.modelValue)
+
     def asElem(self):
         e = mkSpiElm("modelParameter")
         e.attrib["spirit:dataType"] = self.datatype
@@ -84,71 +154,68 @@ class Model():
                  any_syn_fileSetName, any_sim_fileSetName, tcl_fileSetName):
         self._packager = packager
         self.views = []
-        self.ports = []
+        self.ports = PortTable()
         self.modelParameters = []
         self.any_syn_fileSetName = any_syn_fileSetName
         self.any_sim_fileSetName = any_sim_fileSetName
         self.tcl_fileSetName = tcl_fileSetName
 
-    def addDefaultViews(self, name: str, parameters: List['Param']):
-        # https://adaptivesupport.amd.com/s/question/0D52E00006hpUquSAE/create-custom-ip-vhdl2008
-        # https://adaptivesupport.amd.com/s/question/0D52E00006iHl8JSAS/issue-packaging-a-vhdl-2008-ip-in-vivado-20162
-        # https://adaptivesupport.amd.com/s/article/68737?language=en_US
-        viewsTemplate = ("""
-<views xmlns:xilinx="http://www.xilinx.com" xmlns:spirit="http://www.spiritconsortium.org/XMLSchema/SPIRIT/1685-2009" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
-  <spirit:view>
-    <spirit:name>xilinx_anylanguagesynthesis</spirit:name>
-    <spirit:displayName>Synthesis</spirit:displayName>
-    <spirit:envIdentifier>vhdlSource:vivado.xilinx.com:synthesis</spirit:envIdentifier>
-    <spirit:modelName>{0}</spirit:modelName>
-    <spirit:fileSetRef>
-      <spirit:localName>""" + self.any_syn_fileSetName + """</spirit:localName>
-    </spirit:fileSetRef>
-  </spirit:view>
-  <spirit:view>
-    <spirit:name>xilinx_anylanguagebehavioralsimulation</spirit:name>
-    <spirit:displayName>Simulation</spirit:displayName>
-    <spirit:envIdentifier>vhdlSource:vivado.xilinx.com:simulation</spirit:envIdentifier>
-    <spirit:modelName>{0}</spirit:modelName>
-    <spirit:fileSetRef>
-      <spirit:localName>""" + self.any_sim_fileSetName + """</spirit:localName>
-    </spirit:fileSetRef>
-  </spirit:view>
-  <spirit:view>
-    <spirit:name>xilinx_xpgui</spirit:name>
-    <spirit:displayName>UI Layout</spirit:displayName>
-    <spirit:envIdentifier>:vivado.xilinx.com:xgui.ui</spirit:envIdentifier>
-    <spirit:fileSetRef>
-      <spirit:localName>""" + self.tcl_fileSetName + """</spirit:localName>
-    </spirit:fileSetRef>
-  </spirit:view>
-</views>
-        """).format(name)
-        for v in etree.fromstring(viewsTemplate):
-            v = View.fromElem(v)
-            v.modelName = name
-            self.views.append(v)
-
-        pack = self._packager
-        for p in parameters:
-            mp = ModelParameter.fromParam(p, pack)
+    def addDefaultViews(self, name: str, parameters: "ParamTable"):
+        """
+        Add views from :attr:`ipCorePackager.packager.IpCorePackager.viewTemplates`
+        and model parameters
+
+        :param name: name of the top module
+        :param parameters: parameters of the top module
+            (:see: :meth:`ipCorePackager.packager.IpCorePackager.getParamTable`)
+        """
+        for t in self._packager.viewTemplates:
+            self.views.append(t.instantiate(self, name))
+
+        for row in parameters:
+            mp = ModelParameter.fromParamTableRow(row)
             self.modelParameters.append(mp)
 
-    # @classmethod
-    # def fromElem(cls, elm):
-    #    self = cls()
-    #    views = findS(elm, "views")
-    #    for vElm in views:
-    #        self.views.append(View.fromElem(vElm))
-    #    ports = findS(elm, "ports")
-    #    for p in ports:
-    #        self.ports.append(Port.fromElem(p))
-    #    return self
+    @classmethod
+    def fromElem(cls, packager: Optional["IpPackager"], elm):
+        """
+        :note: file set names are not known, the default views can not be added
+        """
+        self = cls(packager, None, None, None)
+        views = findS(elm, "views")
+        if views is not None:
+            for vElm in views:
+                self.views.append(View.fromElem(vElm))
+        ports = findS(elm, "ports")
+        if ports is not None:
+            for p in ports:
+                self.ports.append(Port.fromElem(p))
+        modelParameters = findS(elm, "modelParameters")
+        if modelParameters is not None:
+            for p in modelParameters:
+                self.modelParameters.append(ModelParameter.fromElem(p))
+        return self
 
     def asElem(self):
         e = mkSpiElm("model")
         appendSpiArray(e, 'views', self.views)
-        appendSpiArray(e, 'ports', self.ports)
+        appendSpiArray(e, 'ports', self.ports, self._packager)
         appendSpiArray(e, 'modelParameters', self.modelParameters)
 
         return e
+
+    def write_ip_xact(self, w: PrettyXmlWriter):
+        """
+        Streaming variant of :meth:`~.asElem`
+        """
+        if not (self.views or self.ports or self.modelParameters):
+            w.element(mkSpiElm("model"))
+            return
+        w.start(spi_ns_prefix + "model")
+        writeSpiArray(w, 'views', self.views)
+        if self.ports:
+            w.start(spi_ns_prefix + 'ports')
+            self.ports.write_ip_xact(w, self._packager)
+            w.end()
+        writeSpiArray(w, 'modelParameters', self.modelParameters)
+        w.end()
@@ -1,8 +1,11 @@
 import os
-from time import gmtime, strftime
+from time import gmtime, strftime, strptime
+from typing import Optional
 
+from ipCorePackager.fileKinds import DEFAULT_FILE_KINDS
 from ipCorePackager.helpers import spi_ns_prefix, mkSpiElm, \
-    appendSpiElem, appendStrElements, mkXiElm, appendXiElem, appendSpiAtribs
+    appendSpiElem, appendStrElements, mkXiElm, appendXiElem, appendSpiAtribs, \
+    elmText, findS, findX, xi_ns_prefix
 
 
 class Value():
@@ -11,35 +14,46 @@ class Value():
     RESOLVE_GENERATED = "generated"
     RESOLVE_USER = "user"
 
-    # @classmethod
-    # def fromElem(cls, elm):
-    #     self = cls()
-    #     self.id = elm.attrib[spi_ns_prefix + 'id']
-    #     self.text = elm.text
-    #     self.resolve = elm.attrib[spi_ns_prefix + 'resolve']
-    #     self.dependency = elm.attrib[spi_ns_prefix + 'dependency']
-    #     for n in ['format', 'bitStringLength']:
-    #         try:
-    #             value = elm.attrib[spi_ns_prefix + n]
-    #             setattr(self, n, value)
-    #         except KeyError:
-    #             pass
-    #     return self
+    @classmethod
+    def fromElem(cls, elm):
+        """
+        :note: only the attributes which are present are set
+        """
+        self = cls()
+        self.text = elmText(elm)
+        attrib = elm.attrib
+        for n in ['id', 'format', 'bitStringLength', 'resolve', 'dependency']:
+            try:
+                value = attrib[spi_ns_prefix + n]
+            except KeyError:
+                continue
+            setattr(self, n, value)
+        return self
 
     def asElem(self):
         e = mkSpiElm("value")
         appendSpiAtribs(self, e, spi_ns_prefix, reqPropNames=['id'],
-                        optPropNames=['format', 'bitStringLength', 'resolve'])
+                        optPropNames=['format', 'bitStringLength', 'resolve',
+                                      'dependency'])
 
         e.text = str(self.text)
         return e
 
 
 class FileSet():
+    __slots__ = ["name", "files"]
+
     def __init__(self):
         self.name = ""
         self.files = []
 
+    @classmethod
+    def fromElem(cls, elm):
+        self = cls()
+        self.name = elmText(findS(elm, "name"))
+        self.files = [File.fromElem(f) for f in elm.findall(spi_ns_prefix + "file")]
+        return self
+
     def asElem(self):
         e = mkSpiElm("fileSet")
         appendSpiElem(e, "name").text = self.name
@@ -49,6 +63,7 @@ class FileSet():
 
 
 class File():
+    __slots__ = ["name", "fileType", "userFileType"]
     _strValues = ["name", "fileType", "userFileType"]
 
     def __init__(self):
@@ -57,25 +72,37 @@ class File():
         self.userFileType = ""
 
     @classmethod
-    def fromFileName(cls, fileName):
+    def fromFileName(cls, fileName, kind: Optional["FileKind"]=None):
+        """
+        :param kind: kind of the file, if not specified it is resolved from
+            :data:`ipCorePackager.fileKinds.DEFAULT_FILE_KINDS`
+        :raise KeyError: if the kind of the file is not known
+        """
+        if kind is None:
+            kind = DEFAULT_FILE_KINDS.classify(fileName)
+            if kind is None:
+                raise KeyError(os.path.splitext(fileName.lower())[1])
         self = cls()
-        IMPORTED_FILE = "IMPORTED_FILE"
-        extDict = {
-            ".vhd": ("vhdlSource", IMPORTED_FILE),
-            ".tcl": ("tclSource", "XGUI_VERSION_2"),
-            ".v":   ("verilogSource", IMPORTED_FILE),
-            ".xdc": (None, "xdc"),
-        }
-        fileType = extDict[os.path.splitext(fileName.lower())[1]]
-        if fileType[0] is None:
+        if kind.ipXactFileType is None:
             del self.fileType
         else:
-            self.fileType = fileType[0]
+            self.fileType = kind.ipXactFileType
 
-        self.userFileType = fileType[1]
+        self.userFileType = kind.ipXactUserFileType
         self.name = fileName
         return self
 
+    @classmethod
+    def fromElem(cls, elm):
+        self = cls()
+        for n in cls._strValues:
+            e = findS(elm, n)
+            if e is None:
+                delattr(self, n)
+            else:
+                setattr(self, n, elmText(e))
+        return self
+
     def asElem(self):
         e = mkSpiElm("file")
         appendStrElements(
@@ -92,13 +119,12 @@ class Parameter():
         self.name = ""
         self.value = Value()
 
-    # @classmethod
-    # def fromElem(cls, elm):
-    #    self = cls()
-    #    self.name = elm.find('spirit:name', ns).text
-    #    v = elm.find('spirit:value', ns)
-    #    self.value = Value.fromElem(v)
-    #    return self
+    @classmethod
+    def fromElem(cls, elm):
+        self = cls()
+        self.name = elmText(findS(elm, 'name'))
+        self.value = Value.fromElem(findS(elm, 'value'))
+        return self
 
     def asElem(self):
         e = mkSpiElm("parameter")
@@ -135,7 +161,16 @@ class Parameter():
         ])
 
 
+_CORE_CREATION_DATE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
 class CoreExtensions():
+    """
+    :ivar ~.displayName: display name, if empty the name is derived from the component
+    :ivar ~.coreRevision: revision, if empty the revision is derived from the timestamp
+        of the component
+    """
+
     def __init__(self):
         self.supportedFamilies = {
             "zynq": "Production",
@@ -150,6 +185,27 @@ class CoreExtensions():
         self.coreRevision = ""
         self.coreCreationDateTime = gmtime()
 
+    @classmethod
+    def fromElem(cls, elm):
+        self = cls()
+        self.supportedFamilies = {}
+        sf = findX(elm, "supportedFamilies")
+        if sf is not None:
+            for f in sf:
+                self.supportedFamilies[elmText(f)] = f.attrib.get(xi_ns_prefix + "lifeCycle", "")
+        self.taxonomies = []
+        ta = findX(elm, "taxonomies")
+        if ta is not None:
+            self.taxonomies = [elmText(t) for t in ta]
+        for n in ["displayName", "coreRevision"]:
+            e = findX(elm, n)
+            if e is not None:
+                setattr(self, n, elmText(e))
+        e = findX(elm, "coreCreationDateTime")
+        if e is not None:
+            self.coreCreationDateTime = strptime(elmText(e), _CORE_CREATION_DATE_TIME_FORMAT)
+        return self
+
     def asElem(self, displayName, revision):
         r = mkXiElm("coreExtensions")
         sf = appendXiElem(r, "supportedFamilies")
@@ -165,7 +221,7 @@ class CoreExtensions():
         appendXiElem(r, "displayName").text = displayName
         appendXiElem(r, "coreRevision").text = revision
         appendXiElem(r, "coreCreationDateTime").text = strftime(
-            "%Y-%m-%dT%H:%M:%SZ", self.coreCreationDateTime)
+            _CORE_CREATION_DATE_TIME_FORMAT, self.coreCreationDateTime)
         return r
 
 
@@ -177,6 +233,19 @@ class VendorExtensions():
         self.coreExtensions = CoreExtensions()
         self.packagingInfo = {"xilinxVersion": self.XILINX_VERSION}
 
+    @classmethod
+    def fromElem(cls, elm):
+        self = cls()
+        ce = findX(elm, "coreExtensions")
+        if ce is not None:
+            self.coreExtensions = CoreExtensions.fromElem(ce)
+        self.packagingInfo = {}
+        pi = findX(elm, "packagingInfo")
+        if pi is not None:
+            for e in pi:
+                self.packagingInfo[e.tag[len(xi_ns_prefix):]] = elmText(e)
+        return self
+
     def asElem(self, displayName, revision):
         r = mkSpiElm("vendorExtensions")
         r.append(self.coreExtensions.asElem(displayName, revision))
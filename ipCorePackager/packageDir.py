@@ -0,0 +1,385 @@
+from contextlib import contextmanager
+from hashlib import sha256
+import json
+import os
+import shutil
+import tempfile
+from threading import Lock
+from typing import Callable, ContextManager, Dict, List, Optional, TextIO, Tuple
+
+from ipCorePackager.filePlacement import FILE_PLACEMENT, placeFile
+
+
+MANIFEST_FILE_NAME = ".ipCorePackager_manifest.json"
+# version of the manifest format and of the layout of the package,
+# if it changes the packages are rebuilt
+MANIFEST_FORMAT = 1
+
+
+def fileDigest(fileName: str, blockSize: int=1 << 20) -> str:
+    """
+    :return: hexadecimal sha256 digest of file content
+    """
+    h = sha256()
+    with open(fileName, "rb") as f:
+        while True:
+            b = f.read(blockSize)
+            if not b:
+                break
+            h.update(b)
+    return h.hexdigest()
+
+
+def _statKey(fileName: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(fileName)
+    except FileNotFoundError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+class FileRecord():
+    """
+    Content digest of a file together with the stat information
+    which was valid when the digest was computed
+    (so the file does not have to be read to check if it changed)
+    """
+    __slots__ = ["digest", "size", "mtime_ns"]
+
+    def __init__(self, digest: str, size: int, mtime_ns: int):
+        self.digest = digest
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def fromFile(cls, fileName: str, digest: Optional[str]=None):
+        st = os.stat(fileName)
+        if digest is None:
+            digest = fileDigest(fileName)
+        return cls(digest, st.st_size, st.st_mtime_ns)
+
+    def isValidFor(self, fileName: str) -> bool:
+        """
+        :return: True if the file was not modified since this record was created
+        """
+        return _statKey(fileName) == (self.size, self.mtime_ns)
+
+    def toJson(self):
+        return [self.digest, self.size, self.mtime_ns]
+
+    @classmethod
+    def fromJson(cls, v):
+        return cls(*v)
+
+
+class PackageManifest():
+    """
+    Content hashes of inputs and outputs of IP-core package,
+    stored in the package directory and used for incremental packaging
+
+    :ivar ~.inputsDigest: digest of all inputs of the packaging
+        (None if the inputs can not be fingerprinted)
+    :ivar ~.designFingerprint: fingerprint of the design from which HDL was generated
+    :ivar ~.sources: absolute path of extra file -> :class:`~.FileRecord`
+    :ivar ~.outputs: path relative to package directory -> :class:`~.FileRecord`
+    :ivar ~.hdlFiles: paths of HDL files relative to package directory (in compile order)
+    :ivar ~.generatedHdlFiles: paths of files generated by toHdlConversion
+        relative to package directory
+    """
+
+    def __init__(self):
+        self.inputsDigest: Optional[str] = None
+        self.designFingerprint: Optional[str] = None
+        self.sources: Dict[str, FileRecord] = {}
+        self.outputs: Dict[str, FileRecord] = {}
+        self.hdlFiles: List[str] = []
+        self.generatedHdlFiles: List[str] = []
+
+    @classmethod
+    def load(cls, fileName: str) -> Optional["PackageManifest"]:
+        """
+        :return: loaded manifest or None if the file does not exist or is not valid
+        """
+        try:
+            with open(fileName) as f:
+                d = json.load(f)
+            if d["format"] != MANIFEST_FORMAT:
+                return None
+            self = cls()
+            self.inputsDigest = d["inputsDigest"]
+            self.designFingerprint = d["designFingerprint"]
+            self.sources = {k: FileRecord.fromJson(v) for k, v in d["sources"].items()}
+            self.outputs = {k: FileRecord.fromJson(v) for k, v in d["outputs"].items()}
+            self.hdlFiles = d["hdlFiles"]
+            self.generatedHdlFiles = d["generatedHdlFiles"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return self
+
+    def save(self, fileName: str):
+        d = {
+            "format": MANIFEST_FORMAT,
+            "inputsDigest": self.inputsDigest,
+            "designFingerprint": self.designFingerprint,
+            "sources": {k: v.toJson() for k, v in sorted(self.sources.items())},
+            "outputs": {k: v.toJson() for k, v in sorted(self.outputs.items())},
+            "hdlFiles": self.hdlFiles,
+            "generatedHdlFiles": self.generatedHdlFiles,
+        }
+        tmp = fileName + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(d, f, indent=1)
+        os.replace(tmp, fileName)
+
+
+class _HashingWriter():
+    """
+    Text stream wrapper which computes digest of written data
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._h = sha256()
+
+    def write(self, s: str):
+        self._h.update(s.encode("utf-8"))
+        return self._f.write(s)
+
+    def hexdigest(self):
+        return self._h.hexdigest()
+
+
+class PackageDir():
+    """
+    Directory where files of IP-core package are written,
+    the directory is wiped before the packaging starts
+
+    :note: :meth:`~.placeFile` and :meth:`~.openText` may be called
+        from multiple threads for different files
+
+    :ivar ~.root: path of the package directory
+    :ivar ~.filePlacement: method used to place extra files to package
+    :ivar ~.placementStats: counter of files for each placement method which was actually used
+    """
+
+    def __init__(self, root: str, filePlacement: FILE_PLACEMENT=FILE_PLACEMENT.COPY):
+        self.root = root
+        self.filePlacement = filePlacement
+        self.placementStats: Dict[FILE_PLACEMENT, int] = {}
+        # files may be placed from multiple threads
+        self._lock = Lock()
+
+    def path(self, relPath: str) -> str:
+        return os.path.join(self.root, relPath)
+
+    def prepare(self):
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root)
+        os.makedirs(self.root)
+
+    @contextmanager
+    def openText(self, relPath: str):
+        """
+        Open file in package for writing of text
+        """
+        fileName = self.path(relPath)
+        os.makedirs(os.path.dirname(fileName), exist_ok=True)
+        with open(fileName, "w", encoding="utf-8") as f:
+            yield f
+
+    def placeFile(self, src: str, relPath: str):
+        """
+        Copy/link file to package (:see: :attr:`~.filePlacement`)
+        """
+        dst = self.path(relPath)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        used = placeFile(src, dst, self.filePlacement)
+        with self._lock:
+            self.placementStats[used] = self.placementStats.get(used, 0) + 1
+
+    def fileSize(self, relPath: str) -> int:
+        """
+        :return: size of the file in package in bytes
+        """
+        return os.path.getsize(self.path(relPath))
+
+    def convertHdl(self, conversionFn: Callable[[str], List[str]],
+                   relDir: str, designFingerprint: Optional[str],
+                   streamConversionFn: Optional[Callable[
+                       [Callable[[str], ContextManager[TextIO]]], List[str]]]=None
+                   ) -> List[str]:
+        """
+        :param conversionFn: function which stores HDL files to directory specified in argument
+            and returns list of paths of generated files
+        :param relDir: directory in package where the HDL files should be stored
+        :param streamConversionFn: optional function which writes HDL files using the function
+            openText(file name relative to relDir) from argument and returns list of relative
+            file names, it is used instead of conversionFn if the package is not
+            in the file system (:see: :class:`ipCorePackager.archivePackageDir.ArchivePackageDir`)
+        :return: list of absolute paths of HDL files
+        """
+        path = self.path(relDir)
+        os.makedirs(path, exist_ok=True)
+        return conversionFn(path)
+
+    def finish(self):
+        pass
+
+
+class IncrementalPackageDir(PackageDir):
+    """
+    :class:`~.PackageDir` which does not touch files which did not change
+    since the last packaging and removes only the stale files
+    (uses :class:`~.PackageManifest` stored in the package directory)
+
+    :note: If the directory exists but it does not contain a valid manifest
+        it is wiped as in non incremental mode.
+    """
+
+    def __init__(self, root: str, filePlacement: FILE_PLACEMENT=FILE_PLACEMENT.COPY):
+        super(IncrementalPackageDir, self).__init__(root, filePlacement)
+        self.manifestFile = self.path(MANIFEST_FILE_NAME)
+        old = PackageManifest.load(self.manifestFile)
+        if old is None:
+            old = PackageManifest()
+            self._wipe = True
+        else:
+            self._wipe = False
+        self.oldManifest = old
+        self.manifest = PackageManifest()
+
+    def sourceDigest(self, src: str) -> str:
+        """
+        :return: digest of input file (from manifest if the file was not modified)
+        """
+        src = os.path.abspath(src)
+        r = self.manifest.sources.get(src, None)
+        if r is None:
+            r = self.oldManifest.sources.get(src, None)
+            if r is None or not r.isValidFor(src):
+                r = FileRecord.fromFile(src)
+            self.manifest.sources[src] = r
+        return r.digest
+
+    def _isIntact(self, relPath: str) -> bool:
+        r = self.oldManifest.outputs.get(relPath, None)
+        return r is not None and r.isValidFor(self.path(relPath))
+
+    def isUpToDate(self, inputsDigest: Optional[str]) -> bool:
+        """
+        :return: True if the package was generated from the same inputs
+            and none of its files was modified since
+        """
+        old = self.oldManifest
+        return (inputsDigest is not None
+                and old.inputsDigest == inputsDigest
+                and all(self._isIntact(f) for f in old.outputs.keys()))
+
+    def prepare(self):
+        if self._wipe:
+            super(IncrementalPackageDir, self).prepare()
+        else:
+            os.makedirs(self.root, exist_ok=True)
+
+    def _keep(self, relPath: str) -> bool:
+        """
+        Keep file from previous packaging if its content is same
+
+        :return: True if the file was kept
+        """
+        if self._isIntact(relPath):
+            self.manifest.outputs[relPath] = self.oldManifest.outputs[relPath]
+            return True
+        return False
+
+    def _adopt(self, tmpFile: str, relPath: str, digest: str):
+        """
+        Move temporary file to its location in package if its content differs
+        """
+        dst = self.path(relPath)
+        old = self.oldManifest.outputs.get(relPath, None)
+        if old is not None and old.digest == digest and old.isValidFor(dst):
+            os.remove(tmpFile)
+            self.manifest.outputs[relPath] = old
+        elif old is None and os.path.isfile(dst) and fileDigest(dst) == digest:
+            # file of the same content exists but it was not generated by us
+            os.remove(tmpFile)
+            self.manifest.outputs[relPath] = FileRecord.fromFile(dst, digest)
+        else:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            os.replace(tmpFile, dst)
+            self.manifest.outputs[relPath] = FileRecord.fromFile(dst, digest)
+
+    @contextmanager
+    def openText(self, relPath: str):
+        dst = self.path(relPath)
+        d = os.path.dirname(dst)
+        os.makedirs(d, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".", suffix=".tmp")
+        try:
+            with open(fd, "w", encoding="utf-8") as f:
+                hf = _HashingWriter(f)
+                yield hf
+            self._adopt(tmp, relPath, hf.hexdigest())
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def placeFile(self, src: str, relPath: str):
+        srcDigest = self.sourceDigest(src)
+        old = self.oldManifest.outputs.get(relPath, None)
+        if old is not None and old.digest == srcDigest and self._keep(relPath):
+            return
+        super(IncrementalPackageDir, self).placeFile(src, relPath)
+        self.manifest.outputs[relPath] = FileRecord.fromFile(self.path(relPath), srcDigest)
+
+    def convertHdl(self, conversionFn: Callable[[str], List[str]],
+                   relDir: str, designFingerprint: Optional[str],
+                   streamConversionFn: Optional[Callable[
+                       [Callable[[str], ContextManager[TextIO]]], List[str]]]=None
+                   ) -> List[str]:
+        old = self.oldManifest
+        m = self.manifest
+        m.designFingerprint = designFingerprint
+        if designFingerprint is not None and designFingerprint == old.designFingerprint\
+                and all(self._isIntact(f) for f in old.generatedHdlFiles):
+            # the design did not change, reuse files from previous run
+            for f in old.generatedHdlFiles:
+                self._keep(f)
+            m.generatedHdlFiles = list(old.generatedHdlFiles)
+            return [self.path(f) for f in old.generatedHdlFiles]
+
+        # generate to a staging directory and move only the files which changed
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix=".staging_")
+        try:
+            res = []
+            for f in conversionFn(staging):
+                relPath = os.path.join(relDir, os.path.relpath(f, staging))
+                self._adopt(f, relPath, fileDigest(f))
+                m.generatedHdlFiles.append(relPath)
+                res.append(self.path(relPath))
+            return res
+        finally:
+            shutil.rmtree(staging)
+
+    def finish(self):
+        """
+        Remove files which were generated by previous packaging but not by this
+        one and save the manifest
+        """
+        for f in self.oldManifest.outputs.keys():
+            if f not in self.manifest.outputs:
+                fileName = self.path(f)
+                if os.path.isfile(fileName):
+                    os.remove(fileName)
+                # remove directories which became empty
+                d = os.path.dirname(fileName)
+                while os.path.normpath(d) != os.path.normpath(self.root):
+                    try:
+                        os.rmdir(d)
+                    except OSError:
+                        break
+                    d = os.path.dirname(d)
+
+        self.manifest.save(self.manifestFile)
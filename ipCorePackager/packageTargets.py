@@ -0,0 +1,117 @@
+"""
+Output files (targets) of IP-core package which can be selected in
+:meth:`ipCorePackager.packager.IpCorePackager.createPackage`
+"""
+from typing import Callable, Dict, Iterable, List, Optional, TextIO
+
+
+class PACKAGE_TARGET:
+    """
+    Names of default targets
+
+    :cvar IPXACT: component.xml (Vivado)
+    :cvar XGUI: xgui/gui.tcl (Vivado GUI of the parameters)
+    :cvar QUARTUS: component_hw.tcl (Quartus)
+    """
+    IPXACT = "ipxact"
+    XGUI = "xgui"
+    QUARTUS = "quartus"
+
+
+class PackageTarget():
+    """
+    Output file of IP-core package
+
+    :ivar ~.name: name used to select the target
+    :ivar ~.relPath: path of the file relative to the package directory
+    :ivar ~.write: function(packager, run, out) which writes the file to the text stream
+        (run is :class:`ipCorePackager.packager.PackagingRun`)
+    :ivar ~.needsComponent: if True the :class:`ipCorePackager.component.Component`
+        has to be built for the target (:attr:`~.PackagingRun.component`)
+    :ivar ~.needsModel: if True the target uses the views and ports of the model
+        and the port maps of the component (IP-XACT), they are not built otherwise
+    :ivar ~.inFileSets: if True the file is listed in the file sets of the IP-core
+    :ivar ~.listsFiles: if True the content depends on the list of files of the package
+        (the file is rewritten if the list changes, :see: :mod:`ipCorePackager.watch`)
+    :ivar ~.phaseName: name of the phase in :class:`ipCorePackager.stats.PackagingStats`
+    """
+    __slots__ = ["name", "relPath", "write", "needsComponent", "inFileSets",
+                 "listsFiles", "phaseName", "needsModel"]
+
+    def __init__(self, name: str, relPath: str,
+                 write: Callable[["IpCorePackager", "PackagingRun", TextIO], None],
+                 needsComponent: bool, inFileSets: bool=False, listsFiles: bool=False,
+                 phaseName: Optional[str]=None, needsModel: bool=False):
+        self.name = name
+        self.relPath = relPath
+        self.write = write
+        self.needsComponent = needsComponent
+        self.inFileSets = inFileSets
+        self.listsFiles = listsFiles
+        if phaseName is None:
+            phaseName = name
+        self.phaseName = phaseName
+        self.needsModel = needsModel
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self.name:s} {self.relPath:s}>"
+
+
+class PackageTargetRegistry():
+    """
+    Registry of :class:`~.PackageTarget`, the files are written in the order of registration
+    """
+
+    def __init__(self, targets: Iterable[PackageTarget]=()):
+        self._byName: Dict[str, PackageTarget] = {}
+        for t in targets:
+            self.register(t)
+
+    def register(self, target: PackageTarget):
+        """
+        Add new target, it replaces previously registered target with the same name
+        """
+        self._byName[target.name] = target
+
+    def copy(self) -> "PackageTargetRegistry":
+        return PackageTargetRegistry(self._byName.values())
+
+    def resolve(self, names: Optional[Iterable[str]]=None) -> List[PackageTarget]:
+        """
+        :param names: names of selected targets, None for all targets
+        :return: selected targets in order of registration
+        :raise ValueError: if some target is not registered
+        """
+        if names is None:
+            return list(self._byName.values())
+        names = set(names)
+        unknown = names.difference(self._byName.keys())
+        if unknown:
+            raise ValueError("Unknown package targets", sorted(unknown),
+                             list(self._byName.keys()))
+        return [t for n, t in self._byName.items() if n in names]
+
+    def __iter__(self):
+        return iter(self._byName.values())
+
+
+def _writeXgui(packager: "IpCorePackager", run: "PackagingRun", out: TextIO):
+    packager.writeAutoGui(out, run.paramTable)
+
+
+def _writeIpXact(packager: "IpCorePackager", run: "PackagingRun", out: TextIO):
+    run.component.write_ip_xact(out)
+
+
+def _writeQuartus(packager: "IpCorePackager", run: "PackagingRun", out: TextIO):
+    run.component.write_quartus_tcl(out)
+
+
+DEFAULT_PACKAGE_TARGETS = PackageTargetRegistry([
+    PackageTarget(PACKAGE_TARGET.XGUI, "xgui/gui.tcl", _writeXgui, False,
+                  inFileSets=True, phaseName="mkAutoGui"),
+    PackageTarget(PACKAGE_TARGET.IPXACT, "component.xml", _writeIpXact, True,
+                  listsFiles=True, phaseName="ip_xact", needsModel=True),
+    PackageTarget(PACKAGE_TARGET.QUARTUS, "component_hw.tcl", _writeQuartus, True,
+                  listsFiles=True, phaseName="quartus_tcl"),
+])
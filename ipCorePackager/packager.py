@@ -1,15 +1,89 @@
+from contextlib import nullcontext
+from functools import partial
+from hashlib import sha256
+from inspect import unwrap
+import json
 import os
+import warnings
 from os.path import relpath
-import shutil
-from typing import List, Optional, Union, Tuple
+from typing import BinaryIO, Callable, ContextManager, Hashable, Iterable, List, \
+    Optional, Union, Tuple, TextIO
 
+from ipCorePackager.archivePackageDir import ARCHIVE_FORMAT, ArchivePackageDir
 from ipCorePackager.component import Component
 from ipCorePackager.constants import INTF_DIRECTION
-from ipCorePackager.helpers import prettify
+from ipCorePackager.fileKinds import DEFAULT_FILE_KINDS, FileKindRegistry
+from ipCorePackager.filePlacement import FILE_PLACEMENT
+from ipCorePackager.helpers import resolveTimestamp
+from ipCorePackager.ioPipeline import IoPipeline
+from ipCorePackager.model import DEFAULT_VIEW_TEMPLATES, ViewTemplate
 from ipCorePackager.otherXmlObjs import Value
+from ipCorePackager.packageTargets import DEFAULT_PACKAGE_TARGETS, PACKAGE_TARGET, \
+    PackageTarget, PackageTargetRegistry
+from ipCorePackager.packageDir import PackageDir, IncrementalPackageDir, \
+    MANIFEST_FORMAT
+from ipCorePackager.paramTable import ParamTable
 from ipCorePackager.setList import SetList
+from ipCorePackager.stats import PackagingStats
 from ipCorePackager.tclGuiBuilder import GuiBuilder, \
     paramManipulatorFns
+from ipCorePackager.typeQueryCache import TypeQueryCache, identityCacheKey
+
+
+class PackagingRun():
+    """
+    State of a single :meth:`IpCorePackager.createPackage`
+    (or :meth:`IpCorePackager.createArchive`) call
+
+    The packager is not modified during the packaging, everything produced
+    by the packaging is stored in this object, the same packager (and the same design)
+    may be packaged by multiple threads concurrently.
+
+    :ivar ~.name: name of the IP-core
+    :ivar ~.packageDir: package directory object
+    :ivar ~.hdlFiles: paths of HDL files in package (in compile order)
+    :ivar ~.targets: selected output files of the package
+        (:class:`ipCorePackager.packageTargets.PackageTarget`)
+    :ivar ~.paramTable: table of parameters of the top built for this run
+    :ivar ~.component: description of the IP-core
+        (None if the incremental package was up to date or no selected target needs it)
+    :ivar ~.upToDate: True if the incremental package was up to date and nothing was written
+    """
+    __slots__ = ["name", "packageDir", "hdlFiles", "targets", "paramTable", "component",
+                 "upToDate"]
+
+    def __init__(self, name: str, packageDir: PackageDir, targets: List[PackageTarget]):
+        self.name = name
+        self.packageDir = packageDir
+        self.hdlFiles = SetList()
+        self.targets = targets
+        self.paramTable: Optional[ParamTable] = None
+        self.component: Optional[Component] = None
+        self.upToDate = False
+
+    def fileSetFiles(self) -> List[str]:
+        """
+        :return: paths of the files of the package which are listed in file sets
+            of the IP-core (relative to the package directory, the HDL files are sorted
+            so the order does not depend on location of the repository)
+        """
+        root = self.packageDir.root
+        return sorted(relpath(p, root) for p in self.hdlFiles) + \
+            [t.relPath for t in self.targets if t.inFileSets]
+
+    @property
+    def guiFile(self) -> Optional[str]:
+        """
+        :return: path of the generated GUI file (xgui/gui.tcl) or None if it was not
+            selected
+        """
+        for t in self.targets:
+            if t.name == PACKAGE_TARGET.XGUI:
+                return self.packageDir.path(t.relPath)
+        return None
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self.packageDir.root:s}>"
 
 
 # [TODO] memory maps https://forums.xilinx.com/t5/Embedded-Processor-System-Design/exporting-AXI-BASEADDR-to-xparameters-h-from-Vivado-IP/td-p/428650
@@ -20,112 +94,479 @@ class IpCorePackager(object):
     :summary: Packs HDL, constraint and other files to IP-Core package
         for distribution and simple integration
 
+    :cvar viewTemplates: views of the model in IP-XACT
+        (tuple of :class:`ipCorePackager.model.ViewTemplate`)
+    :cvar fileKinds: registry of kinds of files in package, use a copy
+        of :data:`ipCorePackager.fileKinds.DEFAULT_FILE_KINDS` to register new kinds
+    :cvar packageTargets: registry of output files which can be generated,
+        use a copy of :data:`ipCorePackager.packageTargets.DEFAULT_PACKAGE_TARGETS`
+        to register new targets
+
+    :note: The packaging does not modify the packager (except the deprecated
+        :attr:`~.guiFile`), the results are returned as :class:`~.PackagingRun`,
+        the same packager can be used by multiple threads concurrently
+        (the methods of the packager have to be thread safe then).
     """
+    viewTemplates: Tuple[ViewTemplate, ...] = DEFAULT_VIEW_TEMPLATES
+    fileKinds: FileKindRegistry = DEFAULT_FILE_KINDS
+    packageTargets: PackageTargetRegistry = DEFAULT_PACKAGE_TARGETS
 
     def __init__(self, topObj, name,
-                 extra_files: List[str]=[]):
+                 extra_files: List[str]=[],
+                 filePlacement: FILE_PLACEMENT=FILE_PLACEMENT.COPY,
+                 typeCacheSize: Optional[int]=1024,
+                 stats: Optional[PackagingStats]=None):
         """
         :param topObj: top component (type depends on user)
         :param name: name of top
         :param extra_files: list of extra HDL/constrain file names for files
             which should be distributed in this IP-core
             (\\*.v - verilog, \\*.sv,\\*.svh -system verilog, \\*.vhd - vhdl, \\*.xdc - XDC)
+        :param filePlacement: method used to place extra files to package
+            (copy, hard/symbolic link, reflink, ...), if the method is not supported
+            for some file the fallback method is used
+            (:see: :mod:`ipCorePackager.filePlacement`)
+        :param typeCacheSize: maximal number of items of each query in :attr:`~.typeCache`
+            (0 to disable caching, None for unbounded cache)
+        :param stats: optional object which collects times of phases and counters
+            of :meth:`~.createPackage` (:see: :mod:`ipCorePackager.stats`)
+
+        :ivar ~.hdlFiles: extra files (:see: extra_files)
+        :ivar ~.typeCache: cache for results of type related queries
+            (:meth:`~.serializeType`, :meth:`~.getVectorFromType`, :meth:`~.getTypeWidth`,
+            :meth:`~.serialzeValueToTCL`), the code of ipCorePackager calls these methods
+            through this cache
         """
         self.top = topObj
         self.name = name
+        self.filePlacement = filePlacement
+        self.typeCache = TypeQueryCache(self, typeCacheSize)
+        self.stats = stats
         self.hdlFiles = SetList()
+        self._paramTable: Optional[Tuple[object, ParamTable]] = None
+        self._guiFile: Optional[str] = None
 
         for f in extra_files:
             self.hdlFiles.append(f)
 
-    def saveHdlFiles(self, srcDir):
+    def getParamTable(self, top) -> ParamTable:
+        """
+        :return: table of parameters of the top, it is built once
+            and cached (:meth:`~.createPackage` builds its own table
+            which is shared by the model, component parameters and GUI,
+            :see: :attr:`~.PackagingRun.paramTable`)
+        """
+        t = self._paramTable
+        if t is None or t[0] is not top:
+            t = self._paramTable = (top, ParamTable.fromTop(self, top))
+        return t[1]
+
+    def _phase(self, name: str, io: Optional[IoPipeline]=None):
+        """
+        :param io: if specified and concurrent the phase is not measured here,
+            the work of the phase is submitted to the workers and it is measured
+            in the tasks (:see: :meth:`~._submitIo`)
+        """
+        stats = self.stats
+        if stats is None or (io is not None and io.isConcurrent):
+            return nullcontext()
+        return stats.phase(name)
+
+    def _submitIo(self, io: IoPipeline, phaseName: str, fn: Callable, *args):
+        """
+        Submit the task of the phase to the I/O pipeline, if the task runs on a worker
+        the phase is measured in the task
+        """
+        if self.stats is not None and io.isConcurrent:
+            io.submit(self._runIoPhase, phaseName, fn, *args)
+        else:
+            io.submit(fn, *args)
+
+    def _runIoPhase(self, phaseName: str, fn: Callable, *args):
+        # the phases of the workers overlap, the profiles are not collected
+        with self.stats.phase(phaseName, profile=False):
+            fn(*args)
+
+    def _countFileBytes(self, counterName: str, fileName: str,
+                        packageDir: Optional[PackageDir]=None):
+        """
+        :param packageDir: if specified the fileName is a file in this package
+        """
+        stats = self.stats
+        if stats is not None:
+            if packageDir is None:
+                size = os.path.getsize(fileName)
+            else:
+                size = packageDir.fileSize(relpath(fileName, packageDir.root))
+            stats.add(counterName, size)
+
+    def saveHdlFiles(self, srcDir, packageDir: Optional[PackageDir]=None,
+                     io: Optional[IoPipeline]=None,
+                     name: Optional[str]=None) -> SetList:
         """
         :param srcDir: dir name where dir with HDL files should be stored
+        :param packageDir: package directory object used to write the files
+            (if not specified the srcDir/name directory is wiped
+            and files are written directly)
+        :param io: pipeline used to place extra files to the package
+            (if not specified files are placed immediately)
+        :param name: name of the IP-core, :attr:`~.name` if not specified
+        :return: paths of generated and placed HDL files (in compile order)
+
+        :note: Deprecated: if called without packageDir the :attr:`~.hdlFiles`
+            are also replaced by the result (as in previous versions),
+            use the returned list instead.
         """
-        path = os.path.join(srcDir, self.name)
-        try:
-            os.makedirs(path)
-        except OSError:
-            # wipe if exists
-            shutil.rmtree(path)
-            os.makedirs(path)
+        if name is None:
+            name = self.name
+        legacyCall = packageDir is None
+        if legacyCall:
+            warnings.warn(
+                "saveHdlFiles(srcDir) replacing hdlFiles is deprecated,"
+                " use the returned list of files", DeprecationWarning, stacklevel=2)
+            path = os.path.join(srcDir, name)
+            packageDir = PackageDir(path, self.filePlacement)
+            packageDir.prepare()
+        if io is None:
+            io = IoPipeline()
+        path = os.path.join(srcDir, name)
+        relDir = relpath(path, packageDir.root)
 
         files = self.hdlFiles
-        self.hdlFiles = self.toHdlConversion(self.top, self.name, path)
-        for srcF in files:
-            dst = os.path.join(path,
-                               os.path.relpath(srcF, srcDir).replace('../', '')
-                               )
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copy(srcF, dst)
-            self.hdlFiles.append(dst)
+        if unwrap(type(self).toHdlConversionStream) is IpCorePackager.toHdlConversionStream:
+            streamConversionFn = None
+        else:
+            def streamConversionFn(openText):
+                return self.toHdlConversionStream(self.top, name, openText)
+
+        with self._phase("toHdlConversion"):
+            hdlFiles = SetList(packageDir.convertHdl(
+                lambda saveTo: self.toHdlConversion(self.top, name, saveTo),
+                relDir, self.getDesignFingerprint(self.top), streamConversionFn))
+        if self.stats is not None:
+            for f in hdlFiles:
+                self._countFileBytes("bytesWritten", f, packageDir)
+            self.stats.add("filesGenerated", len(hdlFiles))
+
+        with self._phase("fileCopy", io):
+            for srcF in files:
+                dst = self._extraFilePackagePath(srcF, srcDir, name)
+                self._submitIo(io, "fileCopy", packageDir.placeFile,
+                               srcF, relpath(dst, packageDir.root))
+                hdlFiles.append(dst)
+                self._countFileBytes("bytesPlaced", srcF)
+        if self.stats is not None:
+            self.stats.add("filesPlaced", len(files))
+        if legacyCall:
+            io.wait()
+            self.hdlFiles = hdlFiles
+        return hdlFiles
+
+    def _extraFilePackagePath(self, srcF: str, srcDir: str,
+                              name: Optional[str]=None) -> str:
+        """
+        :param srcDir: dir name where dir with HDL files is stored (:see: :meth:`~.saveHdlFiles`)
+        :param name: name of the IP-core, :attr:`~.name` if not specified
+        :return: path of the extra file in package
+        """
+        if name is None:
+            name = self.name
+        return os.path.join(srcDir, name,
+                            os.path.relpath(srcF, srcDir).replace('../', ''))
 
-    def mkAutoGui(self):
+    def writeAutoGui(self, out: TextIO, paramTable: Optional[ParamTable]=None):
         """
-        :summary: automatically generate simple gui in TCL
+        :summary: automatically generate simple gui in TCL and write it to text stream
+
+        :param paramTable: table of parameters of the top,
+            :meth:`~.getParamTable` if not specified
         """
+        if paramTable is None:
+            paramTable = self.getParamTable(self.top)
         gui = GuiBuilder()
         p0 = gui.page("Main")
         handlers = []
-        for p in self.iterParams(self.top):
-            name = self.getParamPhysicalName(p)
+        for row in paramTable:
+            name = row.name
             p0.param(name)
             for fn in paramManipulatorFns(name):
                 handlers.append(fn)
 
-        with open(self.guiFile, "w") as f:
-            f.write(gui.asTcl())
-            for h in handlers:
-                f.write('\n\n')
-                f.write(str(h))
+        out.write(gui.asTcl())
+        for h in handlers:
+            out.write('\n\n')
+            out.write(str(h))
+
+    def mkAutoGui(self, guiFile: Optional[str]=None):
+        """
+        :summary: automatically generate simple gui in TCL (to guiFile)
+
+        :param guiFile: path of the file, deprecated: if not specified
+            the :attr:`~.guiFile` is used
+        """
+        if guiFile is None:
+            warnings.warn("mkAutoGui() without guiFile is deprecated",
+                          DeprecationWarning, stacklevel=2)
+            guiFile = self._guiFile
+            if guiFile is None:
+                raise ValueError("Path of the GUI file not specified")
+        with open(guiFile, "w") as f:
+            self.writeAutoGui(f)
+
+    @property
+    def guiFile(self) -> Optional[str]:
+        """
+        Deprecated, path of the GUI file written by the last :meth:`~.createPackage`,
+        use :attr:`~.PackagingRun.guiFile`
+        """
+        warnings.warn("IpCorePackager.guiFile is deprecated, use PackagingRun.guiFile",
+                      DeprecationWarning, stacklevel=2)
+        return self._guiFile
+
+    @guiFile.setter
+    def guiFile(self, guiFile: Optional[str]):
+        warnings.warn("IpCorePackager.guiFile is deprecated, pass the path to mkAutoGui",
+                      DeprecationWarning, stacklevel=2)
+        self._guiFile = guiFile
+
+    def _packageInputsDigest(self, packageDir: IncrementalPackageDir,
+                             name: str, vendor: str, library: str,
+                             description: Optional[str],
+                             timestamp: Optional[int],
+                             targets: List[PackageTarget]) -> Optional[str]:
+        """
+        :return: digest of everything the package is generated from
+            or None if the design can not be fingerprinted
+        """
+        fingerprint = self.getDesignFingerprint(self.top)
+        if fingerprint is None:
+            return None
+        cls = self.__class__
+        inputs = [
+            MANIFEST_FORMAT,
+            f"{cls.__module__:s}.{cls.__qualname__:s}",
+            name, vendor, library, description,
+            timestamp,
+            [t.name for t in targets],
+            fingerprint,
+            [(f, packageDir.sourceDigest(f)) for f in self.hdlFiles],
+        ]
+        return sha256(json.dumps(inputs).encode("utf-8")).hexdigest()
 
     def createPackage(self, repoDir, vendor: str="hwt", library: str="mylib",
-                      description: Optional[str]=None):
+                      description: Optional[str]=None,
+                      incremental: bool=False,
+                      reproducible: bool=False,
+                      timestamp: Optional[int]=None,
+                      ioWorkers: int=0,
+                      targets: Optional[Iterable[str]]=None,
+                      name: Optional[str]=None):
         '''
         :param repoDir: directory where IP-Core should be stored
         :param vendor: vendor name of IP-Core
         :param library: library name of IP-Core
         :param description: description of IP-Core
+        :param incremental: if True the package directory is not wiped,
+            files which content did not change are not touched and only stale files
+            are removed (:see: :class:`ipCorePackager.packageDir.IncrementalPackageDir`),
+            if the inputs did not change at all (requires :meth:`~.getDesignFingerprint`)
+            nothing is generated,
+            note that if the timestamp is not specified (and not reproducible) the revision
+            of the IP-core is the current time and component.xml is rewritten whenever
+            anything changed
+        :param reproducible: if True the output does not depend on the current time,
+            the same inputs produce byte-identical package
+        :param timestamp: time (seconds since epoch) used as the revision and the creation
+            time of the IP-core, if not specified SOURCE_DATE_EPOCH environment variable
+            is used and if it is not set the current time is used (0 in reproducible mode)
+        :param ioWorkers: number of threads used to place files and to write
+            the package files concurrently (0 for serial packaging), component.xml
+            and component_hw.tcl are then generated concurrently and the methods
+            of this packager used during the generation may be called from multiple threads,
+            the result and raised errors are the same as for serial packaging
+        :param targets: names of output files which should be generated
+            (:class:`ipCorePackager.packageTargets.PACKAGE_TARGET`, :attr:`~.packageTargets`),
+            None for all, the parts of the description of the IP-core which are not used
+            by the selected targets are not built
+        :param name: name of the IP-core (and of its directory in repoDir),
+            :attr:`~.name` if not specified
+        :return: :class:`~.PackagingRun` with the files of the package
 
         :summary:  synthetise hdl if needed
             copy hdl files
             create gui file
             create component.xml, component_hw.tcl
         '''
-        ip_dir = os.path.join(repoDir, self.name + "/")
-        if os.path.exists(ip_dir):
-            shutil.rmtree(ip_dir)
-
-        ip_srcPath = os.path.join(ip_dir, "src")
-        tclPath = os.path.join(ip_dir, "xgui")
-        guiFile = os.path.join(tclPath, "gui.tcl")
-        for d in [ip_dir, ip_srcPath, tclPath]:
-            os.makedirs(d)
-        self.saveHdlFiles(ip_srcPath)
-
-        self.guiFile = guiFile
-        self.mkAutoGui()
-
-        c = Component(self)
-        c._files = [relpath(p, ip_dir) for p in sorted(self.hdlFiles)] + \
-                   [relpath(guiFile, ip_dir)]
-
-        c.vendor = vendor
-        c.library = library
-        if description is None:
-            c.description = self.name + "_v" + c.version
+        if name is None:
+            name = self.name
+        ip_dir = os.path.join(repoDir, name + "/")
+        if incremental:
+            def mkPackageDir():
+                return IncrementalPackageDir(ip_dir, self.filePlacement)
         else:
-            c.description = description
-
-        c.asignTopHwModule(self.top, self.name)
-
-        xml_str = prettify(c.ip_xact())
-        with open(ip_dir + "component.xml", "w") as f:
-            f.write(xml_str)
+            def mkPackageDir():
+                return PackageDir(ip_dir, self.filePlacement)
+
+        run = self._createPackageWithStats(mkPackageDir, name, vendor, library, description,
+                                           resolveTimestamp(timestamp, reproducible),
+                                           ioWorkers, targets)
+        guiFile = run.guiFile
+        if guiFile is not None:
+            # for the deprecated guiFile attribute
+            self._guiFile = guiFile
+        return run
+
+    def createArchive(self, fileObj: BinaryIO, format: str=ARCHIVE_FORMAT.ZIP,
+                      vendor: str="hwt", library: str="mylib",
+                      description: Optional[str]=None,
+                      reproducible: bool=False,
+                      timestamp: Optional[int]=None,
+                      targets: Optional[Iterable[str]]=None,
+                      name: Optional[str]=None):
+        """
+        Write the IP-core package as zip/tar archive to a stream
+        (with the same content as :meth:`~.createPackage` writes to repoDir/name),
+        no directory is created, the files are streamed to the archive as they are generated
+
+        The HDL files are written to the archive directly only if the
+        :meth:`~.toHdlConversionStream` is implemented, otherwise they are generated
+        to a temporary directory by :meth:`~.toHdlConversion` and copied to the archive.
+
+        :param fileObj: writable binary stream (it does not have to be seekable,
+            it is not closed)
+        :param format: :class:`ipCorePackager.archivePackageDir.ARCHIVE_FORMAT`
+        :param timestamp: :see: :meth:`~.createPackage`, it is also the modification time
+            of the archive entries (0 if not specified, the entries do not depend
+            on the current time even if reproducible=False)
+        :return: :class:`~.PackagingRun` (paths of the files are relative to the archive)
+
+        :see: :meth:`~.createPackage` for the rest of the parameters
+        """
+        if name is None:
+            name = self.name
+        timestamp = resolveTimestamp(timestamp, reproducible)
+
+        def mkPackageDir():
+            return ArchivePackageDir(name, fileObj, format,
+                                     0 if timestamp is None else timestamp)
+
+        return self._createPackageWithStats(mkPackageDir, name, vendor, library, description,
+                                            timestamp, 0, targets)
+
+    def _createPackageWithStats(self, mkPackageDir: Callable[[], PackageDir],
+                                name: str, vendor: str, library: str,
+                                description: Optional[str],
+                                timestamp: Optional[int],
+                                ioWorkers: int,
+                                targets: Optional[Iterable[str]]) -> PackagingRun:
+        stats = self.stats
+        if stats is None:
+            return self._createPackage(mkPackageDir, name, vendor, library, description,
+                                       timestamp, ioWorkers, targets)
+        cacheStatsBefore = self.typeCache.stats()
+        # hooks are counted through the view, this packager is not modified
+        packager = stats.hookCountingView(self)
+        with stats.phase("createPackage", profile=False):
+            run = packager._createPackage(mkPackageDir, name, vendor, library,
+                                          description, timestamp, ioWorkers, targets)
+        for q, qStats in self.typeCache.stats().items():
+            before = cacheStatsBefore[q]
+            for k in ("hits", "misses"):
+                stats.add(f"typeCache.{q:s}.{k:s}", qStats[k] - before[k])
+        return run
+
+    def _createPackage(self, mkPackageDir: Callable[[], PackageDir],
+                       name: str, vendor: str, library: str,
+                       description: Optional[str],
+                       timestamp: Optional[int],
+                       ioWorkers: int,
+                       targets: Optional[Iterable[str]]) -> PackagingRun:
+        """
+        :param mkPackageDir: function which creates the package directory object
+        :param timestamp: already resolved timestamp
+        :see: :meth:`~.createPackage`
+        """
+        stats = self.stats
+        # resolved before anything is written, unknown target is an error of the call
+        targets = self.packageTargets.resolve(targets)
+        with self._phase("prepare"):
+            packageDir = mkPackageDir()
+            run = PackagingRun(name, packageDir, targets)
+            ip_dir = packageDir.root
+            incremental = isinstance(packageDir, IncrementalPackageDir)
+            if incremental:
+                inputsDigest = self._packageInputsDigest(
+                    packageDir, name, vendor, library, description, timestamp, targets)
+                if packageDir.isUpToDate(inputsDigest):
+                    run.hdlFiles = SetList(packageDir.path(f)
+                                           for f in packageDir.oldManifest.hdlFiles)
+                    run.upToDate = True
+                    if stats is not None:
+                        stats.add("upToDate")
+                    return run
+            packageDir.prepare()
 
-        quartus_tcl_str = c.quartus_tcl()
-        with open(ip_dir + "component_hw.tcl", "w") as f:
-            f.write(quartus_tcl_str)
+        ip_srcPath = os.path.join(ip_dir, "src")
+        with IoPipeline(ioWorkers) as io:
+            run.hdlFiles = self.saveHdlFiles(ip_srcPath, packageDir, io, name)
+
+            with self._phase("paramTable"):
+                # build the table in this thread, writers only read it
+                params = run.paramTable = ParamTable.fromTop(self, self.top)
+
+            if any(t.needsComponent for t in targets):
+                with self._phase("asignTopHwModule"):
+                    c = run.component = Component(self)
+                    c._files = run.fileSetFiles()
+                    if timestamp is not None:
+                        c.setTimestamp(timestamp)
+
+                    c.vendor = vendor
+                    c.library = library
+                    if description is None:
+                        c.description = name + "_v" + c.version
+                    else:
+                        c.description = description
+
+                    c.asignTopHwModule(self.top, name, params,
+                                       any(t.needsModel for t in targets))
+
+            for t in targets:
+                with self._phase(t.phaseName, io):
+                    self._submitIo(io, t.phaseName, self._writePackageFile,
+                                   packageDir, t.relPath, partial(t.write, self, run))
+
+            if io.isConcurrent:
+                with self._phase("ioWait"):
+                    io.wait()
+
+        for t in targets:
+            self._countFileBytes("bytesWritten", packageDir.path(t.relPath), packageDir)
+
+        with self._phase("finish"):
+            if incremental:
+                m = packageDir.manifest
+                m.inputsDigest = inputsDigest
+                m.hdlFiles = [relpath(p, ip_dir) for p in run.hdlFiles]
+            packageDir.finish()
+
+        if stats is not None:
+            c = run.component
+            if c is not None:
+                # ports are counted only if they were needed by the targets
+                stats.add("ports", len(c.model.ports))
+                stats.add("interfaces", len(c.busInterfaces))
+                stats.add("busInterfaces", len(c._bis))
+            stats.add("parameters", len(params))
+            stats.add("files", len(run.fileSetFiles()))
+
+        return run
+
+    @staticmethod
+    def _writePackageFile(packageDir: PackageDir, relPath: str,
+                          writeFn: Callable[[TextIO], None]):
+        with packageDir.openText(relPath) as f:
+            writeFn(f)
 
     def toHdlConversion(self, top, topName: str, saveTo: str) -> List[str]:
         """
@@ -138,6 +579,31 @@ class IpCorePackager(object):
         raise NotImplementedError(
             "Implement this function for your type of your top module")
 
+    def toHdlConversionStream(self, top, topName: str,
+                              openText: Callable[[str], ContextManager[TextIO]]) -> List[str]:
+        """
+        Optional variant of :meth:`~.toHdlConversion` which writes the files
+        using openText instead of writing them to a directory, it is used
+        if the package is not in the file system (:meth:`~.createArchive`)
+
+        :param top: object which is representation of design
+        :param topName: name which should be used for ipcore
+        :param openText: function(file name relative to directory with HDL files)
+            which returns context manager with text stream for the file
+
+        :return: list of relative file names in correct compile order
+        """
+        raise NotImplementedError()
+
+    def getDesignFingerprint(self, top) -> Optional[str]:
+        """
+        :return: string which changes if the design or anything else which affects
+            the output of :meth:`~.toHdlConversion` and of the interface description changes,
+            None if such fingerprint can not be computed (the design is then always converted
+            and described again in incremental packaging)
+        """
+        return None
+
     def serializeType(self, hdlType: 'HdlType') -> str:
         raise NotImplementedError(
             "Implement this function for your hdl types")
@@ -203,6 +669,14 @@ class IpCorePackager(object):
         """
         return repr(obj)
 
+    def getTypeCacheKey(self, obj) -> Hashable:
+        """
+        :return: key for :attr:`~.typeCache` for the HdlType or value object,
+            the object identity is used by default, override this method
+            if equal types/values are not the same objects but they are hashable
+        """
+        return identityCacheKey(obj)
+
     def serialzeValueToTCL(self, val, do_eval=False) -> Tuple[str, str, bool]:
         """
         Serialize value to TCL
@@ -0,0 +1,65 @@
+from typing import Iterator, List
+
+from ipCorePackager.otherXmlObjs import Value
+
+
+class ParamTableRow():
+    """
+    Everything the package generators need to know about a single parameter (generic)
+
+    :ivar ~.param: the parameter object of the user
+    :ivar ~.name: physical name of the parameter
+    :ivar ~.type: HdlType of the parameter
+    :ivar ~.typeName: serialized type of the parameter (lower case)
+    :ivar ~.modelValue: value for the model parameter (MODELPARAM_VALUE.*)
+    :ivar ~.userValue: value for the component parameter (PARAM_VALUE.*)
+    """
+    __slots__ = ["param", "name", "type", "typeName", "modelValue", "userValue"]
+
+    def __init__(self, param: "HwParam", name: str, type_: "HdlType",
+                 typeName: str, modelValue: Value, userValue: Value):
+        self.param = param
+        self.name = name
+        self.type = type_
+        self.typeName = typeName
+        self.modelValue = modelValue
+        self.userValue = userValue
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self.name:s}: {self.typeName:s}>"
+
+
+class ParamTable():
+    """
+    Parameters of the top module with all the values used in the package,
+    the packager is asked about each parameter only once
+
+    :note: The values are shared between the model, component and GUI,
+        they must not be modified.
+    """
+
+    def __init__(self, rows: List[ParamTableRow]):
+        self.rows = rows
+
+    @classmethod
+    def fromTop(cls, packager: "IpCorePackager", top: "HwModule"):
+        rows = []
+        serializeType = packager.typeCache.serializeType
+        for p in packager.iterParams(top):
+            name = packager.getParamPhysicalName(p)
+            t = packager.getParamType(p)
+            rows.append(ParamTableRow(
+                p, name, t,
+                serializeType(t).lower(),
+                packager.paramToIpValue("MODELPARAM_VALUE.", p,
+                                        Value.RESOLVE_GENERATED),
+                packager.paramToIpValue("PARAM_VALUE.", p,
+                                        Value.RESOLVE_USER),
+            ))
+        return cls(rows)
+
+    def __iter__(self) -> Iterator[ParamTableRow]:
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
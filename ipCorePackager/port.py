@@ -1,20 +1,50 @@
-from ipCorePackager.helpers import appendSpiElem, \
-    mkSpiElm
+from sys import intern
+from array import array
+import warnings
+from typing import Dict, Iterator, List, Optional, Union, Tuple
+
+from ipCorePackager.helpers import appendSpiAtribs, appendSpiElem, \
+    elmText, findS, mkSpiElm, spi_ns_prefix
+from ipCorePackager.otherXmlObjs import Value
+from ipCorePackager.typeQueryCache import identityCacheKey
+from ipCorePackager.xmlWriter import PrettyXmlWriter, escapeText
 from ipCorePackager.constants import DIRECTION
 
 
+DEFAULT_VIEW_NAME_REFS = ("xilinx_vhdlsynthesis",
+                          "xilinx_vhdlbehavioralsimulation")
+DIRECTION_to_port_direction = {d: intern(d.name.lower()) for d in DIRECTION}
+# direction code in PortTable -> direction string
+_PORT_DIRECTIONS = tuple(DIRECTION_to_port_direction[d]
+                         for d in sorted(DIRECTION, key=lambda d: d.value))
+# placeholder for the name of the port in a serialized port element
+_NAME_PLACEHOLDER = "\x00"
+
+
 class WireTypeDef():
+    __slots__ = ["typeName", "viewNameRefs"]
     _requiredVal = ["typeName"]
 
-    # @classmethod
-    # def fromElem(cls, elm):
-    #     self = cls()
-    #     for s in cls._requiredVal:
-    #         setattr(self, s, findS(elm, s).text)
-    #     self.viewNameRefs = []
-    #     for r in elm.findall("spirit:viewNameRef", ns):
-    #         self.viewNameRefs.append(r.text)
-    #     return self
+    @classmethod
+    def withDefaultViews(cls, typeName: str) -> "WireTypeDef":
+        """
+        :return: new instance with default viewNameRefs
+        """
+        t = cls()
+        t.typeName = intern(typeName)
+        t.viewNameRefs = DEFAULT_VIEW_NAME_REFS
+        return t
+
+    @classmethod
+    def fromElem(cls, elm):
+        typeName = elmText(findS(elm, "typeName"))
+        viewNameRefs = tuple(elmText(r) for r in elm.findall(spi_ns_prefix + "viewNameRef"))
+        if viewNameRefs == DEFAULT_VIEW_NAME_REFS:
+            return cls.withDefaultViews(typeName)
+        self = cls()
+        self.typeName = typeName
+        self.viewNameRefs = viewNameRefs
+        return self
 
     def asElem(self):
         e = mkSpiElm("wireTypeDef")
@@ -25,46 +55,87 @@ class WireTypeDef():
         return e
 
 
+def _wireTypeDefOf(dtype: "HdlType", packager: "IpCorePackager",
+                   wireTypeDefs: Optional[Dict[str, WireTypeDef]]=None) -> WireTypeDef:
+    """
+    :param wireTypeDefs: optional type name -> instance used to share the instances
+    """
+    typeName = packager.typeCache.serializeType(dtype)
+    try:
+        typeName = typeName[:typeName.index('(')]
+    except ValueError:
+        pass
+    if wireTypeDefs is None:
+        return WireTypeDef.withDefaultViews(typeName)
+    t = wireTypeDefs.get(typeName, None)
+    if t is None:
+        t = wireTypeDefs[typeName] = WireTypeDef.withDefaultViews(typeName)
+    return t
+
+
 class Port():
-    def __init__(self, packager: "IpCorePackager"):
-        self._packager = packager
-    # @classmethod
-    # def fromElem(cls, elm):
-    #     self = cls()
-    #     self.name = findS(elm, "name").text
-    #     vec = findS(elm, "vector")
-    #     if vec is not None:
-    #         self.vector = [findS(vec, "left").text, findS(vec, "right").text]
-    #     else:
-    #         self.vector = None
-    #
-    #     wire = findS(elm, "wire")
-    #     self.direction = findS(wire, "direction").text
-    #     self.type = WireTypeDef.fromElem(findS(findS(wire, "wireTypeDefs"),
-    #                                            "wiretypedef"))
-    #     return self
+    """
+    :ivar ~.name: physical name of the port
+    :ivar ~.direction: "in", "out" or "inout"
+    :ivar ~.type: :class:`~.WireTypeDef` (shared between ports)
+    :ivar ~.vector: None/False if the port is not a vector, else [left, right]
+        (values of the type used by the packager or :class:`ipCorePackager.otherXmlObjs.Value`
+        if the port was loaded from IP-XACT)
+
+    :note: The port does not keep the packager, the packager is passed to :meth:`~.asElem`.
+    """
+    __slots__ = ["name", "direction", "type", "vector"]
+
+    def __init__(self, packager: Optional["IpCorePackager"]=None):
+        """
+        :param packager: deprecated and ignored, pass the packager to :meth:`~.asElem`
+        """
+        if packager is not None:
+            warnings.warn("Port(packager) is deprecated, pass the packager to Port.asElem",
+                          DeprecationWarning, stacklevel=2)
+
+    @classmethod
+    def fromElem(cls, elm):
+        """
+        :raise ValueError: if the port is not a wire port
+        """
+        self = cls()
+        self.name = elmText(findS(elm, "name"))
+        wire = findS(elm, "wire")
+        if wire is None:
+            raise ValueError("Only wire ports are supported", self.name)
+        self.direction = elmText(findS(wire, "direction"))
+        vec = findS(wire, "vector")
+        if vec is not None:
+            self.vector = [Value.fromElem(findS(vec, "left")),
+                           Value.fromElem(findS(vec, "right"))]
+        else:
+            self.vector = None
+
+        tds = findS(wire, "wireTypeDefs")
+        td = None if tds is None else findS(tds, "wireTypeDef")
+        if td is None:
+            self.type = None
+        else:
+            self.type = WireTypeDef.fromElem(td)
+        return self
 
     @staticmethod
     def fromParams(name: str, direction: DIRECTION,
                    dtype: "HdlType", packager: "IpPackager"):
-        port = Port(packager)
+        port = Port()
         port.name = name
-        port.direction = direction.name.lower()
-        port.type = WireTypeDef()
-        t = port.type
-
-        t.typeName = packager.serializeType(dtype)
-        try:
-            t.typeName = t.typeName[:t.typeName.index('(')]
-        except ValueError:
-            pass
-
-        port.vector = packager.getVectorFromType(dtype)
-        t.viewNameRefs = ["xilinx_vhdlsynthesis",
-                          "xilinx_vhdlbehavioralsimulation"]
+        port.direction = DIRECTION_to_port_direction[direction]
+        port.type = _wireTypeDefOf(dtype, packager)
+        port.vector = packager.typeCache.getVectorFromType(dtype)
         return port
 
-    def asElem(self):
+    def asElem(self, packager: Optional["IpCorePackager"]=None):
+        """
+        :param packager: packager used to serialize the vector
+            (may be omitted only if the port does not have a vector
+            or if it was loaded from IP-XACT)
+        """
         e = mkSpiElm("port")
         appendSpiElem(e, "name").text = self.name
         w = appendSpiElem(e, "wire")
@@ -74,9 +145,18 @@ class Port():
 
             def mkBoundary(name, val):
                 d = appendSpiElem(v, name)
+                if isinstance(val, Value):
+                    # loaded from IP-XACT, already resolved
+                    appendSpiAtribs(val, d, spi_ns_prefix,
+                                    optPropNames=['format', 'dependency', 'resolve'])
+                    d.text = val.text
+                    return
 
+                if packager is None:
+                    raise TypeError("Port.asElem requires the packager to serialize the vector",
+                                    self.name)
                 d.attrib["spirit:format"] = "long"
-                tclVal, tclValOfVal, valConst = self._packager.serialzeValueToTCL(val)
+                tclVal, tclValOfVal, valConst = packager.typeCache.serialzeValueToTCL(val)
                 if valConst:
                     resolve = "immediate"
                     d.text = tclVal
@@ -88,6 +168,124 @@ class Port():
                 d.attrib["spirit:resolve"] = resolve
             mkBoundary("left", self.vector[0])
             mkBoundary("right", self.vector[1])
-        td = appendSpiElem(w, "wireTypeDefs")
-        td.append(self.type.asElem())
+        if self.type is not None:
+            td = appendSpiElem(w, "wireTypeDefs")
+            td.append(self.type.asElem())
         return e
+
+
+class _PortType():
+    """
+    Type of ports in :class:`~.PortTable`
+
+    :ivar ~.typeObj: object which was used to resolve the type
+        (kept alive so the identity based key remains valid)
+    """
+    __slots__ = ["typeObj", "type", "vector"]
+
+    def __init__(self, typeObj, type_: WireTypeDef, vector: Union[None, bool, Tuple]):
+        self.typeObj = typeObj
+        self.type = type_
+        self.vector = vector
+
+
+class PortTable():
+    """
+    Columnar storage of the ports of :class:`ipCorePackager.model.Model`
+
+    Ports are stored in columns (names, direction codes, type ids),
+    the types (:class:`~.WireTypeDef` and vector) are stored only once
+    for all ports of the same type. The table behaves like a sequence
+    of :class:`~.Port` objects which are created on demand,
+    :meth:`~.write_ip_xact` serializes all ports in bulk.
+
+    :note: :class:`~.WireTypeDef` instances are shared only by the ports of this table
+    """
+    __slots__ = ["names", "directions", "typeIds", "types", "_typeIdOfKey", "_wireTypeDefs"]
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.directions = array("B")
+        self.typeIds = array("I")
+        self.types: List[_PortType] = []
+        self._typeIdOfKey = {}
+        self._wireTypeDefs: Dict[str, WireTypeDef] = {}
+
+    def _typeId(self, key, typeObj, wireTypeDef, vector) -> int:
+        try:
+            return self._typeIdOfKey[key]
+        except KeyError:
+            pass
+        i = len(self.types)
+        self.types.append(_PortType(typeObj, wireTypeDef, vector))
+        self._typeIdOfKey[key] = i
+        return i
+
+    def add(self, name: str, direction: DIRECTION, dtype: "HdlType",
+            packager: "IpCorePackager"):
+        """
+        Add port (same as ``append(Port.fromParams(name, direction, dtype, packager))``)
+        """
+        k = packager.getTypeCacheKey(dtype)
+        try:
+            t = self._typeIdOfKey[k]
+        except KeyError:
+            t = self._typeId(k, dtype, _wireTypeDefOf(dtype, packager, self._wireTypeDefs),
+                             packager.typeCache.getVectorFromType(dtype))
+        self.names.append(name)
+        self.directions.append(direction.value)
+        self.typeIds.append(t)
+
+    def append(self, port: Port):
+        t = self._typeId((id(port.type), identityCacheKey(port.vector)),
+                         (port.type, port.vector), port.type, port.vector)
+        self.names.append(port.name)
+        self.directions.append(_PORT_DIRECTIONS.index(port.direction))
+        self.typeIds.append(t)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Port, List[Port]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.names)))]
+        p = Port()
+        p.name = self.names[i]
+        p.direction = _PORT_DIRECTIONS[self.directions[i]]
+        t = self.types[self.typeIds[i]]
+        p.type = t.type
+        p.vector = t.vector
+        return p
+
+    def __iter__(self) -> Iterator[Port]:
+        for i in range(len(self.names)):
+            yield self[i]
+
+    def write_ip_xact(self, w: PrettyXmlWriter, packager: "IpCorePackager"):
+        """
+        Write port elements (the same as ``w.element(port.asElem(packager))``
+        for each port), each type is serialized only once
+        """
+        # (typeId, direction code) -> (text before name, text after name)
+        templates = {}
+        out = w.out
+        for i, (name, d, t) in enumerate(zip(self.names, self.directions, self.typeIds)):
+            if not name:
+                # element with empty text is serialized differently
+                w.element(self[i].asElem(packager))
+                continue
+            k = (t, d)
+            try:
+                prefix, suffix = templates[k]
+            except KeyError:
+                p = Port()
+                p.name = _NAME_PLACEHOLDER
+                p.direction = _PORT_DIRECTIONS[d]
+                pt = self.types[t]
+                p.type = pt.type
+                p.vector = pt.vector
+                prefix, suffix = templates[k] = w.elementToStr(
+                    p.asElem(packager)).split(_NAME_PLACEHOLDER)
+            out.write(prefix)
+            out.write(escapeText(name))
+            out.write(suffix)
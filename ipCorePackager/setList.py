@@ -1,72 +1,255 @@
+from operator import index
+from typing import Hashable, Iterable, Iterator, List, Optional, SupportsIndex
 
 
-class SetList(list):
-    """
-    List of unique items
+class SetList():
     """
+    List of unique items (ordered set)
 
-    def __init__(self, initSeq=None):
-        super(SetList, self).__init__()
-        self.__s = set()
-        if initSeq is not None:
-            for item in initSeq:
-                self.append(item)
+    Items are stored as keys of a dictionary, membership test, append
+    and removal are O(1) and the bulk operations are performed by dict operations.
+    Positional access uses a list of the items which is rebuilt (O(n))
+    on the first positional access after a modification.
 
-    def append(self, item):
-        if item in self.__s:
-            return False
+    The methods which would add a duplicate item ignore such item,
+    the operations which create a new object (+, \\*, slicing) return a plain list
+    with list semantics.
+    """
+    __slots__ = ["_d", "_list"]
+
+    def __init__(self, initSeq: Optional[Iterable[Hashable]]=None):
+        if initSeq is None:
+            self._d = {}
+        elif isinstance(initSeq, SetList):
+            self._d = initSeq._d.copy()
         else:
-            self.__s.add(item)
-            list.append(self, item)
-            return True
+            self._d = dict.fromkeys(initSeq)
+        # cached list of items for positional access
+        self._list: Optional[List[Hashable]] = None
+
+    def _asList(self) -> List[Hashable]:
+        l = self._list
+        if l is None:
+            l = self._list = list(self._d)
+        return l
+
+    def append(self, item) -> bool:
+        """
+        :return: True if the item was added, False if it already was in this list
+        """
+        d = self._d
+        if item in d:
+            return False
+        d[item] = None
+        self._list = None
+        return True
 
-    def extend(self, items):
+    def extend(self, items: Iterable[Hashable]):
         if self is items:
             return  # will not add any item because all items are already there
+        self.update(items)
+
+    def update(self, items: Iterable[Hashable]):
+        """
+        Add all items which are not present yet (in order of items)
+        """
+        if isinstance(items, SetList):
+            items = items._d
+        self._d.update(dict.fromkeys(items))
+        self._list = None
+
+    def insert(self, i: SupportsIndex, item) -> bool:
+        """
+        Insert item before index i
+
+        :return: True if the item was inserted, False if it already was in this list
+            (its position is not changed)
+        """
+        if item in self._d:
+            return False
+        l = list(self._d)
+        l.insert(i, item)
+        self._setItems(l)
+        return True
+
+    def _setItems(self, items: List[Hashable]):
+        """
+        Replace the items by unique items in new order
+        """
+        self._d = dict.fromkeys(items)
+        self._list = items
 
-        for item in items:
-            self.append(item)
+    def _get_set(self):
+        return self._d.keys()
 
-    def insert(self, i, x):
-        super(SetList, self).insert(i, x)
-        self.__s.add(x)
+    def intersection_set(self, other: "SetList"):
+        return self._d.keys() & other._get_set()
 
-    def _get_set(self):
-        return self.__s
+    def union(self, other: Iterable[Hashable]) -> "SetList":
+        """
+        :return: new SetList with items of this list followed by new items of the other
+        """
+        c = self.copy()
+        c.update(other)
+        return c
 
-    def intersection_set(self, other):
-        return self.__s.intersection(other._get_set())
+    def difference(self, other: Iterable[Hashable]) -> "SetList":
+        """
+        :return: new SetList with items of this list which are not in the other
+        """
+        other = self._asContainer(other)
+        c = SetList()
+        c._d = {k: None for k in self._d if k not in other}
+        return c
 
-    def discard(self, item):
-        if item in self.__s:
-            self.remove(item)
-            return True
-        else:
+    def intersection(self, other: Iterable[Hashable]) -> "SetList":
+        """
+        :return: new SetList with items of this list which are also in the other
+        """
+        other = self._asContainer(other)
+        c = SetList()
+        c._d = {k: None for k in self._d if k in other}
+        return c
+
+    @staticmethod
+    def _asContainer(items: Iterable[Hashable]):
+        if isinstance(items, SetList):
+            return items._d
+        elif isinstance(items, (set, frozenset, dict)):
+            return items
+        return set(items)
+
+    def discard(self, item) -> bool:
+        """
+        :return: True if the item was removed
+        """
+        try:
+            del self._d[item]
+        except KeyError:
             return False
+        self._list = None
+        return True
 
     def remove(self, item):
-        self.__s.remove(item)
-        return list.remove(self, item)
-
-    def pop(self, *args, **kwargs):
-        item = list.pop(self, *args, **kwargs)
-        self.__s.remove(item)
+        del self._d[item]
+        self._list = None
+
+    def pop(self, i: SupportsIndex=-1):
+        d = self._d
+        i = index(i)
+        if i == -1 or i == len(d) - 1:
+            try:
+                item, _ = d.popitem()
+            except KeyError:
+                raise IndexError("pop from empty SetList")
+        else:
+            item = self._asList()[i]
+            del d[item]
+        self._list = None
         return item
 
     def clear(self):
-        list.clear(self)
-        self.__s.clear()
+        self._d.clear()
+        self._list = None
 
-    def copy(self):
+    def copy(self) -> "SetList":
         c = SetList()
-        c.extend(self)
+        c._d = self._d.copy()
         return c
 
+    def index(self, item, *args) -> int:
+        if item not in self._d:
+            raise ValueError(f"{item!r} is not in SetList")
+        return self._asList().index(item, *args)
+
+    def count(self, item) -> int:
+        return int(item in self._d)
+
+    def sort(self, *, key=None, reverse: bool=False):
+        self._setItems(sorted(self._d, key=key, reverse=reverse))
+
+    def reverse(self):
+        self._setItems(list(reversed(self._asList())))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._asList()[i]
+        if i == 0 and self._list is None:
+            try:
+                return next(iter(self._d))
+            except StopIteration:
+                raise IndexError("SetList index out of range")
+        return self._asList()[i]
+
     def __setitem__(self, key, value) -> None:
         raise NotImplementedError()
 
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            for item in self._asList()[i]:
+                del self._d[item]
+        else:
+            del self._d[self._asList()[i]]
+        self._list = None
+
     def __copy__(self):
         return self.copy()
 
     def __contains__(self, key):
-        return key in self.__s
+        return key in self._d
+
+    def __len__(self):
+        return len(self._d)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._d)
+
+    def __reversed__(self) -> Iterator[Hashable]:
+        return reversed(self._d)
+
+    def __eq__(self, other):
+        if isinstance(other, SetList):
+            return list(self._d) == list(other._d)
+        elif isinstance(other, list):
+            return list(self._d) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __add__(self, other: List[Hashable]) -> List[Hashable]:
+        if isinstance(other, SetList):
+            other = list(other._d)
+        elif not isinstance(other, list):
+            return NotImplemented
+        return list(self._d) + other
+
+    def __radd__(self, other: List[Hashable]) -> List[Hashable]:
+        if not isinstance(other, list):
+            return NotImplemented
+        return other + list(self._d)
+
+    def __mul__(self, n: SupportsIndex) -> List[Hashable]:
+        return list(self._d) * n
+
+    __rmul__ = __mul__
+
+    def __iadd__(self, other: Iterable[Hashable]) -> "SetList":
+        self.extend(other)
+        return self
+
+    def __imul__(self, n: SupportsIndex) -> "SetList":
+        # repeated items are already present
+        if index(n) <= 0:
+            self.clear()
+        return self
+
+    def __getstate__(self):
+        # tuple because falsy state would not be passed to __setstate__
+        return (list(self._d),)
+
+    def __setstate__(self, state):
+        self._d = dict.fromkeys(state[0])
+        self._list = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__:s}({list(self._d)!r})"
@@ -0,0 +1,216 @@
+"""
+Opt-in instrumentation of IP-core packaging (:attr:`ipCorePackager.packager.IpCorePackager.stats`)
+"""
+from contextlib import contextmanager
+import cProfile
+from functools import wraps
+from inspect import getattr_static
+import os
+from threading import Lock
+from time import perf_counter
+import tracemalloc
+from types import FunctionType
+from typing import Callable, Dict, List, Optional
+
+
+PACKAGER_HOOKS = (
+    "toHdlConversion", "toHdlConversionStream", "getDesignFingerprint", "serializeType",
+    "getParamPhysicalName", "getParamType", "paramToIpValue",
+    "iterParams", "iterInterfaces", "getInterfaceType",
+    "getInterfacePhysicalName", "getInterfaceLogicalName",
+    "getVectorFromType", "getInterfaceDirection", "getTypeWidth",
+    "getObjDebugName", "getTypeCacheKey", "serialzeValueToTCL",
+)
+
+
+# packager class -> subclass with counting hooks
+_hookCountingClasses: Dict[type, type] = {}
+_hookCountingClassesLock = Lock()
+
+
+def _countedHook(name: str, fn: FunctionType):
+    counterName = "hook." + name
+
+    @wraps(fn)
+    def counted(self, *args, **kwargs):
+        self._hookStats.add(counterName)
+        return fn(self, *args, **kwargs)
+
+    return counted
+
+
+def _hookCountingClass(packagerCls: type) -> type:
+    """
+    :return: subclass of the packager class with :data:`~.PACKAGER_HOOKS` which count
+        their calls (:see: :meth:`~.PackagingStats.hookCountingView`)
+    """
+    with _hookCountingClassesLock:
+        cls = _hookCountingClasses.get(packagerCls, None)
+        if cls is None:
+            ns = {
+                "__slots__": ("_hookStats", "_hookTypeCache"),
+                # the name of the class is a part of the inputs of incremental packaging
+                "__module__": packagerCls.__module__,
+                "__qualname__": packagerCls.__qualname__,
+                "typeCache": property(lambda self: self._hookTypeCache),
+            }
+            for name in PACKAGER_HOOKS:
+                fn = getattr_static(packagerCls, name, None)
+                if isinstance(fn, FunctionType):
+                    ns[name] = _countedHook(name, fn)
+            cls = type(packagerCls.__name__, (packagerCls,), ns)
+            _hookCountingClasses[packagerCls] = cls
+        return cls
+
+
+class PhaseRecord():
+    """
+    :ivar ~.name: name of the phase
+    :ivar ~.start: :func:`time.perf_counter` when the phase started
+    :ivar ~.end: :func:`time.perf_counter` when the phase ended
+    """
+    __slots__ = ["name", "start", "end"]
+
+    def __init__(self, name: str, start: float, end: float):
+        self.name = name
+        self.start = start
+        self.end = end
+
+    @property
+    def elapsed(self) -> float:
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self.name:s} {self.elapsed:f}s>"
+
+
+class PackagingStats():
+    """
+    Times of packaging phases and counters
+    (ports, interfaces, parameters, files, bytes written, calls of packager hooks, ...)
+
+    The overhead is just a few function calls per phase unless hook calls are counted
+    or profiles are collected.
+
+    :ivar ~.phases: list of :class:`~.PhaseRecord` in order of completion
+    :ivar ~.counters: name -> value
+    """
+
+    def __init__(self, listener: Optional[Callable[[str, str, float], None]]=None,
+                 countHookCalls: bool=False,
+                 profileDir: Optional[str]=None,
+                 profileCpu: bool=True,
+                 profileMemory: bool=False):
+        """
+        :param listener: function(event, phaseName, perf_counter time) called on each
+            start ("start" event) and end ("end" event) of the phase
+            (if the packaging uses I/O workers it is also called from the worker threads,
+            the phases of the workers are measured in the workers and they may overlap,
+            their profiles are not collected)
+        :param countHookCalls: if True the calls of the methods of the packager
+            (:data:`~.PACKAGER_HOOKS`) are counted as "hook.<method name>" counters
+        :param profileDir: if specified the profiles of the phases are dumped into this directory
+        :param profileCpu: dump cProfile stats as "<phase>.prof" (requires profileDir)
+        :param profileMemory: dump tracemalloc snapshot as "<phase>.tracemalloc"
+            (requires profileDir)
+        """
+        self.listener = listener
+        self.countHookCalls = countHookCalls
+        self.profileDir = profileDir
+        self.profileCpu = profileCpu
+        self.profileMemory = profileMemory
+        self.phases: List[PhaseRecord] = []
+        self.counters: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def add(self, name: str, value: int=1):
+        """
+        Increment counter
+        """
+        with self._lock:
+            c = self.counters
+            c[name] = c.get(name, 0) + value
+
+    @contextmanager
+    def phase(self, name: str, profile: bool=True):
+        """
+        Measure the phase of the packaging
+
+        :param profile: if False the profile is not collected even if it is enabled
+            (used for phases which contain other phases)
+        """
+        profileDir = self.profileDir if profile else None
+        cpuProf = None
+        stopTracemalloc = False
+        if profileDir is not None:
+            os.makedirs(profileDir, exist_ok=True)
+            if self.profileMemory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                stopTracemalloc = True
+            if self.profileCpu:
+                cpuProf = cProfile.Profile()
+
+        listener = self.listener
+        start = perf_counter()
+        if listener is not None:
+            listener("start", name, start)
+        if cpuProf is not None:
+            cpuProf.enable()
+        try:
+            yield
+        finally:
+            if cpuProf is not None:
+                cpuProf.disable()
+            end = perf_counter()
+            with self._lock:
+                self.phases.append(PhaseRecord(name, start, end))
+            if listener is not None:
+                listener("end", name, end)
+
+            if cpuProf is not None:
+                cpuProf.dump_stats(os.path.join(profileDir, name + ".prof"))
+            if profileDir is not None and self.profileMemory:
+                tracemalloc.take_snapshot().dump(
+                    os.path.join(profileDir, name + ".tracemalloc"))
+                if stopTracemalloc:
+                    tracemalloc.stop()
+
+    def hookCountingView(self, packager: "IpCorePackager") -> "IpCorePackager":
+        """
+        :return: object which behaves as the packager and which counts the calls
+            of packager hooks (:data:`~.PACKAGER_HOOKS`) made through it into this object
+            (if :attr:`~.countHookCalls`, otherwise the packager itself)
+
+        :note: The packager is not modified, the view shares the attributes
+            with the packager, it has just the class with counting methods
+            and its own :attr:`ipCorePackager.packager.IpCorePackager.typeCache` object
+            (sharing the cached items) so the queries which miss the cache are counted as well.
+            Multiple views of the same packager can be used by multiple threads concurrently.
+        """
+        if not self.countHookCalls:
+            return packager
+        view = object.__new__(_hookCountingClass(packager.__class__))
+        view.__dict__ = packager.__dict__
+        view._hookStats = self
+        view._hookTypeCache = packager.typeCache.withPackager(view)
+        return view
+
+    def elapsed(self) -> Dict[str, float]:
+        """
+        :return: phase name -> sum of time spent in the phase
+        """
+        res = {}
+        for p in self.phases:
+            res[p.name] = res.get(p.name, 0.0) + p.elapsed
+        return res
+
+    def report(self) -> str:
+        """
+        :return: human readable table of phases and counters
+        """
+        lines = []
+        for name, t in self.elapsed().items():
+            lines.append(f"{name:30s} {t * 1000:10.2f}ms")
+        for name, v in sorted(self.counters.items()):
+            lines.append(f"{name:30s} {v:12d}")
+        return "\n".join(lines)
@@ -0,0 +1,153 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+
+def identityCacheKey(obj) -> Hashable:
+    """
+    :return: key of object for :class:`~.TypeQueryCache` based on object identity
+    """
+    return (obj.__class__, id(obj))
+
+
+class _LruCache():
+    """
+    Bounded dictionary which evicts least recently used items
+
+    :ivar ~.hits: number of successful lookups
+    :ivar ~.misses: number of lookups of item which was not in cache
+    :ivar ~.evictions: number of items removed because the cache was full
+    """
+    __slots__ = ["maxsize", "_items", "hits", "misses", "evictions"]
+
+    def __init__(self, maxsize: Optional[int]):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class TypeQueryCache():
+    """
+    Cache for results of :class:`ipCorePackager.packager.IpCorePackager` methods
+    which are repeatedly asked about the same HdlType/value objects
+    (:meth:`~.serializeType`, :meth:`~.getVectorFromType`, :meth:`~.getTypeWidth`,
+    :meth:`~.serialzeValueToTCL`)
+
+    The key of an object is produced by
+    :meth:`ipCorePackager.packager.IpCorePackager.getTypeCacheKey`
+    (identity by default), the object is kept alive while it is in the cache
+    so the identity remains valid.
+
+    :note: The results are shared, they must not be modified.
+    :note: This object is thread safe.
+    """
+
+    QUERIES = ("serializeType", "getVectorFromType", "getTypeWidth", "serialzeValueToTCL")
+
+    def __init__(self, packager: "IpCorePackager", maxsize: Optional[int]=1024):
+        """
+        :param maxsize: maximal number of items for each query, 0 disables caching,
+            None for unbounded cache
+        """
+        self._packager = packager
+        self.maxsize = maxsize
+        self._lock = Lock()
+        self._caches: Dict[str, _LruCache] = {
+            q: _LruCache(maxsize) for q in self.QUERIES
+        }
+
+    def withPackager(self, packager: "IpCorePackager") -> "TypeQueryCache":
+        """
+        :return: cache which shares the items and statistics with this cache
+            but which calls the methods of a different packager object on a miss
+            (:see: :meth:`ipCorePackager.stats.PackagingStats.hookCountingView`)
+        """
+        c = self.__class__.__new__(self.__class__)
+        c._packager = packager
+        c.maxsize = self.maxsize
+        c._lock = self._lock
+        c._caches = self._caches
+        return c
+
+    def _query(self, queryName: str, obj, args: Tuple, fn):
+        c = self._caches[queryName]
+        if c.maxsize == 0:
+            with self._lock:
+                c.misses += 1
+            return fn(obj, *args)
+
+        k = (self._packager.getTypeCacheKey(obj), args)
+        items = c._items
+        with self._lock:
+            try:
+                v = items[k]
+            except KeyError:
+                c.misses += 1
+            else:
+                items.move_to_end(k)
+                c.hits += 1
+                return v[1]
+
+        v = fn(obj, *args)
+        with self._lock:
+            items[k] = (obj, v)
+            if c.maxsize is not None and len(items) > c.maxsize:
+                items.popitem(last=False)
+                c.evictions += 1
+        return v
+
+    def serializeType(self, hdlType: "HdlType") -> str:
+        return self._query("serializeType", hdlType, (),
+                           self._packager.serializeType)
+
+    def getVectorFromType(self, dtype: "HdlType") -> Union[bool, None, Tuple[int, int]]:
+        return self._query("getVectorFromType", dtype, (),
+                           self._packager.getVectorFromType)
+
+    def getTypeWidth(self, dtype: "HdlType", do_eval=False) -> Tuple[int, str, bool]:
+        return self._query("getTypeWidth", dtype, (do_eval,),
+                           self._packager.getTypeWidth)
+
+    def serialzeValueToTCL(self, val, do_eval=False) -> Tuple[str, str, bool]:
+        return self._query("serialzeValueToTCL", val, (do_eval,),
+                           self._packager.serialzeValueToTCL)
+
+    def clear(self):
+        with self._lock:
+            for c in self._caches.values():
+                c.clear()
+
+    def resetStats(self):
+        with self._lock:
+            for c in self._caches.values():
+                c.hits = c.misses = c.evictions = 0
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        :return: dictionary query name -> dictionary with hits, misses, evictions and size
+        """
+        with self._lock:
+            return {
+                q: {
+                    "hits": c.hits,
+                    "misses": c.misses,
+                    "evictions": c.evictions,
+                    "size": len(c),
+                }
+                for q, c in self._caches.items()
+            }
+
+    def __getstate__(self):
+        # cached objects may not be picklable and they would not be valid in other process
+        return {"_packager": self._packager, "maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(state["_packager"], state["maxsize"])
@@ -0,0 +1,399 @@
+"""
+Watch mode which keeps IP-core package in sync with the extra files of the packager
+
+Only the affected outputs are refreshed when the extra files (HDL, constraints, ...)
+change: the modified files are placed to the package again and the selected outputs
+which list the files (component.xml, component_hw.tcl) are rewritten from the component
+of the last packaging. The HDL conversion and the GUI are not generated again,
+use :meth:`PackageWatcher.build` if the design itself changed
+(or the list of the extra files changed).
+An incremental package (incremental=True) keeps its manifest up to date with the refreshed files.
+
+The changes are detected by inotify on Linux (the directories of the files are watched,
+so the editors which replace the file are also detected) and by polling of the file
+status elsewhere. Bursts of changes are merged (debounced) into a single refresh.
+
+.. code-block:: python
+
+    w = PackageWatcher(packager, "ip_repo", vendor="hwt")
+    w.watch(onRefresh=lambda files: print("refreshed", files))  # until w.stop()
+"""
+import ctypes
+import ctypes.util
+from functools import partial
+import os
+from os.path import relpath
+import select
+import struct
+import sys
+from threading import Event
+from time import monotonic, sleep
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from ipCorePackager.helpers import resolveTimestamp
+from ipCorePackager.packageDir import FileRecord, IncrementalPackageDir, PackageDir, \
+    _statKey
+from ipCorePackager.packager import IpCorePackager, PackagingRun
+from ipCorePackager.setList import SetList
+
+
+# inotify event masks (sys/inotify.h)
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | \
+    _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class _PollingFileMonitor():
+    """
+    Detects changes of the files by periodic comparison of size and mtime
+    """
+
+    def __init__(self, files: Iterable[str], pollInterval: float):
+        self._stat = {f: _statKey(f) for f in files}
+        self.pollInterval = pollInterval
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        :return: files which changed (may be empty if nothing changed until timeout)
+        """
+        end = monotonic() + timeout
+        while True:
+            changed = set()
+            for f, st in self._stat.items():
+                newSt = _statKey(f)
+                if newSt != st:
+                    self._stat[f] = newSt
+                    changed.add(f)
+            remaining = end - monotonic()
+            if changed or remaining <= 0:
+                return changed
+            sleep(min(self.pollInterval, remaining))
+
+    def close(self):
+        pass
+
+
+class _InotifyFileMonitor():
+    """
+    Detects changes of the files by Linux inotify on the directories of the files
+    """
+
+    def __init__(self, files: Iterable[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        self._fd = fd
+        self._files = set(files)
+        # watch descriptor -> directory
+        self._dirs: Dict[int, str] = {}
+        try:
+            for d in sorted(set(os.path.dirname(f) for f in self._files)):
+                wd = libc.inotify_add_watch(fd, os.fsencode(d), _IN_WATCH_MASK)
+                if wd < 0:
+                    e = ctypes.get_errno()
+                    raise OSError(e, os.strerror(e), d)
+                self._dirs[wd] = d
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        :return: files which changed (may be empty if nothing changed until timeout)
+        """
+        r, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not r:
+            return set()
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, nameLen = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = data[offset:offset + nameLen].rstrip(b"\0")
+            offset += nameLen
+            if mask & _IN_Q_OVERFLOW:
+                # some events were lost
+                return set(self._files)
+            d = self._dirs.get(wd, None)
+            if d is not None and name:
+                f = os.path.join(d, os.fsdecode(name))
+                if f in self._files:
+                    changed.add(f)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def _mkFileMonitor(files: List[str], pollInterval: float, useInotify: Optional[bool]):
+    """
+    :param useInotify: True to require inotify, False to use polling,
+        None to use inotify if available
+    """
+    if useInotify is None:
+        useInotify = sys.platform.startswith("linux")
+        if useInotify:
+            try:
+                return _InotifyFileMonitor(files)
+            except (OSError, AttributeError, TypeError):
+                # e.g. limit of inotify instances/watches, libc without inotify
+                pass
+        return _PollingFileMonitor(files, pollInterval)
+    elif useInotify:
+        return _InotifyFileMonitor(files)
+    else:
+        return _PollingFileMonitor(files, pollInterval)
+
+
+class PackageWatcher():
+    """
+    Keeps the IP-core package of the packager up to date with the extra files
+    of the packager (:attr:`ipCorePackager.packager.IpCorePackager.hdlFiles`)
+
+    :ivar ~.packager: packager of the IP-core
+    :ivar ~.run: :class:`ipCorePackager.packager.PackagingRun` of the last full packaging,
+        :attr:`~.PackagingRun.hdlFiles` are updated by each refresh
+    :ivar ~.refreshCount: number of refreshes since the last full packaging
+    """
+
+    def __init__(self, packager: IpCorePackager, repoDir: str,
+                 vendor: str="hwt", library: str="mylib",
+                 description: Optional[str]=None,
+                 debounce: float=0.2, pollInterval: float=0.5,
+                 useInotify: Optional[bool]=None,
+                 **createPackageKwargs):
+        """
+        The package is created immediately (:meth:`~.build`)
+
+        :param debounce: changes are refreshed after no other change was detected
+            for this time (in seconds)
+        :param pollInterval: interval of checking of the files if inotify is not used
+            (in seconds)
+        :param useInotify: True to require inotify, False to use polling,
+            None to use inotify if available
+        :param createPackageKwargs: additional arguments of
+            :meth:`ipCorePackager.packager.IpCorePackager.createPackage`
+        :see: :meth:`ipCorePackager.packager.IpCorePackager.createPackage`
+            for the rest of the parameters
+        """
+        self.packager = packager
+        self.repoDir = repoDir
+        self.vendor = vendor
+        self.library = library
+        self.description = description
+        self.debounce = debounce
+        self.pollInterval = pollInterval
+        self.useInotify = useInotify
+        self.createPackageKwargs = createPackageKwargs
+        self._stop = Event()
+        # watched path (absolute) -> extra file as specified in packager
+        self._sources: Dict[str, str] = {}
+        self._monitor = None
+        self.run: Optional[PackagingRun] = None
+        try:
+            self.build()
+        except BaseException:
+            self.close()
+            raise
+
+    def build(self) -> PackagingRun:
+        """
+        Create the whole package (e.g. if the design or the list of the extra files changed)
+        """
+        p = self.packager
+        sources = {os.path.abspath(f): f for f in p.hdlFiles}
+        # the monitor is created before the packaging, a change during the packaging
+        # is then detected as a change
+        monitor = _mkFileMonitor(list(sources.keys()), self.pollInterval, self.useInotify)
+        if self._monitor is not None:
+            self._monitor.close()
+        self._monitor = monitor
+        self._sources = sources
+        self._records: Dict[str, Optional[FileRecord]] = {
+            f: FileRecord.fromFile(f) for f in p.hdlFiles}
+
+        kwargs = dict(self.createPackageKwargs)
+        # resolved once, the refresh has to produce the same inputs digest
+        # as the packaging with the same files
+        self._timestamp = resolveTimestamp(kwargs.pop("timestamp", None),
+                                           kwargs.get("reproducible", False))
+        self.run = run = p.createPackage(self.repoDir, vendor=self.vendor,
+                                         library=self.library,
+                                         description=self.description,
+                                         timestamp=self._timestamp,
+                                         **kwargs)
+        srcDir = self._srcDir()
+        extraFiles = set(p._extraFilePackagePath(f, srcDir, run.name)
+                         for f in p.hdlFiles)
+        self._generatedFiles = [f for f in run.hdlFiles if f not in extraFiles]
+        self.refreshCount = 0
+        return run
+
+    def _srcDir(self) -> str:
+        return os.path.join(self.run.packageDir.root, "src")
+
+    def refresh(self, changed: Iterable[str]) -> List[str]:
+        """
+        Place the changed extra files to the package and rewrite the descriptions
+        of the IP-core (the extra files which do not exist are removed from the package)
+
+        :param changed: extra files which may have changed
+        :return: extra files which actually changed
+        """
+        p = self.packager
+        run = self.run
+        if run.upToDate:
+            # the package was up to date, there is no component to rewrite
+            self.build()
+            return sorted(changed)
+
+        root = run.packageDir.root
+        incremental = self.createPackageKwargs.get("incremental", False)
+        if incremental:
+            packageDir = IncrementalPackageDir(root, p.filePlacement)
+        else:
+            packageDir = PackageDir(root, p.filePlacement)
+        srcDir = self._srcDir()
+        records = self._records
+        res = []
+        for src in sorted(changed):
+            dst = p._extraFilePackagePath(src, srcDir, run.name)
+            old = records[src]
+            try:
+                new = FileRecord.fromFile(src)
+            except FileNotFoundError:
+                new = None
+
+            if new is None:
+                if old is None:
+                    continue
+                if os.path.lexists(dst):
+                    os.remove(dst)
+            elif old is not None and old.digest == new.digest and os.path.lexists(dst):
+                # only touched
+                records[src] = new
+                continue
+            else:
+                packageDir.placeFile(src, relpath(dst, root))
+            records[src] = new
+            res.append(src)
+
+        if not res:
+            return res
+
+        # files of the package in the order of the packaging, without removed extra files
+        run.hdlFiles = SetList(self._generatedFiles)
+        for f in p.hdlFiles:
+            if records[f] is not None:
+                run.hdlFiles.append(p._extraFilePackagePath(f, srcDir, run.name))
+        c = run.component
+        if c is not None:
+            c._files = run.fileSetFiles()
+        for t in run.targets:
+            if t.listsFiles:
+                p._writePackageFile(packageDir, t.relPath, partial(t.write, p, run))
+        if incremental:
+            self._updateManifest(packageDir)
+        self.refreshCount += 1
+        return res
+
+    def _updateManifest(self, packageDir: IncrementalPackageDir):
+        """
+        Save the manifest of the incremental package after the refresh
+        (the files which were not rewritten keep their records)
+        """
+        p = self.packager
+        run = self.run
+        root = packageDir.root
+        old = packageDir.oldManifest
+        m = packageDir.manifest
+        srcDir = self._srcDir()
+        removed = set(relpath(p._extraFilePackagePath(f, srcDir, run.name), root)
+                      for f, r in self._records.items() if r is None)
+        for relPath, r in old.outputs.items():
+            if relPath not in removed:
+                m.outputs.setdefault(relPath, r)
+        m.designFingerprint = old.designFingerprint
+        m.generatedHdlFiles = list(old.generatedHdlFiles)
+        m.hdlFiles = [relpath(f, root) for f in run.hdlFiles]
+        if removed:
+            # the packaging would fail on the missing file, the package is never up to date
+            m.inputsDigest = None
+        else:
+            m.inputsDigest = p._packageInputsDigest(
+                packageDir, run.name, self.vendor, self.library, self.description,
+                self._timestamp, run.targets)
+        packageDir.finish()
+
+    def pollOnce(self, timeout: float) -> List[str]:
+        """
+        Wait for changes, merge the burst of changes and refresh the package
+
+        :param timeout: maximal time to wait for the first change (in seconds)
+        :return: extra files which were refreshed (empty if nothing changed)
+        """
+        changed = self._monitor.wait(timeout)
+        if not changed:
+            return []
+        while True:
+            more = self._monitor.wait(self.debounce)
+            if not more:
+                break
+            changed.update(more)
+        return self.refresh(self._sources[f] for f in changed)
+
+    def watch(self, onRefresh: Optional[Callable[[List[str]], None]]=None,
+              onError: Optional[Callable[[Exception], None]]=None):
+        """
+        Refresh the package on changes until :meth:`~.stop`
+
+        :param onRefresh: function called with the list of refreshed extra files
+        :param onError: function called if the refresh fails (e.g. the file is not readable),
+            if not specified the exception is raised
+        """
+        while not self._stop.is_set():
+            try:
+                refreshed = self.pollOnce(0.1)
+            except OSError as e:
+                if onError is None:
+                    raise
+                onError(e)
+                continue
+            if refreshed and onRefresh is not None:
+                onRefresh(refreshed)
+        self._stop.clear()
+
+    def stop(self):
+        """
+        Stop :meth:`~.watch` (can be called from any thread)
+        """
+        self._stop.set()
+
+    def close(self):
+        """
+        Release the resources used to detect the changes
+        """
+        if self._monitor is not None:
+            self._monitor.close()
+            self._monitor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
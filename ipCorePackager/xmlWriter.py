@@ -0,0 +1,184 @@
+from typing import Dict, Iterable, List, Optional, TextIO
+
+import xml.etree.ElementTree as etree
+
+
+def _escape(s: str) -> str:
+    """
+    Escape text/attribute value in same way as :mod:`xml.dom.minidom` does
+    """
+    if "&" in s:
+        s = s.replace("&", "&amp;")
+    if "<" in s:
+        s = s.replace("<", "&lt;")
+    if '"' in s:
+        s = s.replace('"', "&quot;")
+    if ">" in s:
+        s = s.replace(">", "&gt;")
+    return s
+
+
+def escapeText(s: str) -> str:
+    # XML parser normalizes line ends in text nodes
+    if "\r" in s:
+        s = s.replace("\r\n", "\n").replace("\r", "\n")
+    return _escape(s)
+
+
+class PrettyXmlWriter():
+    """
+    Streaming writer of indented XML
+
+    The output is the same as the output of ``xml.dom.minidom`` ``toprettyxml()``
+    applied on document serialized by :mod:`xml.etree.ElementTree`,
+    but the document does not have to exist in memory as a whole.
+    The caller opens/closes container elements by :meth:`~.start`/:meth:`~.end`
+    and writes small subtrees (:class:`xml.etree.ElementTree.Element`) or text elements
+    as they are generated.
+
+    :ivar ~.out: text stream where output is written
+    :ivar ~.depth: number of currently opened elements
+    """
+
+    def __init__(self, out: TextIO, nsmap: Dict[str, str],
+                 indent: str="\t", newl: str="\n"):
+        """
+        :param out: text stream where output should be written
+        :param nsmap: dictionary prefix: namespace uri
+        :param indent: string used for single level of indentation
+        :param newl: string used as line end
+        """
+        self.out = out
+        self.nsmap = nsmap
+        self.indent = indent
+        self.newl = newl
+        self._prefixOfUri = {uri: prefix for prefix, uri in nsmap.items()}
+        # cache for tag/attribute name to serialized name
+        self._qnames = {}
+        self._open = []
+
+    @property
+    def depth(self) -> int:
+        return len(self._open)
+
+    def _qname(self, name: str) -> str:
+        try:
+            return self._qnames[name]
+        except KeyError:
+            pass
+
+        if name[:1] == "{":
+            uri, local = name[1:].rsplit("}", 1)
+            try:
+                prefix = self._prefixOfUri[uri]
+            except KeyError:
+                raise ValueError(
+                    "Namespace is not specified in nsmap of this writer", uri)
+            qn = f"{prefix:s}:{local:s}"
+        else:
+            qn = name
+        self._qnames[name] = qn
+        return qn
+
+    def _attribs(self, buff: List[str], attrib: Optional[Dict[str, str]],
+                 nsDecl: Iterable[str]=()):
+        for prefix in sorted(nsDecl):
+            buff.append(f' xmlns:{prefix:s}="{_escape(self.nsmap[prefix]):s}"')
+        if attrib:
+            for k, v in attrib.items():
+                buff.append(f' {self._qname(k):s}="{_escape(v):s}"')
+
+    def declaration(self):
+        self.out.write('<?xml version="1.0" ?>' + self.newl)
+
+    def start(self, tag: str, attrib: Optional[Dict[str, str]]=None,
+              nsDecl: Iterable[str]=()):
+        """
+        Open element which children will be written later
+
+        :note: the element is always written as a non-empty element,
+            an element without children should be written
+            by :meth:`~.element` or :meth:`~.textElement`
+        :param nsDecl: prefixes of namespaces which should be declared on this element
+        """
+        qn = self._qname(tag)
+        buff = [self.indent * len(self._open), "<", qn]
+        self._attribs(buff, attrib, nsDecl)
+        buff.append(">")
+        buff.append(self.newl)
+        self.out.write("".join(buff))
+        self._open.append(qn)
+
+    def end(self):
+        """
+        Close element opened by :meth:`~.start`
+        """
+        qn = self._open.pop()
+        self.out.write(f"{self.indent * len(self._open):s}</{qn:s}>{self.newl:s}")
+
+    def textElement(self, tag: str, text: Optional[str],
+                    attrib: Optional[Dict[str, str]]=None):
+        """
+        Write element which contains only text (or nothing if text is empty)
+        """
+        buff = []
+        self._element(buff, len(self._open), tag, attrib, text, ())
+        self.out.write("".join(buff))
+
+    def _element(self, buff: List[str], depth: int, tag: str,
+                 attrib: Optional[Dict[str, str]], text: Optional[str],
+                 children, nsDecl: Iterable[str]=()):
+        qn = self._qname(tag)
+        ind = self.indent * depth
+        buff.append(ind)
+        buff.append("<")
+        buff.append(qn)
+        self._attribs(buff, attrib, nsDecl)
+        if len(children):
+            assert not text, (tag, "Mixed content is not supported", text)
+            buff.append(">")
+            buff.append(self.newl)
+            for c in children:
+                assert not c.tail, (c.tag, "Mixed content is not supported", c.tail)
+                self._element(buff, depth + 1, c.tag, c.attrib, c.text, c)
+            buff.append(ind)
+            buff.append(f"</{qn:s}>{self.newl:s}")
+        elif text:
+            buff.append(">")
+            buff.append(escapeText(text))
+            buff.append(f"</{qn:s}>{self.newl:s}")
+        else:
+            buff.append("/>")
+            buff.append(self.newl)
+
+    def element(self, elm: etree.Element, nsDecl: Iterable[str]=()):
+        """
+        Write whole element subtree
+
+        :param nsDecl: prefixes of namespaces which should be declared on this element
+        """
+        buff = []
+        self._element(buff, len(self._open), elm.tag, elm.attrib,
+                      elm.text, elm, nsDecl)
+        self.out.write("".join(buff))
+
+    def elementToStr(self, elm: etree.Element) -> str:
+        """
+        :return: string which :meth:`~.element` would write for this element
+            at current depth
+        """
+        buff = []
+        self._element(buff, len(self._open), elm.tag, elm.attrib,
+                      elm.text, elm)
+        return "".join(buff)
+
+    def usedNamespaces(self, elm: etree.Element) -> List[str]:
+        """
+        :return: list of prefixes of namespaces used in the element subtree
+        """
+        used = set()
+        for e in elm.iter():
+            for n in (e.tag, *e.attrib.keys()):
+                if n[:1] == "{":
+                    used.add(self._qname(n).split(":", 1)[0])
+        return sorted(used)
@@ -5,6 +5,23 @@ import sys
 from unittest import TestLoader, TextTestRunner, TestSuite
 
 from hwtLib.tests.serialization.ipCorePackager_test import IpCorePackagerTC
+from tests.archivePackageDir_test import ArchivePackageDirTC
+from tests.batch_test import BatchPackagingTC
+from tests.catalog_test import IpCatalogTC
+from tests.compatibility_test import CompatibilityTC
+from tests.daemon_test import PackagingDaemonTC
+from tests.filePlacement_test import FilePlacementTC
+from tests.incremental_test import IncrementalPackagingTC
+from tests.ioPipeline_test import IoPipelineTC
+from tests.ipXactLoader_test import IpXactLoaderTC
+from tests.packageTargets_test import PackageTargetsTC
+from tests.port_test import PortTableTC
+from tests.setList_test import SetListTC
+from tests.stats_test import PackagingStatsTC
+from tests.syntheticPackager_test import SyntheticPackagerTC
+from tests.typeQueryCache_test import TypeQueryCacheTC
+from tests.watch_test import PackageWatcherTC, PackageWatcherInotifyTC
+from tests.xmlWriter_test import PrettyXmlWriterTC
 
 
 def testSuiteFromTCs(*tcs):
@@ -15,7 +32,25 @@ def testSuiteFromTCs(*tcs):
 
 
 suite = testSuiteFromTCs(
-    IpCorePackagerTC
+    IpCorePackagerTC,
+    PrettyXmlWriterTC,
+    FilePlacementTC,
+    IpXactLoaderTC,
+    IpCatalogTC,
+    PackagingDaemonTC,
+    SetListTC,
+    SyntheticPackagerTC,
+    CompatibilityTC,
+    PortTableTC,
+    TypeQueryCacheTC,
+    PackagingStatsTC,
+    IoPipelineTC,
+    IncrementalPackagingTC,
+    PackageTargetsTC,
+    ArchivePackageDirTC,
+    BatchPackagingTC,
+    PackageWatcherTC,
+    PackageWatcherInotifyTC,
 )
 
 if __name__ == '__main__':
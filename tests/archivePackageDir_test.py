@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import BytesIO, RawIOBase
+import os
+import tarfile
+import unittest
+import zipfile
+
+from ipCorePackager.stats import PackagingStats
+from tests.packagerTestCase import SyntheticPackagerTestCase
+from tests.syntheticDesign import generateDesign, StreamingSyntheticPackager, \
+    SyntheticPackager
+
+
+class _NonSeekableStream(RawIOBase):
+    """
+    Write only stream which collects the data (as a pipe or a socket would)
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data.extend(b)
+        return len(b)
+
+
+class ArchivePackageDirTC(SyntheticPackagerTestCase):
+
+    def test_createArchive_zip_same_as_package(self):
+        p = self.mkPackager(nPorts=100, nBusInterfaces=3)
+        p.createPackage(self.test_dir, reproducible=True)
+        ref = self.readPackage(os.path.join(self.test_dir, "synthetic_top"))
+
+        out = _NonSeekableStream()
+        p = self.mkPackager(nPorts=100, nBusInterfaces=3)
+        p.createArchive(out, "zip", reproducible=True)
+        with zipfile.ZipFile(BytesIO(out.data)) as z:
+            files = {i.filename: z.read(i) for i in z.infolist()}
+        self.assertEqual(files, {"synthetic_top/" + k: v for k, v in ref.items()})
+        # nothing was written to the file system
+        self.assertFalse(os.path.exists("synthetic_top"))
+
+    def test_createArchive_deterministic(self):
+        for fmt in ["zip", "tar", "tar.gz"]:
+            outputs = []
+            for p in [self.mkPackager(nPorts=50, nBusInterfaces=2),
+                      self.mkPackager(nPorts=50, nBusInterfaces=2)]:
+                out = BytesIO()
+                p.createArchive(out, fmt, timestamp=1700000000)
+                outputs.append(out.getvalue())
+            self.assertEqual(outputs[0], outputs[1], fmt)
+
+        with tarfile.open(fileobj=BytesIO(outputs[0]), mode="r:gz") as t:
+            members = t.getmembers()
+            self.assertEqual([m.name for m in members], [
+                "synthetic_top/src/synthetic_top/synthetic_top.vhd",
+                "synthetic_top/xgui/gui.tcl",
+                "synthetic_top/component.xml",
+                "synthetic_top/component_hw.tcl",
+            ])
+            for m in members:
+                self.assertEqual(m.mtime, 1700000000)
+                self.assertEqual(m.mode, 0o644)
+
+    def test_createArchive_stream_conversion(self):
+        top = generateDesign(nPorts=20)
+        ref = BytesIO()
+        SyntheticPackager(top, "synthetic_top").createArchive(ref, "tar", reproducible=True)
+        stats = PackagingStats()
+        p = StreamingSyntheticPackager(top, "synthetic_top", stats=stats)
+        out = BytesIO()
+        p.createArchive(out, "tar", reproducible=True)
+        self.assertEqual(out.getvalue(), ref.getvalue())
+        self.assertEqual(stats.counters["filesGenerated"], 1)
+        self.assertGreater(stats.counters["bytesWritten"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+import os
+import unittest
+
+from ipCorePackager.batch import PackagingJob, packageBatch, packageBatchInThreads
+from tests.packagerTestCase import SyntheticPackagerTestCase
+from tests.syntheticDesign import generateDesign, mkSyntheticPackager, \
+    StreamingSyntheticPackager, SyntheticPackager
+
+
+class BatchPackagingTC(SyntheticPackagerTestCase):
+
+    def test_packageBatch(self):
+        jobs = [PackagingJob(self.mkPackager(name=f"top{i:d}", nPorts=50))
+                for i in range(3)]
+        # the packager built in the worker
+        jobs.append(PackagingJob(partial(mkSyntheticPackager, "top3", nPorts=20),
+                                 name="top3"))
+        res = packageBatch(jobs, self.test_dir, maxWorkers=2, reproducible=True)
+        refRepo = os.path.join(self.test_dir, "ref")
+        for i, r in enumerate(res):
+            self.assertTrue(r.ok, r.error)
+            self.assertIs(r.job, jobs[i])
+            self.assertEqual(r.name, f"top{i:d}")
+            self.assertEqual(r.ipDir, os.path.join(self.test_dir, r.name))
+            self.assertEqual(len(r.hdlFiles), 1)
+        mkSyntheticPackager("top3", nPorts=20).createPackage(refRepo, reproducible=True)
+        self.assertEqual(self.readPackage(res[3].ipDir),
+                         self.readPackage(os.path.join(refRepo, "top3")))
+
+    def test_packageBatch_error_isolation(self):
+        missing = os.path.join(self.test_dir, "missing.vhd")
+        jobs = [
+            PackagingJob(self.mkPackager(name="ok0", nPorts=10)),
+            PackagingJob(SyntheticPackager(generateDesign(nPorts=10), "missingFile", [missing])),
+            PackagingJob(partial(mkSyntheticPackager, "badArgs", nonexisting=1),
+                         name="badArgs"),
+            PackagingJob(self.mkPackager(name="ok1", nPorts=10)),
+        ]
+        res = packageBatch(jobs, self.test_dir, maxWorkers=2)
+        self.assertEqual([r.ok for r in res], [True, False, False, True])
+        self.assertIn("FileNotFoundError", res[1].error)
+        self.assertIn("TypeError", res[2].error)
+        for r in (res[0], res[3]):
+            self.assertTrue(os.path.isfile(os.path.join(r.ipDir, "component.xml")))
+
+    def test_packageBatch_duplicate_name(self):
+        jobs = [PackagingJob(self.mkPackager(name="top", nPorts=10)),
+                PackagingJob(self.mkPackager(name="other", nPorts=10)),
+                PackagingJob(self.mkPackager(name="top", nPorts=20))]
+        for batch in (packageBatch, packageBatchInThreads):
+            res = batch(jobs, self.test_dir, maxWorkers=2)
+            self.assertEqual([r.ok for r in res], [True, True, False])
+            self.assertIn("already packaged by job 0", res[2].error)
+            self.assertIsNone(res[2].ipDir)
+
+        with self.assertRaises(ValueError):
+            PackagingJob(partial(mkSyntheticPackager, "top"))
+
+    def test_packageBatchInThreads_same_as_serial(self):
+        shared = generateDesign(nPorts=100, nBusInterfaces=4)
+        tops = [(f"top{i:d}", generateDesign(nPorts=50 + 10 * i, nBusInterfaces=i % 4))
+                for i in range(6)]
+        # the same design packaged under different names
+        tops.extend((f"shared{i:d}", shared) for i in range(6))
+
+        serialRepo = os.path.join(self.test_dir, "serial")
+        for name, top in tops:
+            run = SyntheticPackager(top, name).createPackage(serialRepo, reproducible=True)
+            self.assertEqual(len(run.hdlFiles), 1)
+
+        threadRepo = os.path.join(self.test_dir, "threads")
+        jobs = [PackagingJob(SyntheticPackager(top, name)) for name, top in tops]
+        res = packageBatchInThreads(jobs, threadRepo, maxWorkers=8, reproducible=True)
+        for (name, _), r in zip(tops, res):
+            self.assertTrue(r.ok, r.error)
+            self.assertEqual(self.readPackage(r.ipDir),
+                             self.readPackage(os.path.join(serialRepo, name)))
+        # the design is not modified by the packaging
+        for i in shared._hwIOs:
+            self.assertNotIn("_bi", i.__dict__)
+
+    def test_same_packager_concurrently(self):
+        p = StreamingSyntheticPackager(generateDesign(nPorts=200, nBusInterfaces=6),
+                                       "synthetic_top")
+        hdlFiles = list(p.hdlFiles)
+
+        def pack(_):
+            out = BytesIO()
+            run = p.createArchive(out, "tar", reproducible=True)
+            return out.getvalue(), list(run.hdlFiles)
+
+        ref = pack(None)
+        with ThreadPoolExecutor(8) as executor:
+            outputs = list(executor.map(pack, range(32)))
+        for o in outputs:
+            self.assertEqual(o, ref)
+        self.assertEqual(list(p.hdlFiles), hdlFiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of IP-core packaging on synthetic designs
+(:mod:`tests.syntheticDesign`)
+
+Time and peak memory of each phase of the packaging are measured
+and compared with stored baseline, the script exits with non-zero code
+if some phase is slower or needs more memory than allowed by tolerance.
+
+.. code-block:: bash
+
+    python3 -m tests.benchmark                      # run and compare with baseline
+    python3 -m tests.benchmark --config large       # run selected configurations
+    python3 -m tests.benchmark --ports 20000 --depth 8 --buses 64
+    python3 -m tests.benchmark --save-baseline      # store current results as baseline
+"""
+import argparse
+from contextlib import contextmanager
+import gc
+from io import StringIO
+import json
+import os
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+import tracemalloc
+import xml.etree.ElementTree as etree
+from typing import Dict, List, Optional
+
+from ipCorePackager.catalog import IpCatalog
+from ipCorePackager.component import Component
+from ipCorePackager.filePlacement import placeFile
+from ipCorePackager.helpers import prettify
+from ipCorePackager.ipXactLoader import loadComponent, loadRepository
+from ipCorePackager.setList import SetList
+from tests.syntheticDesign import generateDesign, SyntheticPackager
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+# configurations of synthetic designs
+BENCHMARK_CONFIGS = {
+    "small": dict(nPorts=100, nParams=8, depth=2, nBusInterfaces=4,
+                  nExtraFiles=4, extraFileSize=4 * 1024),
+    "medium": dict(nPorts=5000, nParams=100, depth=4, nBusInterfaces=32,
+                   nExtraFiles=16, extraFileSize=64 * 1024),
+    "large": dict(nPorts=50000, nParams=400, depth=8, nBusInterfaces=128,
+                  nExtraFiles=64, extraFileSize=256 * 1024),
+}
+DEFAULT_CONFIGS = ["small", "medium"]
+
+
+class PhaseRecorder():
+    """
+    Collects time and peak of allocated memory for each phase
+
+    :ivar ~.results: phase name -> {"time": seconds, "peak": bytes or None}
+    """
+
+    def __init__(self, measureMemory: bool):
+        self.measureMemory = measureMemory
+        self.results: Dict[str, Dict[str, Optional[float]]] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        # garbage of previous phases should not be collected in this one
+        gc.collect()
+        if self.measureMemory:
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            else:
+                # Python < 3.9, restart clears the traces and the peak
+                tracemalloc.stop()
+                tracemalloc.start()
+            base, _ = tracemalloc.get_traced_memory()
+        start = perf_counter()
+        yield
+        t = perf_counter() - start
+        if self.measureMemory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak -= base
+        else:
+            peak = None
+        self.results[name] = {"time": t, "peak": peak}
+
+
+def mkExtraFiles(d: str, nExtraFiles: int, extraFileSize: int) -> List[str]:
+    files = []
+    exts = [".vhd", ".v", ".xdc"]
+    line = "-- " + "x" * 76 + "\n"
+    content = line * max(extraFileSize // len(line), 1)
+    for i in range(nExtraFiles):
+        f = os.path.join(d, f"extra{i:d}{exts[i % len(exts)]:s}")
+        with open(f, "w") as fp:
+            fp.write(content)
+        files.append(f)
+    return files
+
+
+def benchmarkPackage(cfg: dict, workDir: str, measureMemory: bool) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Execute the phases of IP-core packaging one by one and measure them
+    """
+    rec = PhaseRecorder(measureMemory)
+    name = "synthetic_top"
+    cfg = dict(cfg)
+    nExtraFiles = cfg.pop("nExtraFiles")
+    extraFileSize = cfg.pop("extraFileSize")
+    srcDir = os.path.join(workDir, "extra")
+    ipDir = os.path.join(workDir, "ip")
+    hdlDir = os.path.join(ipDir, "src", name)
+    for d in (srcDir, hdlDir):
+        os.makedirs(d)
+
+    top = generateDesign(name=name, **cfg)
+    extraFiles = mkExtraFiles(srcDir, nExtraFiles, extraFileSize)
+    p = SyntheticPackager(top, name, extraFiles)
+
+    with rec.phase("toHdlConversion"):
+        hdlFiles = p.toHdlConversion(top, name, hdlDir)
+
+    with rec.phase("fileCopy"):
+        for f in extraFiles:
+            dst = os.path.join(hdlDir, os.path.basename(f))
+            placeFile(f, dst, p.filePlacement)
+            hdlFiles.append(dst)
+
+    with rec.phase("mkAutoGui"):
+        p.writeAutoGui(StringIO())
+
+    with rec.phase("asignTopHwModule"):
+        c = Component(p)
+        c._files = [os.path.relpath(f, ipDir) for f in sorted(hdlFiles)] + ["xgui/gui.tcl"]
+        c.vendor = "hwt"
+        c.library = "mylib"
+        c.description = name
+        c.asignTopHwModule(top, name)
+
+    with rec.phase("ip_xact"):
+        elm = c.ip_xact()
+
+    with rec.phase("prettify"):
+        prettify(elm)
+    del elm
+
+    with rec.phase("write_ip_xact"):
+        c.write_ip_xact(StringIO())
+
+    with rec.phase("quartus_tcl"):
+        c.quartus_tcl()
+
+    del c
+    with rec.phase("createPackage"):
+        p.createPackage(os.path.join(workDir, "repo"))
+
+    return rec.results
+
+
+class ListBackedSetList(list):
+    """
+    Previous implementation of :class:`ipCorePackager.setList.SetList`
+    (list shadowed by a set), used as a reference in :func:`~.benchmarkSetList`
+    """
+
+    def __init__(self, initSeq=None):
+        super(ListBackedSetList, self).__init__()
+        self.__s = set()
+        if initSeq is not None:
+            for item in initSeq:
+                self.append(item)
+
+    def append(self, item):
+        if item in self.__s:
+            return False
+        else:
+            self.__s.add(item)
+            list.append(self, item)
+            return True
+
+    def extend(self, items):
+        if self is items:
+            return
+        for item in items:
+            self.append(item)
+
+    def discard(self, item):
+        if item in self.__s:
+            self.remove(item)
+            return True
+        else:
+            return False
+
+    def remove(self, item):
+        self.__s.remove(item)
+        return list.remove(self, item)
+
+    def copy(self):
+        c = ListBackedSetList()
+        c.extend(self)
+        return c
+
+    def __contains__(self, key):
+        return key in self.__s
+
+
+def benchmarkSetList(cfg: dict, workDir: str, measureMemory: bool) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Compare :class:`ipCorePackager.setList.SetList` with the previous implementation
+    on as many file names as there are ports in the configuration
+    """
+    rec = PhaseRecorder(measureMemory)
+    n = cfg["nPorts"]
+    files = [os.path.join(workDir, "src", f"file{i:d}.vhd") for i in range(n)]
+    half = files[:n // 2]
+    for prefix, cls in [("old", ListBackedSetList), ("new", SetList)]:
+        with rec.phase(prefix + ".append"):
+            s = cls()
+            for f in files:
+                s.append(f)
+            for f in half:
+                s.append(f)
+
+        with rec.phase(prefix + ".extend"):
+            s2 = cls()
+            s2.extend(files)
+            s2.extend(half)
+
+        with rec.phase(prefix + ".copy"):
+            for _ in range(8):
+                s.copy()
+
+        with rec.phase(prefix + ".contains"):
+            for f in files:
+                f in s
+
+        # removal is quadratic for the old implementation, limit the number of items
+        toRemove = files[:min(n, 2000)]
+        with rec.phase(prefix + ".discard"):
+            for f in toRemove:
+                s.discard(f)
+        del s, s2
+
+    return rec.results
+
+
+# number of copies of the component in the repository of load benchmark
+LOAD_REPOSITORY_SIZE = 16
+
+
+def benchmarkLoad(cfg: dict, workDir: str, measureMemory: bool) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Load component.xml of the design and a repository of its copies
+    (:mod:`ipCorePackager.ipXactLoader`), parsing to the whole DOM is the reference
+    """
+    rec = PhaseRecorder(measureMemory)
+    name = "synthetic_top"
+    cfg = dict(cfg)
+    del cfg["nExtraFiles"], cfg["extraFileSize"]
+    top = generateDesign(name=name, **cfg)
+    c = Component(SyntheticPackager(top, name))
+    c._files = [f"src/{name:s}/{name:s}.vhd", "xgui/gui.tcl"]
+    c.asignTopHwModule(top, name)
+    repo = os.path.join(workDir, "repo")
+    for i in range(LOAD_REPOSITORY_SIZE):
+        d = os.path.join(repo, f"{name:s}_{i:d}")
+        os.makedirs(d)
+        with open(os.path.join(d, "component.xml"), "w", encoding="utf-8") as f:
+            c.write_ip_xact(f)
+    del c
+    fName = os.path.join(repo, f"{name:s}_0", "component.xml")
+
+    with rec.phase("etree.parse"):
+        etree.parse(fName)
+
+    with rec.phase("loadComponent"):
+        c = loadComponent(fName)
+
+    with rec.phase("write_ip_xact"):
+        c.write_ip_xact(StringIO())
+    del c
+
+    with rec.phase("loadRepository"):
+        loadRepository(repo)
+
+    return rec.results
+
+
+# number of IP-cores in the repository of catalog benchmark for the design with 100 ports,
+# the repository has about the same number of ports for all configurations
+CATALOG_REPOSITORY_SIZE = 256
+
+
+def benchmarkCatalog(cfg: dict, workDir: str, measureMemory: bool) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Build :class:`ipCorePackager.catalog.IpCatalog` of a repository of copies
+    of the component.xml of the design and update it after no change
+    and after change of a single IP-core
+    """
+    rec = PhaseRecorder(measureMemory)
+    name = "synthetic_top"
+    cfg = dict(cfg)
+    del cfg["nExtraFiles"], cfg["extraFileSize"]
+    top = generateDesign(name=name, **cfg)
+    c = Component(SyntheticPackager(top, name))
+    c._files = [f"src/{name:s}/{name:s}.vhd", "xgui/gui.tcl"]
+    c.asignTopHwModule(top, name)
+    buff = StringIO()
+    c.write_ip_xact(buff)
+    del c
+    repo = os.path.join(workDir, "repo")
+    for i in range(max(CATALOG_REPOSITORY_SIZE * 100 // cfg["nPorts"], 2)):
+        d = os.path.join(repo, f"core{i:d}")
+        os.makedirs(os.path.join(d, "src"))
+        with open(os.path.join(d, "component.xml"), "w", encoding="utf-8") as f:
+            f.write(buff.getvalue())
+
+    with rec.phase("build"):
+        IpCatalog(repo).update()
+
+    with rec.phase("noChange"):
+        IpCatalog(repo).update()
+
+    with open(os.path.join(repo, "core0", "component.xml"), "a", encoding="utf-8") as f:
+        f.write("\n")
+    with rec.phase("oneChanged"):
+        IpCatalog(repo).update()
+
+    return rec.results
+
+
+BENCHMARKS = {
+    "package": benchmarkPackage,
+    "setList": benchmarkSetList,
+    "load": benchmarkLoad,
+    "catalog": benchmarkCatalog,
+}
+
+
+def runBenchmark(benchmarkName: str, cfg: dict, repeat: int, measureMemory: bool):
+    """
+    :return: phase -> {"time": minimum of times, "peak": peak memory}
+    """
+    fn = BENCHMARKS[benchmarkName]
+    res = {}
+    for i in range(repeat):
+        workDir = tempfile.mkdtemp()
+        try:
+            r = fn(cfg, workDir, False)
+        finally:
+            shutil.rmtree(workDir)
+        for k, v in r.items():
+            prev = res.get(k, None)
+            if prev is None or prev["time"] > v["time"]:
+                res[k] = v
+
+    if measureMemory:
+        workDir = tempfile.mkdtemp()
+        tracemalloc.start()
+        try:
+            r = fn(cfg, workDir, True)
+        finally:
+            tracemalloc.stop()
+            shutil.rmtree(workDir)
+        for k, v in r.items():
+            res[k]["peak"] = v["peak"]
+    return res
+
+
+def compareWithBaseline(results: dict, baseline: dict, timeTolerance: float,
+                        memTolerance: float, minTime: float) -> List[str]:
+    """
+    :return: list of messages about regressions
+    """
+    regressions = []
+    for benchName, phases in results.items():
+        base = baseline.get(benchName, None)
+        if base is None:
+            continue
+        for phase, v in phases.items():
+            b = base.get(phase, None)
+            if b is None:
+                continue
+            limit = max(b["time"] * timeTolerance, b["time"] + minTime)
+            if v["time"] > limit:
+                regressions.append(
+                    f"{benchName:s} {phase:s}: time {v['time']:.4f}s > {limit:.4f}s"
+                    f" (baseline {b['time']:.4f}s)")
+            if v["peak"] is not None and b.get("peak") is not None:
+                limit = b["peak"] * memTolerance + 64 * 1024
+                if v["peak"] > limit:
+                    regressions.append(
+                        f"{benchName:s} {phase:s}: peak memory {v['peak']:d}B > {limit:.0f}B"
+                        f" (baseline {b['peak']:d}B)")
+    return regressions
+
+
+def printResults(results: dict, baseline: dict, out=sys.stdout):
+    for benchName, phases in results.items():
+        base = baseline.get(benchName, {})
+        out.write(f"{benchName:s}\n")
+        for phase, v in phases.items():
+            b = base.get(phase, None)
+            peak = "-" if v["peak"] is None else f"{v['peak'] / 1024:.0f}KiB"
+            line = f"    {phase:20s} {v['time'] * 1000:10.2f}ms {peak:>12s}"
+            if b is not None:
+                line += f"  (baseline {b['time'] * 1000:.2f}ms"
+                if b.get("peak") is not None:
+                    line += f" {b['peak'] / 1024:.0f}KiB"
+                line += ")"
+            out.write(line + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--benchmark", nargs="+", default=list(BENCHMARKS.keys()),
+                        choices=list(BENCHMARKS.keys()))
+    parser.add_argument("--config", nargs="+", default=None,
+                        choices=list(BENCHMARK_CONFIGS.keys()),
+                        help=f"configurations of synthetic design (default {DEFAULT_CONFIGS})")
+    parser.add_argument("--ports", type=int, help="custom configuration: number of ports")
+    parser.add_argument("--params", type=int, default=16, help="custom configuration: number of parameters")
+    parser.add_argument("--depth", type=int, default=2, help="custom configuration: nesting depth of bus interfaces")
+    parser.add_argument("--buses", type=int, default=8, help="custom configuration: number of bus interfaces")
+    parser.add_argument("--extra-files", type=int, default=8, help="custom configuration: number of extra files")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs, minimum of times is used")
+    parser.add_argument("--no-memory", action="store_true", help="do not measure peak memory")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="file with baseline results")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store results to baseline file instead of comparing")
+    parser.add_argument("--time-tolerance", type=float, default=2.0)
+    parser.add_argument("--mem-tolerance", type=float, default=1.2)
+    parser.add_argument("--min-time", type=float, default=0.005,
+                        help="time difference in seconds which is never reported as regression")
+    args = parser.parse_args(argv)
+
+    configs = {}
+    if args.ports is not None:
+        configs["custom"] = dict(nPorts=args.ports, nParams=args.params, depth=args.depth,
+                                 nBusInterfaces=args.buses, nExtraFiles=args.extra_files,
+                                 extraFileSize=64 * 1024)
+    for c in (args.config if args.config else ([] if configs else DEFAULT_CONFIGS)):
+        configs[c] = BENCHMARK_CONFIGS[c]
+
+    results = {}
+    for benchName in args.benchmark:
+        for cfgName, cfg in configs.items():
+            results[f"{benchName:s}/{cfgName:s}"] = runBenchmark(
+                benchName, cfg, args.repeat, not args.no_memory)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    printResults(results, baseline)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        return 0
+
+    regressions = compareWithBaseline(results, baseline, args.time_tolerance,
+                                      args.mem_tolerance, args.min_time)
+    for r in regressions:
+        sys.stderr.write("REGRESSION " + r + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ipCorePackager.catalog import CATALOG_FILE_NAME, IpCatalog
+from tests.syntheticDesign import generateDesign, SyntheticPackager
+
+
+class IpCatalogTC(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def createPackage(self, name: str, vendor="hwt", **kwargs):
+        top = generateDesign(name=name, **kwargs)
+        SyntheticPackager(top, name).createPackage(self.test_dir, vendor=vendor)
+        return os.path.join(self.test_dir, name, "component.xml")
+
+    def test_update_and_find(self):
+        self.createPackage("core0", nPorts=10, nBusInterfaces=0)
+        self.createPackage("core1", nPorts=20, nBusInterfaces=2)
+        self.createPackage("core2", vendor="acme", nPorts=30, nBusInterfaces=2)
+        broken = os.path.join(self.test_dir, "broken")
+        os.makedirs(broken)
+        with open(os.path.join(broken, "component.xml"), "w") as f:
+            f.write("<spirit:component")
+
+        errors = []
+        cat = IpCatalog(self.test_dir)
+        ch = cat.update(onError=lambda p, msg: errors.append(p))
+        self.assertEqual(ch.added, ["broken/component.xml", "core0/component.xml",
+                                    "core1/component.xml", "core2/component.xml"])
+        self.assertEqual(errors, ["broken/component.xml"])
+        self.assertTrue(os.path.isfile(os.path.join(self.test_dir, CATALOG_FILE_NAME)))
+
+        self.assertEqual([e.name for e in cat.find()], ["core0", "core1", "core2"])
+        self.assertEqual([e.name for e in cat.find(vendor="acme")], ["core2"])
+        self.assertEqual([e.name for e in cat.find(vlnv="hwt:mylib:core1:1.0")], ["core1"])
+        self.assertEqual([e.name for e in cat.find(busType="bus_0")], ["core1", "core2"])
+        self.assertEqual([e.name for e in cat.find(busType="bus_0", vendor="hwt")], ["core1"])
+        self.assertEqual([e.name for e in cat.find(
+            busType="synthetic.org:interface:bus_0:1.0")], ["core1", "core2"])
+        self.assertEqual(cat.find(name="nonexisting"), [])
+        self.assertEqual(cat.find(name="core0")[0].portCount, 12)
+        self.assertEqual([e.path for e in cat.errors()], ["broken/component.xml"])
+
+        # loaded from file
+        cat2 = IpCatalog(self.test_dir)
+        self.assertEqual([(e.path, e.vlnv, e.busTypes, e.portCount) for e in cat2.find()],
+                         [(e.path, e.vlnv, e.busTypes, e.portCount) for e in cat.find()])
+
+    def test_incremental_update(self):
+        for i in range(3):
+            self.createPackage(f"core{i:d}", nPorts=10)
+        cat = IpCatalog(self.test_dir)
+        cat.update()
+
+        cat = IpCatalog(self.test_dir)
+        ch = cat.update()
+        self.assertFalse(ch)
+        self.assertEqual(ch.unchanged, 3)
+
+        # touched file is not parsed again
+        f0 = os.path.join(self.test_dir, "core0", "component.xml")
+        st = os.stat(f0)
+        os.utime(f0, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        ch = cat.update()
+        self.assertFalse(ch)
+        self.assertTrue(IpCatalog(self.test_dir).entries["core0/component.xml"]
+                        .file.isValidFor(f0))
+
+        self.createPackage("core1", nPorts=40)
+        shutil.rmtree(os.path.join(self.test_dir, "core2"))
+        self.createPackage("core3", nPorts=10)
+        ch = cat.update()
+        self.assertEqual(ch.added, ["core3/component.xml"])
+        self.assertEqual(ch.updated, ["core1/component.xml"])
+        self.assertEqual(ch.removed, ["core2/component.xml"])
+        self.assertEqual(ch.unchanged, 1)
+        self.assertEqual(cat.find(name="core1")[0].portCount, 42)
+        self.assertEqual(cat.find(name="core2"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+from ipCorePackager.batch import PackagingJob, packageBatchInThreads
+from ipCorePackager.component import Component
+from tests.packagerTestCase import SyntheticPackagerTestCase
+
+
+class CompatibilityTC(SyntheticPackagerTestCase):
+    """
+    Deprecated API of the previous versions
+    """
+
+    def test_saveHdlFiles_replaces_hdlFiles(self):
+        extra = os.path.join(self.test_dir, "extra.vhd")
+        with open(extra, "w") as f:
+            f.write("-- extra\n")
+        p = self.mkPackager(nPorts=10)
+        p.hdlFiles.append(extra)
+        srcDir = os.path.join(self.test_dir, "src")
+        with self.assertWarns(DeprecationWarning):
+            files = p.saveHdlFiles(srcDir)
+        self.assertIs(p.hdlFiles, files)
+        self.assertEqual([os.path.normpath(f) for f in files], [
+            os.path.join(srcDir, "synthetic_top", "synthetic_top.vhd"),
+            os.path.join(srcDir, "synthetic_top", "extra.vhd"),
+        ])
+        for f in files:
+            self.assertTrue(os.path.isfile(f), f)
+
+    def test_guiFile(self):
+        p = self.mkPackager(nPorts=10)
+        run = p.createPackage(self.test_dir)
+        guiFile = os.path.join(self.test_dir, "synthetic_top", "xgui", "gui.tcl")
+        self.assertEqual(run.guiFile, guiFile)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(p.guiFile, guiFile)
+        with open(guiFile) as f:
+            ref = f.read()
+
+        os.remove(guiFile)
+        with self.assertWarns(DeprecationWarning):
+            p.mkAutoGui()
+        with open(guiFile) as f:
+            self.assertEqual(f.read(), ref)
+
+        otherGuiFile = os.path.join(self.test_dir, "gui.tcl")
+        with self.assertWarns(DeprecationWarning):
+            p.guiFile = otherGuiFile
+        with self.assertWarns(DeprecationWarning):
+            p.mkAutoGui()
+        self.assertTrue(os.path.isfile(otherGuiFile))
+
+        run = p.createPackage(self.test_dir, targets=["quartus"])
+        self.assertIsNone(run.guiFile)
+        with self.assertRaises(ValueError), self.assertWarns(DeprecationWarning):
+            self.mkPackager().mkAutoGui()
+
+    def test_getBusInterface(self):
+        p = self.mkPackager(nPorts=20, nBusInterfaces=2)
+        c = Component(p)
+        c.asignTopHwModule(p.top, p.name)
+        n = 0
+        for intf in c.busInterfaces:
+            bi = c.getBusInterface(intf)
+            if bi is not None:
+                # the bus interface is not stored on the interface of the design
+                self.assertNotIn("_bi", intf.__dict__)
+                n += 1
+        self.assertEqual(n, 4)
+
+    def test_name_does_not_modify_packager(self):
+        p = self.mkPackager(nPorts=10)
+        run = p.createPackage(self.test_dir, name="other")
+        self.assertEqual(run.name, "other")
+        self.assertEqual(p.name, "synthetic_top")
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.test_dir, "other", "src", "other", "other.vhd")))
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "synthetic_top")))
+
+        res = packageBatchInThreads([PackagingJob(p, name=f"job{i:d}") for i in range(3)],
+                                    self.test_dir)
+        for i, r in enumerate(res):
+            self.assertTrue(r.ok, r.error)
+            self.assertEqual(r.ipDir, os.path.join(self.test_dir, f"job{i:d}"))
+            with open(os.path.join(r.ipDir, "component.xml")) as f:
+                self.assertIn(f"<spirit:name>job{i:d}</spirit:name>", f.read())
+        self.assertEqual(p.name, "synthetic_top")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import socket
+import stat
+import tempfile
+from threading import Thread
+import unittest
+
+from ipCorePackager.daemon import PackagingClient, PackagingDaemon
+from tests.syntheticDesign import mkCachedSyntheticPackager, mkSyntheticPackager
+
+
+FACTORY = "tests.syntheticDesign:mkSyntheticPackager"
+CACHED_FACTORY = "tests.syntheticDesign:mkCachedSyntheticPackager"
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires Unix sockets")
+class PackagingDaemonTC(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.socketPath = os.path.join(self.test_dir, "d.sock")
+        self.daemon = PackagingDaemon(self.socketPath, maxWorkers=4)
+        self.thread = Thread(target=self.daemon.serveForever)
+        self.thread.start()
+        self.client = PackagingClient(self.socketPath, timeout=60)
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            self.daemon.shutdown()
+            self.thread.join()
+        shutil.rmtree(self.test_dir)
+
+    def _readPackage(self, ipDir):
+        res = {}
+        for root, _, files in os.walk(ipDir):
+            for f in files:
+                fn = os.path.join(root, f)
+                with open(fn, "rb") as fp:
+                    res[os.path.relpath(fn, ipDir)] = fp.read()
+        return res
+
+    def test_package(self):
+        repo = os.path.join(self.test_dir, "repo")
+        events = []
+        jobs = [{"factory": FACTORY, "kwargs": {"nPorts": 20 + i}, "name": f"core{i:d}",
+                 "repoDir": repo, "options": {"reproducible": True}}
+                for i in range(6)]
+        res = self.client.packageMany(jobs, onEvent=events.append)
+
+        refRepo = os.path.join(self.test_dir, "ref")
+        for i, r in enumerate(res):
+            self.assertTrue(r["ok"], r["error"])
+            self.assertEqual(r["id"], i)
+            self.assertEqual(r["ipDir"], os.path.join(repo, f"core{i:d}"))
+            self.assertEqual(len(r["hdlFiles"]), 1)
+            self.assertEqual(set(r["timing"]), {"queued", "build", "wait", "package"})
+            self.assertIn("ip_xact", r["phases"])
+            mkSyntheticPackager(f"core{i:d}", nPorts=20 + i).createPackage(
+                refRepo, reproducible=True)
+            self.assertEqual(self._readPackage(r["ipDir"]),
+                             self._readPackage(os.path.join(refRepo, f"core{i:d}")))
+
+        for i in range(len(jobs)):
+            self.assertEqual([e["event"] for e in events if e["id"] == i],
+                             ["queued", "started", "finished"])
+
+        # the daemon is still running and keeps the state
+        r = self.client.package(FACTORY, repo, name="core0", reproducible=True)
+        self.assertTrue(r["ok"], r["error"])
+        self.assertEqual(self.client.ping()["jobsFinished"], len(jobs) + 1)
+
+    def test_errors(self):
+        repo = os.path.join(self.test_dir, "repo")
+        r = self.client.package("tests.syntheticDesign:nonexisting", repo)
+        self.assertFalse(r["ok"])
+        self.assertIn("AttributeError", r["error"])
+        r = self.client.package(FACTORY, repo, kwargs={"nonexisting": 1})
+        self.assertFalse(r["ok"])
+        self.assertIn("TypeError", r["error"])
+        # the daemon is not affected by failed jobs
+        r = self.client.package(FACTORY, repo)
+        self.assertTrue(r["ok"], r["error"])
+
+    def test_socket_path(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socketPath).st_mode), 0o600)
+        # other daemon is listening on the socket
+        with self.assertRaises(FileExistsError):
+            PackagingDaemon(self.socketPath)
+        self.assertEqual(self.client.ping()["event"], "pong")
+
+        notSocket = os.path.join(self.test_dir, "file")
+        with open(notSocket, "w") as f:
+            f.write("data")
+        with self.assertRaises(FileExistsError):
+            PackagingDaemon(notSocket)
+        with open(notSocket) as f:
+            self.assertEqual(f.read(), "data")
+
+        # socket of a terminated daemon is replaced
+        stale = os.path.join(self.test_dir, "stale.sock")
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.bind(stale)
+        s.close()
+        d = PackagingDaemon(stale)
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(stale).st_mode), 0o600)
+        finally:
+            d._server.server_close()
+
+    def test_shared_packager(self):
+        repo = os.path.join(self.test_dir, "repo")
+        p = mkCachedSyntheticPackager("shared", nPorts=12)
+        state = dict(p.__dict__)
+        # the jobs with the same name are serialized, the others run in parallel
+        jobs = [{"factory": CACHED_FACTORY, "args": ["shared", 12],
+                 "name": f"core{i % 2:d}", "repoDir": repo,
+                 "options": {"reproducible": True}}
+                for i in range(6)]
+        res = self.client.packageMany(jobs)
+        refRepo = os.path.join(self.test_dir, "ref")
+        for i in range(2):
+            mkSyntheticPackager(f"core{i:d}", nPorts=12).createPackage(refRepo, reproducible=True)
+        for i, r in enumerate(res):
+            self.assertTrue(r["ok"], r["error"])
+            self.assertEqual(r["name"], f"core{i % 2:d}")
+            self.assertIn("ip_xact", r["phases"])
+            self.assertEqual(self._readPackage(r["ipDir"]),
+                             self._readPackage(os.path.join(refRepo, r["name"])))
+        self.assertEqual(p.__dict__, state)
+        self.assertIsNone(p.stats)
+        self.assertEqual(self.daemon._packageDirLocks, {})
+
+        # the name of the packager is used if the job does not specify it
+        r = self.client.package(CACHED_FACTORY, repo, args=["shared", 12])
+        self.assertTrue(r["ok"], r["error"])
+        self.assertEqual(r["ipDir"], os.path.join(repo, "shared"))
+
+    def test_shutdown(self):
+        self.client.shutdown()
+        self.thread.join(60)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.socketPath))
+
+
+if __name__ == "__main__":
+    unittest.main()
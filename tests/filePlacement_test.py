@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ipCorePackager.filePlacement import FILE_PLACEMENT, FilePlacementNotSupported, \
+    _PLACEMENT_FN, placeFile
+
+
+class FilePlacementTC(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.test_dir, "src.vhd")
+        with open(self.src, "w") as f:
+            f.write("-- src\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_all_methods_produce_same_content(self):
+        for p in FILE_PLACEMENT:
+            dst = os.path.join(self.test_dir, p.name + ".vhd")
+            used = placeFile(self.src, dst, p)
+            self.assertIn(used, FILE_PLACEMENT)
+            with open(dst) as f:
+                self.assertEqual(f.read(), "-- src\n", p)
+            # existing file is replaced
+            placeFile(self.src, dst, p)
+
+    def test_hardlink_shares_file(self):
+        probe = os.path.join(self.test_dir, "probe.vhd")
+        try:
+            os.link(self.src, probe)
+        except OSError as e:
+            self.skipTest(f"hard links are not supported: {e}")
+        dst = os.path.join(self.test_dir, "dst.vhd")
+        self.assertEqual(placeFile(self.src, dst, FILE_PLACEMENT.HARDLINK),
+                         FILE_PLACEMENT.HARDLINK)
+        self.assertTrue(os.path.samefile(self.src, dst))
+
+    @staticmethod
+    def _unsupported(exc):
+
+        def placement(src, dst):
+            # the destination may be created before the failure
+            with open(dst, "w") as f:
+                f.write("partial")
+            os.remove(dst)
+            raise exc
+
+        return placement
+
+    def test_fallback_chain(self):
+        dst = os.path.join(self.test_dir, "dst.vhd")
+        with patch.dict(_PLACEMENT_FN, {
+                    FILE_PLACEMENT.REFLINK: self._unsupported(
+                        OSError(errno.EOPNOTSUPP, "not supported")),
+                    FILE_PLACEMENT.COPY_FILE_RANGE: self._unsupported(
+                        FilePlacementNotSupported()),
+                }):
+            used = placeFile(self.src, dst, FILE_PLACEMENT.REFLINK)
+        self.assertEqual(used, FILE_PLACEMENT.COPY)
+        with open(dst) as f:
+            self.assertEqual(f.read(), "-- src\n")
+
+        with patch.dict(_PLACEMENT_FN, {
+                    FILE_PLACEMENT.HARDLINK: self._unsupported(
+                        OSError(errno.EXDEV, "cross device link")),
+                }):
+            used = placeFile(self.src, dst, FILE_PLACEMENT.HARDLINK)
+        self.assertEqual(used, FILE_PLACEMENT.COPY)
+        self.assertFalse(os.path.samefile(self.src, dst))
+        with open(dst) as f:
+            self.assertEqual(f.read(), "-- src\n")
+
+    def test_fallback_not_used_for_other_errors(self):
+        dst = os.path.join(self.test_dir, "dst.vhd")
+        with patch.dict(_PLACEMENT_FN, {
+                    FILE_PLACEMENT.REFLINK: self._unsupported(
+                        OSError(errno.ENOSPC, "no space left")),
+                }):
+            with self.assertRaises(OSError) as ctx:
+                placeFile(self.src, dst, FILE_PLACEMENT.REFLINK)
+        self.assertEqual(ctx.exception.errno, errno.ENOSPC)
+        with patch.dict(_PLACEMENT_FN, {
+                    FILE_PLACEMENT.COPY: self._unsupported(FilePlacementNotSupported()),
+                }):
+            with self.assertRaises(FilePlacementNotSupported):
+                placeFile(self.src, dst, FILE_PLACEMENT.COPY)
+
+    def test_missing_source(self):
+        with self.assertRaises(FileNotFoundError):
+            placeFile(os.path.join(self.test_dir, "missing.vhd"),
+                      os.path.join(self.test_dir, "dst.vhd"),
+                      FILE_PLACEMENT.REFLINK)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+from ipCorePackager.packageDir import MANIFEST_FILE_NAME
+from tests.packagerTestCase import SyntheticPackagerTestCase
+from tests.syntheticDesign import generateDesign, SyntheticPackager
+
+
+class CountingPackager(SyntheticPackager):
+    conversions = 0
+
+    def toHdlConversion(self, top, topName, saveTo):
+        CountingPackager.conversions += 1
+        return super(CountingPackager, self).toHdlConversion(top, topName, saveTo)
+
+
+class NoFingerprintPackager(CountingPackager):
+
+    def getDesignFingerprint(self, top):
+        return None
+
+
+class IncrementalPackagingTC(SyntheticPackagerTestCase):
+
+    def setUp(self):
+        super(IncrementalPackagingTC, self).setUp()
+        CountingPackager.conversions = 0
+        self.srcDir = os.path.join(self.test_dir, "hdl")
+        os.makedirs(self.srcDir)
+        self.extra = [self.writeSrc("a.vhd", "-- a\n"), self.writeSrc("b.vhd", "-- b\n")]
+        self.repo = os.path.join(self.test_dir, "repo")
+        self.ipDir = os.path.join(self.repo, "synthetic_top")
+
+    def writeSrc(self, name: str, content: str):
+        f = os.path.join(self.srcDir, name)
+        with open(f, "w") as fp:
+            fp.write(content)
+        return f
+
+    def createPackage(self, extra, packagerCls=CountingPackager, **kwargs):
+        p = packagerCls(generateDesign(nPorts=20, nBusInterfaces=2), "synthetic_top", extra)
+        return p.createPackage(self.repo, incremental=True, reproducible=True, **kwargs)
+
+    def fileIds(self):
+        """
+        :return: path in package -> (inode, mtime), it changes if the file is written
+        """
+        res = {}
+        for f in self.readPackage(self.ipDir).keys():
+            st = os.stat(os.path.join(self.ipDir, f))
+            res[f] = (st.st_ino, st.st_mtime_ns)
+        return res
+
+    def assertSameAsFullPackaging(self, extra):
+        refRepo = os.path.join(self.test_dir, "ref")
+        SyntheticPackager(generateDesign(nPorts=20, nBusInterfaces=2), "synthetic_top", extra)\
+            .createPackage(refRepo, reproducible=True)
+        out = self.readPackage(self.ipDir)
+        del out[MANIFEST_FILE_NAME]
+        self.assertEqual(out, self.readPackage(os.path.join(refRepo, "synthetic_top")))
+
+    def test_incremental_noop(self):
+        p = self.mkPackager()
+        p.createPackage(self.test_dir, incremental=True)
+        xml = os.path.join(self.test_dir, "synthetic_top", "component.xml")
+        st = os.stat(xml)
+        p = self.mkPackager()
+        p.createPackage(self.test_dir, incremental=True)
+        self.assertEqual(os.stat(xml).st_mtime_ns, st.st_mtime_ns)
+
+    def test_changed_extra_file(self):
+        self.createPackage(self.extra)
+        before = self.fileIds()
+        self.writeSrc("a.vhd", "-- a modified\n")
+        run = self.createPackage(self.extra)
+        self.assertFalse(run.upToDate)
+        after = self.fileIds()
+        changed = sorted(f for f in after if after[f] != before[f])
+        # only the changed file and the manifest were written
+        self.assertEqual(changed, sorted(["src/synthetic_top/hdl/a.vhd", MANIFEST_FILE_NAME]))
+        self.assertEqual(CountingPackager.conversions, 1)
+        self.assertSameAsFullPackaging(self.extra)
+
+    def test_removed_extra_file(self):
+        self.createPackage(self.extra)
+        before = self.fileIds()
+        self.createPackage(self.extra[:1])
+        after = self.fileIds()
+        self.assertNotIn("src/synthetic_top/hdl/b.vhd", after)
+        for f in ["component.xml", "component_hw.tcl"]:
+            with open(os.path.join(self.ipDir, f)) as fp:
+                self.assertNotIn("b.vhd", fp.read())
+        self.assertEqual(after["src/synthetic_top/hdl/a.vhd"], before["src/synthetic_top/hdl/a.vhd"])
+        self.assertSameAsFullPackaging(self.extra[:1])
+
+    def test_rebuild_without_manifest(self):
+        self.createPackage(self.extra)
+        os.remove(os.path.join(self.ipDir, MANIFEST_FILE_NAME))
+        stray = os.path.join(self.ipDir, "stray.txt")
+        with open(stray, "w") as f:
+            f.write("not a part of package\n")
+        run = self.createPackage(self.extra)
+        self.assertFalse(run.upToDate)
+        # the directory was wiped as in non incremental mode
+        self.assertFalse(os.path.exists(stray))
+        self.assertEqual(CountingPackager.conversions, 2)
+        self.assertSameAsFullPackaging(self.extra)
+
+    def test_rebuild_without_fingerprint(self):
+        for _ in range(2):
+            run = self.createPackage(self.extra, NoFingerprintPackager)
+            self.assertFalse(run.upToDate)
+        # the design is converted again, the files of the same content are kept
+        self.assertEqual(CountingPackager.conversions, 2)
+        self.assertSameAsFullPackaging(self.extra)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+from tests.packagerTestCase import SyntheticPackagerTestCase
+from tests.syntheticDesign import generateDesign, SyntheticPackager
+
+
+class IoPipelineTC(SyntheticPackagerTestCase):
+
+    def test_ioWorkers_same_as_serial(self):
+        extra = []
+        for i in range(6):
+            f = os.path.join(self.test_dir, f"extra{i:d}.vhd")
+            with open(f, "w") as fp:
+                fp.write(f"-- extra {i:d}\n")
+            extra.append(f)
+
+        outputs = []
+        for ioWorkers in (0, 4):
+            repo = os.path.join(self.test_dir, f"repo{ioWorkers:d}")
+            top = generateDesign(nPorts=200, nBusInterfaces=4)
+            p = SyntheticPackager(top, "synthetic_top", extra)
+            p.createPackage(repo, reproducible=True, ioWorkers=ioWorkers)
+            outputs.append(self.readPackage(os.path.join(repo, "synthetic_top")))
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn("src/synthetic_top/extra5.vhd", outputs[0])
+
+    def test_ioWorkers_error(self):
+        extra = [os.path.join(self.test_dir, f"missing{i:d}.vhd") for i in range(4)]
+        for ioWorkers in (0, 4):
+            p = SyntheticPackager(generateDesign(nPorts=10), "synthetic_top", extra)
+            with self.assertRaises(FileNotFoundError) as cm:
+                p.createPackage(os.path.join(self.test_dir, "repo"), ioWorkers=ioWorkers)
+            self.assertEqual(cm.exception.filename, extra[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import BytesIO, StringIO
+import os
+import shutil
+import tempfile
+import unittest
+
+from ipCorePackager.busInterface import BusInterface
+from ipCorePackager.component import Component
+from ipCorePackager.helpers import prettify
+from ipCorePackager.ipXactLoader import loadComponent, loadRepository
+from tests.syntheticDesign import generateDesign, SyntheticPackager
+
+
+THIRD_PARTY_COMPONENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<spirit:component xmlns:xilinx="http://www.xilinx.com"
+    xmlns:spirit="http://www.spiritconsortium.org/XMLSchema/SPIRIT/1685-2009">
+  <spirit:vendor>acme</spirit:vendor>
+  <spirit:library>ip</spirit:library>
+  <spirit:name>fifo</spirit:name>
+  <spirit:version>2.1</spirit:version>
+  <spirit:busInterfaces>
+    <spirit:busInterface>
+      <spirit:name>s_axis</spirit:name>
+      <spirit:busType spirit:vendor="xilinx.com" spirit:library="interface" spirit:name="axis" spirit:version="1.0"/>
+      <spirit:slave/>
+      <spirit:portMaps>
+        <spirit:portMap>
+          <spirit:logicalPort><spirit:name>TDATA</spirit:name></spirit:logicalPort>
+          <spirit:physicalPort><spirit:name>s_axis_tdata</spirit:name></spirit:physicalPort>
+        </spirit:portMap>
+      </spirit:portMaps>
+    </spirit:busInterface>
+  </spirit:busInterfaces>
+  <spirit:memoryMaps>
+    <spirit:memoryMap><spirit:name>regs</spirit:name></spirit:memoryMap>
+  </spirit:memoryMaps>
+  <spirit:model>
+    <spirit:ports>
+      <spirit:port>
+        <spirit:name>s_axis_tdata</spirit:name>
+        <spirit:wire>
+          <spirit:direction>in</spirit:direction>
+          <spirit:vector>
+            <spirit:left spirit:format="long" spirit:resolve="dependent" spirit:dependency="(spirit:decode(id('MODELPARAM_VALUE.W')) - 1)">7</spirit:left>
+            <spirit:right spirit:format="long">0</spirit:right>
+          </spirit:vector>
+        </spirit:wire>
+      </spirit:port>
+    </spirit:ports>
+  </spirit:model>
+  <spirit:parameters>
+    <spirit:parameter>
+      <spirit:name>W</spirit:name>
+      <spirit:value spirit:format="long" spirit:resolve="user" spirit:id="PARAM_VALUE.W">8</spirit:value>
+    </spirit:parameter>
+  </spirit:parameters>
+  <spirit:vendorExtensions>
+    <xilinx:coreExtensions>
+      <xilinx:displayName>FIFO</xilinx:displayName>
+      <xilinx:coreRevision>3</xilinx:coreRevision>
+    </xilinx:coreExtensions>
+  </spirit:vendorExtensions>
+</spirit:component>
+"""
+
+
+class IpXactLoaderTC(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def createPackage(self, name="synthetic_top", **kwargs):
+        top = generateDesign(name=name, **kwargs)
+        p = SyntheticPackager(top, name)
+        p.createPackage(self.test_dir)
+        return os.path.join(self.test_dir, name, "component.xml")
+
+    def test_round_trip(self):
+        fName = self.createPackage(nPorts=200, depth=3, nBusInterfaces=6)
+        with open(fName, encoding="utf-8") as f:
+            ref = f.read()
+
+        c = Component.load(fName)
+        self.assertEqual(c.name, "synthetic_top")
+        self.assertEqual(len(c.busInterfaces), ref.count("<spirit:busInterface>"))
+        buff = StringIO()
+        c.write_ip_xact(buff)
+        self.assertEqual(buff.getvalue(), ref)
+        self.assertEqual(prettify(c.ip_xact()), ref)
+        # ports of the same type share the type
+        self.assertLess(len(c.model.ports.types), len(c.model.ports))
+
+    def test_third_party(self):
+        c = loadComponent(BytesIO(THIRD_PARTY_COMPONENT))
+        self.assertEqual((c.vendor, c.library, c.name, c.version),
+                         ("acme", "ip", "fifo", "2.1"))
+        self.assertEqual(c.description, "")
+        bi, = c.busInterfaces
+        self.assertIsInstance(bi, BusInterface)
+        self.assertFalse(bi.isMaster)
+        self.assertIsNone(bi.abstractionType)
+        self.assertEqual(bi._portMaps, {"TDATA": "s_axis_tdata"})
+
+        p, = c.model.ports
+        self.assertEqual(p.direction, "in")
+        self.assertIsNone(p.type)
+        self.assertEqual(p.vector[0].dependency,
+                         "(spirit:decode(id('MODELPARAM_VALUE.W')) - 1)")
+        self.assertEqual(c.parameters[0].value.text, "8")
+
+        xml = prettify(c.ip_xact())
+        self.assertIn("<xilinx:displayName>FIFO</xilinx:displayName>", xml)
+        self.assertIn("<xilinx:coreRevision>3</xilinx:coreRevision>", xml)
+        self.assertIn('spirit:dependency="(spirit:decode(id(\'MODELPARAM_VALUE.W\')) - 1)"', xml)
+        self.assertNotIn("memoryMap", xml)
+
+        c2 = loadComponent(BytesIO(xml.encode("utf-8")))
+        self.assertEqual(prettify(c2.ip_xact()), xml)
+
+    def test_not_component(self):
+        with self.assertRaises(ValueError):
+            loadComponent(BytesIO(b"<root/>"))
+
+    def test_loadRepository(self):
+        for i in range(3):
+            self.createPackage(name=f"core{i:d}", nPorts=10)
+        broken = os.path.join(self.test_dir, "broken")
+        os.makedirs(broken)
+        with open(os.path.join(broken, "component.xml"), "w") as f:
+            f.write("<spirit:component")
+
+        errors = []
+        res = loadRepository(self.test_dir,
+                             onError=lambda f, e: errors.append(f))
+        self.assertEqual([c.name for _, c in res], ["core0", "core1", "core2"])
+        self.assertEqual(errors, [os.path.join(broken, "component.xml")])
+        with self.assertRaises(Exception):
+            loadRepository(self.test_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
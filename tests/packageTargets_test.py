@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+from ipCorePackager.stats import PackagingStats
+from tests.packagerTestCase import SyntheticPackagerTestCase
+
+
+class PackageTargetsTC(SyntheticPackagerTestCase):
+
+    def test_targets(self):
+        refRepo = os.path.join(self.test_dir, "ref")
+        self.mkPackager(nPorts=100, nBusInterfaces=3).createPackage(refRepo, reproducible=True)
+        ref = self.readPackage(os.path.join(refRepo, "synthetic_top"))
+
+        for targets, files in [(["quartus"], {"component_hw.tcl"}),
+                               (["xgui"], {"xgui/gui.tcl"}),
+                               (["ipxact", "xgui"], {"component.xml", "xgui/gui.tcl"})]:
+            repo = os.path.join(self.test_dir, "_".join(targets))
+            stats = PackagingStats()
+            p = self.mkPackager(nPorts=100, nBusInterfaces=3)
+            p.stats = stats
+            run = p.createPackage(repo, reproducible=True, targets=targets)
+            # written in order of registration
+            self.assertEqual([t.name for t in run.targets],
+                             [t for t in ["xgui", "ipxact", "quartus"] if t in targets])
+            out = self.readPackage(os.path.join(repo, "synthetic_top"))
+            hdl = {f for f in ref if f.startswith("src")}
+            self.assertEqual(set(out), files | hdl)
+            for f in out:
+                self.assertEqual(out[f], ref[f], f)
+
+            c = run.component
+            if targets == ["xgui"]:
+                self.assertIsNone(c)
+            elif "ipxact" not in targets:
+                # the ports, views and port maps were not built
+                self.assertEqual(len(c.model.ports), 0)
+                self.assertEqual(c.model.views, [])
+                self.assertTrue(all(not bi._portMaps for bi in c._bis.values()))
+                self.assertEqual(stats.counters["ports"], 0)
+
+        with self.assertRaises(ValueError):
+            self.mkPackager().createPackage(os.path.join(self.test_dir, "err"),
+                                            targets=["ipxact", "nonexisting"])
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "err")))
+
+    def test_targets_incremental(self):
+        p = self.mkPackager()
+        ipDir = os.path.join(self.test_dir, "synthetic_top")
+        p.createPackage(self.test_dir, incremental=True)
+        run = p.createPackage(self.test_dir, incremental=True, targets=["quartus"])
+        self.assertFalse(run.upToDate)
+        self.assertTrue(os.path.isfile(os.path.join(ipDir, "component_hw.tcl")))
+        # outputs which are not selected are removed as stale
+        self.assertFalse(os.path.exists(os.path.join(ipDir, "component.xml")))
+        self.assertFalse(os.path.exists(os.path.join(ipDir, "xgui", "gui.tcl")))
+        run = p.createPackage(self.test_dir, incremental=True, targets=["quartus"])
+        self.assertTrue(run.upToDate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+from typing import Dict
+import unittest
+
+from tests.syntheticDesign import generateDesign, SyntheticPackager
+
+
+class SyntheticPackagerTestCase(unittest.TestCase):
+    """
+    Base of test cases which package synthetic designs to a temporary directory
+    """
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def mkPackager(self, name="synthetic_top", **kwargs):
+        top = generateDesign(name=name, **kwargs)
+        return SyntheticPackager(top, name)
+
+    @staticmethod
+    def readPackage(ipDir: str) -> Dict[str, bytes]:
+        """
+        :return: path relative to ipDir (with "/" separators) -> content
+            for all files in the directory
+        """
+        files = {}
+        for root, _, fileNames in os.walk(ipDir):
+            for f in fileNames:
+                fName = os.path.join(root, f)
+                with open(fName, "rb") as fp:
+                    files[os.path.relpath(fName, ipDir).replace(os.sep, "/")] = fp.read()
+        return files
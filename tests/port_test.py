@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import StringIO
+import unittest
+
+from ipCorePackager.constants import DIRECTION
+from ipCorePackager.helpers import mkXmlWriter, spi_ns_prefix
+from ipCorePackager.port import Port, PortTable
+from tests.packagerTestCase import SyntheticPackagerTestCase
+from tests.syntheticDesign import SyntheticType
+
+
+def portTuple(p: Port):
+    return (p.name, p.direction, p.type.typeName, p.type.viewNameRefs, p.vector)
+
+
+class PortTableTC(SyntheticPackagerTestCase):
+
+    def test_port_table(self):
+        p = self.mkPackager(nPorts=10)
+        t8 = SyntheticType(8)
+        t1 = SyntheticType(1)
+        ports = [
+            Port.fromParams("a<&>", DIRECTION.IN, t8, p),
+            Port.fromParams("", DIRECTION.OUT, t1, p),
+            Port.fromParams("b", DIRECTION.INOUT, SyntheticType(8), p),
+        ]
+        table = PortTable()
+        table.add("a<&>", DIRECTION.IN, t8, p)
+        table.append(ports[1])
+        table.add("b", DIRECTION.INOUT, SyntheticType(8), p)
+        # types equal by value share the record
+        self.assertEqual(len(table.types), 2)
+        self.assertEqual([portTuple(x) for x in table], [portTuple(x) for x in ports])
+
+        def write(fn):
+            buff = StringIO()
+            w = mkXmlWriter(buff)
+            w.start(spi_ns_prefix + "ports")
+            fn(w)
+            w.end()
+            return buff.getvalue()
+
+        def writeEach(w):
+            for x in ports:
+                w.element(x.asElem(p))
+
+        self.assertEqual(write(lambda w: table.write_ip_xact(w, p)), write(writeEach))
+
+    def test_sequence(self):
+        p = self.mkPackager(nPorts=10)
+        table = PortTable()
+        widths = [1, 8, 8, 32, 1, 64]
+        for i, w in enumerate(widths):
+            table.add(f"p{i:d}", (DIRECTION.IN, DIRECTION.OUT)[i % 2], SyntheticType(w), p)
+        # the columns
+        self.assertEqual(table.names, [f"p{i:d}" for i in range(len(widths))])
+        self.assertEqual(list(table.typeIds), [0, 1, 1, 2, 0, 3])
+        self.assertEqual([t.vector for t in table.types], [False, [7, 0], [31, 0], [63, 0]])
+
+        self.assertEqual(len(table), len(widths))
+        self.assertEqual(table[-1].name, "p5")
+        self.assertEqual(table[1].direction, "out")
+        self.assertEqual([x.name for x in table[1:5:2]], ["p1", "p3"])
+        self.assertEqual([x.name for x in table[::-1]], [f"p{i:d}" for i in reversed(range(6))])
+        self.assertEqual(table[10:], [])
+        with self.assertRaises(IndexError):
+            table[len(widths)]
+
+        # STD_LOGIC_VECTOR types of different widths share the WireTypeDef
+        self.assertIs(table[1].type, table[3].type)
+        self.assertIsNot(table[0].type, table[1].type)
+
+    def test_wireTypeDefs_not_shared_between_tables(self):
+        p = self.mkPackager(nPorts=10)
+        tables = [PortTable(), PortTable()]
+        for t in tables:
+            t.add("a", DIRECTION.IN, SyntheticType(8), p)
+        self.assertIsNot(tables[0][0].type, tables[1][0].type)
+        self.assertEqual(portTuple(tables[0][0]), portTuple(tables[1][0]))
+        self.assertIsNot(Port.fromParams("a", DIRECTION.IN, SyntheticType(8), p).type,
+                         Port.fromParams("b", DIRECTION.IN, SyntheticType(8), p).type)
+
+    def test_append_loaded_ports(self):
+        p = self.mkPackager(nPorts=10)
+        src = [Port.fromParams(f"p{i:d}", DIRECTION.OUT, SyntheticType(8), p) for i in range(3)]
+        # ports which share the type and vector objects share the type in table
+        src[1].type = src[0].type
+        src[1].vector = src[0].vector
+        table = PortTable()
+        for x in src:
+            table.append(x)
+        self.assertEqual(list(table.typeIds), [0, 0, 1])
+        self.assertEqual([portTuple(x) for x in table], [portTuple(x) for x in src])
+
+    def test_port_does_not_keep_packager(self):
+        p = self.mkPackager(nPorts=10)
+        port = Port.fromParams("a", DIRECTION.IN, SyntheticType(8), p)
+        self.assertFalse(hasattr(port, "_packager"))
+        ref = self._elemToStr(port.asElem(p))
+        with self.assertRaises(TypeError):
+            port.asElem()
+        # the packager is needed only to serialize the vector
+        port1 = Port.fromParams("b", DIRECTION.IN, SyntheticType(1), p)
+        self.assertEqual(self._elemToStr(port1.asElem()), self._elemToStr(port1.asElem(p)))
+
+        with self.assertWarns(DeprecationWarning):
+            port2 = Port(p)
+        self.assertFalse(hasattr(port2, "_packager"))
+        port2.name = port.name
+        port2.direction = port.direction
+        port2.type = port.type
+        port2.vector = port.vector
+        self.assertEqual(self._elemToStr(port2.asElem(p)), ref)
+
+    @staticmethod
+    def _elemToStr(e):
+        return mkXmlWriter(StringIO()).elementToStr(e)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from copy import copy, deepcopy
+import pickle
+import unittest
+
+from ipCorePackager.setList import SetList
+
+
+class SetListTC(unittest.TestCase):
+
+    def test_append_unique(self):
+        s = SetList([1, 2, 1, 3])
+        self.assertEqual(s, [1, 2, 3])
+        self.assertTrue(s.append(4))
+        self.assertFalse(s.append(2))
+        self.assertEqual(list(s), [1, 2, 3, 4])
+        self.assertEqual(len(s), 4)
+        self.assertIn(3, s)
+        self.assertNotIn(5, s)
+
+    def test_positional(self):
+        s = SetList("abcd")
+        self.assertEqual(s[0], "a")
+        self.assertEqual(s[-1], "d")
+        self.assertEqual(s[1:3], ["b", "c"])
+        self.assertEqual(s.index("c"), 2)
+        self.assertEqual(list(reversed(s)), ["d", "c", "b", "a"])
+        self.assertEqual(s.pop(), "d")
+        self.assertEqual(s.pop(0), "a")
+        del s[0]
+        self.assertEqual(s, ["c"])
+        with self.assertRaises(NotImplementedError):
+            s[0] = "x"
+
+    def test_insert_does_not_duplicate(self):
+        s = SetList([1, 2, 3])
+        self.assertFalse(s.insert(0, 3))
+        self.assertTrue(s.insert(1, 4))
+        self.assertEqual(s, [1, 4, 2, 3])
+        s.remove(4)
+        self.assertEqual(s, [1, 2, 3])
+        self.assertEqual(s[1], 2)
+
+    def test_remove_discard(self):
+        s = SetList([1, 2, 3])
+        self.assertTrue(s.discard(2))
+        self.assertFalse(s.discard(2))
+        with self.assertRaises(KeyError):
+            s.remove(2)
+        self.assertEqual(s, [1, 3])
+
+    def test_bulk(self):
+        a = SetList([1, 2, 3, 4])
+        b = SetList([5, 4, 2])
+        self.assertEqual(a.union(b), [1, 2, 3, 4, 5])
+        self.assertEqual(a.difference(b), [1, 3])
+        self.assertEqual(a.difference([1, 1]), [2, 3, 4])
+        self.assertEqual(a.intersection(b), [2, 4])
+        self.assertEqual(a.intersection_set(b), {2, 4})
+        c = a.copy()
+        c.update([0, 1])
+        self.assertEqual(c, [1, 2, 3, 4, 0])
+        self.assertEqual(a, [1, 2, 3, 4])
+        a.extend(a)
+        self.assertEqual(a, [1, 2, 3, 4])
+
+    def test_list_semantics(self):
+        s = SetList([3, 1, 2])
+        s.sort()
+        self.assertEqual(s, [1, 2, 3])
+        s.sort(reverse=True)
+        self.assertEqual(s, [3, 2, 1])
+        s.reverse()
+        self.assertEqual(s, [1, 2, 3])
+        # sorting does not break the membership
+        self.assertFalse(s.append(3))
+        self.assertTrue(s.discard(1))
+        self.assertEqual(s, [2, 3])
+
+        # operations which create a new object behave as for list
+        self.assertEqual(s + [3, 4], [2, 3, 3, 4])
+        self.assertEqual(type(s + [4]), list)
+        self.assertEqual(s * 2, [2, 3, 2, 3])
+        self.assertEqual(2 * s, [2, 3, 2, 3])
+        self.assertEqual(type(s[:]), list)
+        self.assertEqual([1] + s, [1, 2, 3])
+        self.assertEqual(s + SetList([3]), [2, 3, 3])
+        with self.assertRaises(TypeError):
+            s + (4,)
+        # in place operations keep the items unique
+        s += [3, 4]
+        self.assertEqual(s, [2, 3, 4])
+        self.assertIsInstance(s, SetList)
+        s *= 3
+        self.assertEqual(s, [2, 3, 4])
+        s *= 0
+        self.assertEqual(s, [])
+        self.assertTrue(s.append(2))
+
+    def test_del_slice(self):
+        s = SetList(range(6))
+        del s[1:5:2]
+        self.assertEqual(s, [0, 2, 4, 5])
+        self.assertNotIn(1, s)
+        self.assertNotIn(3, s)
+        self.assertTrue(s.append(3))
+        self.assertEqual(s.index(3), 4)
+        with self.assertRaises(ValueError):
+            s.index(1)
+
+    def test_positional_after_modification(self):
+        s = SetList(range(5))
+        self.assertEqual(s[3], 3)
+        s.remove(1)
+        self.assertEqual(s[1], 2)
+        self.assertEqual(s.index(4), 3)
+        s.append(1)
+        self.assertEqual(s[-1], 1)
+        s.sort()
+        self.assertEqual(s.index(1), 1)
+        self.assertFalse(s.append(4))
+        self.assertEqual(s.pop(1), 1)
+        self.assertEqual(s, [0, 2, 3, 4])
+        with self.assertRaises(IndexError):
+            SetList().pop()
+
+    def test_copy(self):
+        a = SetList([1, 2])
+        for c in (a.copy(), copy(a), deepcopy(a)):
+            self.assertIsInstance(c, SetList)
+            c.append(3)
+            self.assertFalse(c.append(1))
+            self.assertEqual(c, [1, 2, 3])
+        self.assertEqual(a, [1, 2])
+
+    def test_pickle(self):
+        for items in [[], ["a", "b"]]:
+            s = pickle.loads(pickle.dumps(SetList(items)))
+            self.assertEqual(s, items)
+            s.append("c")
+            self.assertIn("c", s)
+
+
+if __name__ == '__main__':
+    unittest.main()
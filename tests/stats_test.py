@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from threading import Barrier, current_thread, Thread
+import unittest
+
+from ipCorePackager.stats import PackagingStats
+from tests.packagerTestCase import SyntheticPackagerTestCase
+
+
+class PackagingStatsTC(SyntheticPackagerTestCase):
+
+    def test_stats(self):
+        events = []
+        profileDir = os.path.join(self.test_dir, "prof")
+        stats = PackagingStats(listener=lambda e, name, t: events.append((e, name)),
+                               countHookCalls=True, profileDir=profileDir,
+                               profileMemory=True)
+        p = self.mkPackager(nPorts=50, nParams=5, nBusInterfaces=2)
+        p.stats = stats
+        p.createPackage(os.path.join(self.test_dir, "repo"))
+
+        phases = stats.elapsed()
+        for ph in ["createPackage", "toHdlConversion", "fileCopy", "mkAutoGui",
+                   "asignTopHwModule", "ip_xact", "quartus_tcl"]:
+            self.assertIn(ph, phases)
+            self.assertIn(("start", ph), events)
+            self.assertIn(("end", ph), events)
+        self.assertTrue(os.path.isfile(os.path.join(profileDir, "ip_xact.prof")))
+        self.assertTrue(os.path.isfile(os.path.join(profileDir, "ip_xact.tracemalloc")))
+
+        c = stats.counters
+        self.assertEqual(c["parameters"], 5)
+        self.assertEqual(c["hook.getParamPhysicalName"], 5)
+        self.assertEqual(c["hook.toHdlConversion"], 1)
+        self.assertGreater(c["ports"], 50)
+        self.assertGreater(c["bytesWritten"], 0)
+        self.assertGreater(c["hook.serializeType"], 0)
+        # the instance is not modified
+        self.assertNotIn("getParamPhysicalName", p.__dict__)
+
+    def test_stats_ioWorkers(self):
+        extra = []
+        for i in range(3):
+            f = os.path.join(self.test_dir, f"extra{i:d}.vhd")
+            with open(f, "w") as fp:
+                fp.write(f"-- extra {i:d}\n")
+            extra.append(f)
+
+        threads = {}
+
+        def listener(e, name, t):
+            if e == "start":
+                threads.setdefault(name, set()).add(current_thread().name)
+
+        stats = PackagingStats(listener=listener)
+        p = self.mkPackager(nPorts=50, nBusInterfaces=2)
+        p.hdlFiles.extend(extra)
+        p.stats = stats
+        p.createPackage(os.path.join(self.test_dir, "repo"), ioWorkers=2)
+
+        # the work is measured in the workers, not just its submission
+        for ph in ["fileCopy", "mkAutoGui", "ip_xact", "quartus_tcl"]:
+            self.assertTrue(all(t.startswith("ipCorePackager_io") for t in threads[ph]),
+                            (ph, threads[ph]))
+        self.assertEqual(len([r for r in stats.phases if r.name == "fileCopy"]), len(extra))
+        self.assertEqual(threads["ioWait"], {current_thread().name})
+        self.assertEqual(len(stats.phases), len(threads) + len(extra) - 1)
+
+    def test_hook_counting_concurrent(self):
+        nParams = 5
+        p = self.mkPackager(nPorts=50, nParams=nParams, nBusInterfaces=2)
+        p.stats = stats = PackagingStats(countHookCalls=True)
+        attrs = dict(p.__dict__)
+        barrier = Barrier(2)
+        errors = []
+
+        def package(i):
+            try:
+                barrier.wait()
+                p.createPackage(os.path.join(self.test_dir, f"repo{i:d}"), ioWorkers=2)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [Thread(target=package, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        c = stats.counters
+        self.assertEqual(c["hook.toHdlConversion"], 2)
+        self.assertEqual(c["hook.getParamPhysicalName"], 2 * nParams)
+        # only the deprecated guiFile is set
+        attrs["_guiFile"] = p._guiFile
+        self.assertEqual(p.__dict__, attrs)
+        self.assertIs(p.typeCache._packager, p)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Self-contained design model and :class:`IpCorePackager` implementation
+used by tests and benchmarks which should not depend on hwt/hwtLib.
+
+The objects mimic the attributes of hwt HwIO/HwModule/HwParam which are
+used by ipCorePackager.
+"""
+from functools import partial
+import os
+from typing import Callable, ContextManager, Dict, List, Optional, TextIO, Tuple, Union
+
+from ipCorePackager.constants import INTF_DIRECTION
+from ipCorePackager.intfIpMeta import IntfIpMeta, IntfIpMetaNotSpecifiedError, \
+    VALUE_RESOLVE
+from ipCorePackager.otherXmlObjs import Value
+from ipCorePackager.packager import IpCorePackager
+from ipCorePackager.typeQueryCache import identityCacheKey
+
+
+class SyntheticType():
+    """
+    Bit vector type (width == 1 means single bit)
+    """
+    __slots__ = ["width"]
+
+    def __init__(self, width: int):
+        self.width = width
+
+    def __eq__(self, other):
+        return isinstance(other, SyntheticType) and self.width == other.width
+
+    def __hash__(self):
+        return hash((SyntheticType, self.width))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self.width:d}>"
+
+
+class SyntheticSignal():
+    __slots__ = ["_name"]
+
+    def __init__(self, name: str):
+        self._name = name
+
+
+class SyntheticParam():
+
+    def __init__(self, name: str, value: Union[int, bool, str]):
+        self.name = name
+        self.value = value
+
+
+class SyntheticHwIO():
+    """
+    Interface instance (leaf is a signal, non-leaf is a composite interface)
+    """
+
+    def __init__(self, name: str, parent: Optional["SyntheticHwIO"]=None,
+                 direction: INTF_DIRECTION=INTF_DIRECTION.SLAVE,
+                 dtype: Optional[SyntheticType]=None, ipMeta=None):
+        self._name = name
+        self._parent = parent
+        self._direction = direction
+        self._dtype = dtype
+        self._hwIOs = []
+        self._isExtern = True
+        self._ipMeta = ipMeta
+        self._associatedClk = None
+        self._associatedRst = None
+        if parent is None:
+            self._hdlName = name
+            self._fullName = name
+        else:
+            self._hdlName = parent._hdlName + "_" + name
+            self._fullName = parent._fullName + "." + name
+        self._sigInside = SyntheticSignal(self._hdlName)
+
+    def _getHdlName(self) -> str:
+        return self._hdlName
+
+    def _getFullName(self) -> str:
+        return self._fullName
+
+    def _getIpCoreIntfClass(self):
+        if self._ipMeta is None:
+            raise IntfIpMetaNotSpecifiedError()
+        return self._ipMeta
+
+    def _getAssociatedClk(self):
+        return self._associatedClk
+
+    def _getAssociatedRst(self):
+        return self._associatedRst
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} {self._getFullName():s}>"
+
+
+class SyntheticHwModule():
+
+    def __init__(self, name: str):
+        self._name = name
+        self._hwIOs = []
+        self._params = []
+        # string which identifies the configuration of the generator
+        self._fingerprint = None
+
+
+class IP_SyntheticClk(IntfIpMeta):
+
+    def __init__(self):
+        super().__init__()
+        self.name = "clock"
+        self.version = "1.0"
+        self.vendor = "xilinx.com"
+        self.library = "signal"
+        self.map = "CLK"
+
+    def postProcess(self, component, packager, thisIf):
+        logicName = packager.getInterfaceLogicalName
+        associated = [
+            i for i in component.busInterfaces
+            if i is not thisIf and i._getAssociatedClk() is thisIf
+        ]
+        self.addSimpleParam(logicName(thisIf), "ASSOCIATED_BUSIF", ":".join(
+            logicName(i) for i in associated), resolve=VALUE_RESOLVE.NONE)
+        self.addSimpleParam(logicName(thisIf), "FREQ_HZ", "100000000",
+                            resolve=VALUE_RESOLVE.USER)
+
+    def asQuartusTcl(self, buff: List[str], version: str, component,
+                     packager, thisIf):
+        self.quartus_tcl_add_interface(buff, thisIf, packager)
+        name = packager.getInterfacePhysicalName(thisIf)
+        self.quartus_prop(buff, name, "clockRate", 0)
+        self.quartus_add_interface_port(buff, name, thisIf, "clk", packager)
+
+
+class IP_SyntheticRst_n(IntfIpMeta):
+
+    def __init__(self):
+        super().__init__()
+        self.name = "reset"
+        self.version = "1.0"
+        self.vendor = "xilinx.com"
+        self.library = "signal"
+        self.map = "rst"
+
+    def postProcess(self, component, packager, thisIf):
+        self.addSimpleParam(
+            packager.getInterfaceLogicalName(thisIf), "POLARITY", "ACTIVE_LOW")
+
+    def asQuartusTcl(self, buff: List[str], version: str, component,
+                     packager, thisIf):
+        self.quartus_tcl_add_interface(buff, thisIf, packager)
+        name = packager.getInterfacePhysicalName(thisIf)
+        self.quartus_prop(buff, name, "synchronousEdges", "DEASSERT")
+        self.quartus_add_interface_port(buff, name, thisIf, "reset_n", packager)
+
+
+class IP_SyntheticBus(IntfIpMeta):
+    """
+    IntfIpMeta of a synthetic bus with specified logical map
+    (use :func:`~._mkSyntheticBusMeta` to get a factory for HwIO._ipMeta)
+    """
+
+    def __init__(self, busName: str, busMap: dict):
+        super().__init__()
+        self.name = busName
+        self.version = "1.0"
+        self.vendor = "synthetic.org"
+        self.library = "interface"
+        self.map = busMap
+
+    def postProcess(self, component, packager, thisIf):
+        name = packager.getInterfaceLogicalName(thisIf)
+        self.addSimpleParam(name, "PROTOCOL", self.name.upper())
+        self.addWidthParam(name, "DATA_WIDTH", 32, packager)
+
+
+def _mkSyntheticBusMeta(busName: str, busMap: dict):
+    """
+    :return: picklable factory of IntfIpMeta for a synthetic bus
+        (the designs are sent to worker processes in batch packaging)
+    """
+    return partial(IP_SyntheticBus, busName, busMap)
+
+
+def _addBusHwIO(parent: SyntheticHwIO, depth: int, width: int,
+                portsPerLevel: int, direction: INTF_DIRECTION) -> Tuple[dict, int]:
+    """
+    Fill bus interface with children
+
+    :return: tuple (logical map for this subtree, number of leaf ports created)
+    """
+    rootMap = m = {}
+    cnt = 0
+    for lvl in range(depth):
+        for i in range(portsPerLevel):
+            n = f"d{i:d}"
+            d = INTF_DIRECTION.opposite(direction) if i % 3 == 2 else direction
+            c = SyntheticHwIO(n, parent, d, SyntheticType(1 if i % 2 else width))
+            parent._hwIOs.append(c)
+            m[n] = f"L{lvl:d}_{n.upper():s}"
+            cnt += 1
+
+        if lvl != depth - 1:
+            n = "sub"
+            parent = SyntheticHwIO(n, parent, direction)
+            parent._parent._hwIOs.append(parent)
+            m[n] = {}
+            m = m[n]
+
+    return rootMap, cnt
+
+
+def generateDesign(name: str="synthetic_top", nPorts: int=64, nParams: int=8,
+                   depth: int=2, nBusInterfaces: int=4) -> SyntheticHwModule:
+    """
+    Generate synthetic design
+
+    :param nPorts: approximate number of leaf ports of the design
+        (clock and reset are added on top of this)
+    :param nParams: number of generics of the design
+    :param depth: nesting depth of bus interfaces
+    :param nBusInterfaces: number of interfaces with IntfIpMeta
+    """
+    top = SyntheticHwModule(name)
+    top._fingerprint = repr((name, nPorts, nParams, depth, nBusInterfaces))
+    for i in range(nParams):
+        k = i % 3
+        if k == 0:
+            v = i * 8
+        elif k == 1:
+            v = bool(i % 2)
+        else:
+            v = f"str{i:d}"
+        top._params.append(SyntheticParam(f"PARAM_{i:d}", v))
+
+    clk = SyntheticHwIO("clk", dtype=SyntheticType(1), ipMeta=IP_SyntheticClk)
+    rst_n = SyntheticHwIO("rst_n", dtype=SyntheticType(1), ipMeta=IP_SyntheticRst_n)
+    rst_n._associatedClk = clk
+    top._hwIOs.extend([clk, rst_n])
+
+    portsPerBus = 0
+    if nBusInterfaces:
+        portsPerBus = max(nPorts // 2 // nBusInterfaces, depth)
+    portsPerLevel = max(portsPerBus // max(depth, 1), 1)
+    busMeta = {}
+    remaining = nPorts
+    for i in range(nBusInterfaces):
+        d = INTF_DIRECTION.MASTER if i % 2 else INTF_DIRECTION.SLAVE
+        bus = SyntheticHwIO(f"bus{i:d}", direction=d)
+        bus._associatedClk = clk
+        bus._associatedRst = rst_n
+        m, cnt = _addBusHwIO(bus, depth, 8 * (i % 4 + 1), portsPerLevel, d)
+        # interfaces of same shape share same IntfIpMeta class
+        k = (depth, portsPerLevel)
+        ipMeta = busMeta.get(k, None)
+        if ipMeta is None:
+            ipMeta = busMeta[k] = _mkSyntheticBusMeta(f"bus_{len(busMeta):d}", m)
+        bus._ipMeta = ipMeta
+        top._hwIOs.append(bus)
+        remaining -= cnt
+
+    for i in range(max(remaining, 0)):
+        d = INTF_DIRECTION.MASTER if i % 2 else INTF_DIRECTION.SLAVE
+        w = (1, 8, 32, 64)[i % 4]
+        top._hwIOs.append(SyntheticHwIO(f"p{i:d}", direction=d,
+                                        dtype=SyntheticType(w)))
+
+    return top
+
+
+class SyntheticPackager(IpCorePackager):
+    """
+    :class:`IpCorePackager` for :class:`SyntheticHwModule` designs
+    """
+
+    def toHdlConversion(self, top: SyntheticHwModule, topName: str, saveTo: str) -> List[str]:
+        fName = os.path.join(saveTo, topName + ".vhd")
+        with open(fName, "w") as f:
+            self._writeEntity(top, topName, f)
+        return [fName, ]
+
+    def _writeEntity(self, top: SyntheticHwModule, topName: str, f: TextIO):
+        f.write(f"ENTITY {topName:s} IS\n")
+        f.write("    GENERIC(\n")
+        f.write(";\n".join(f"        {p.name:s}: {self._paramTypeName(p):s}"
+                           for p in top._params))
+        f.write("\n    );\n    PORT(\n")
+        f.write(";\n".join(self._iterPortDecls(top)))
+        f.write("\n    );\n")
+        f.write("END ENTITY;\n")
+
+    def _iterPortDecls(self, top):
+        stack = list(reversed(top._hwIOs))
+        while stack:
+            i = stack.pop()
+            if i._hwIOs:
+                stack.extend(reversed(i._hwIOs))
+            else:
+                d = "IN" if i._direction == INTF_DIRECTION.SLAVE else "OUT"
+                yield f"        {i._sigInside._name:s}: {d:s} {self.serializeType(i._dtype):s}"
+
+    @staticmethod
+    def _paramTypeName(p: SyntheticParam):
+        if isinstance(p.value, bool):
+            return "BOOLEAN"
+        elif isinstance(p.value, int):
+            return "INTEGER"
+        else:
+            return "STRING"
+
+    def getDesignFingerprint(self, top: SyntheticHwModule) -> Optional[str]:
+        return top._fingerprint
+
+    def getTypeCacheKey(self, obj):
+        if isinstance(obj, (SyntheticType, int, str)):
+            return (obj.__class__, obj)
+        return identityCacheKey(obj)
+
+    def serializeType(self, hdlType: SyntheticType) -> str:
+        if isinstance(hdlType, str):
+            return hdlType
+        if hdlType.width == 1:
+            return "STD_LOGIC"
+        return f"STD_LOGIC_VECTOR({hdlType.width - 1:d} DOWNTO 0)"
+
+    def getParamPhysicalName(self, p: SyntheticParam):
+        return p.name
+
+    def getParamType(self, p: SyntheticParam):
+        return self._paramTypeName(p)
+
+    def paramToIpValue(self, idPrefix: str, p: SyntheticParam, resolve) -> Value:
+        val = Value()
+        val.id = idPrefix + p.name
+        if resolve is not VALUE_RESOLVE.NONE:
+            val.resolve = resolve
+        v = p.value
+        if isinstance(v, bool):
+            val.format = "bool"
+            val.text = str(v).lower()
+        elif isinstance(v, int):
+            val.format = "long"
+            val.text = str(v)
+        else:
+            val.format = "string"
+            val.text = v
+        return val
+
+    def iterParams(self, top: SyntheticHwModule):
+        return top._params
+
+    def iterInterfaces(self, top: SyntheticHwModule):
+        return top._hwIOs
+
+    def getInterfaceType(self, hwIO: SyntheticHwIO) -> SyntheticType:
+        return hwIO._dtype
+
+    def getInterfacePhysicalName(self, hwIO: SyntheticHwIO):
+        return hwIO._sigInside._name
+
+    def getInterfaceLogicalName(self, hwIO: SyntheticHwIO):
+        return hwIO._name
+
+    def getVectorFromType(self, dtype: SyntheticType) -> Union[bool, None, Tuple[int, int]]:
+        if dtype.width == 1:
+            return False
+        return [dtype.width - 1, 0]
+
+    def getInterfaceDirection(self, thisHwIO: SyntheticHwIO) -> INTF_DIRECTION:
+        return thisHwIO._direction
+
+    def getTypeWidth(self, dtype: SyntheticType, do_eval=False) -> Tuple[int, str, bool]:
+        return dtype.width, str(dtype.width), False
+
+    def getObjDebugName(self, obj) -> str:
+        return obj._getFullName()
+
+
+class StreamingSyntheticPackager(SyntheticPackager):
+    """
+    :class:`SyntheticPackager` which writes HDL files only through
+    :meth:`IpCorePackager.toHdlConversionStream`
+    """
+
+    def toHdlConversion(self, top: SyntheticHwModule, topName: str, saveTo: str) -> List[str]:
+        raise AssertionError("toHdlConversionStream should be used")
+
+    def toHdlConversionStream(self, top: SyntheticHwModule, topName: str,
+                              openText: Callable[[str], ContextManager[TextIO]]) -> List[str]:
+        fName = topName + ".vhd"
+        with openText(fName) as f:
+            self._writeEntity(top, topName, f)
+        return [fName, ]
+
+
+def mkSyntheticPackager(name: str="synthetic_top", **designKwargs) -> SyntheticPackager:
+    """
+    Factory of packager of synthetic design which can be referenced by name
+    (e.g. in the jobs of :class:`ipCorePackager.daemon.PackagingDaemon`)
+
+    :param designKwargs: arguments of :func:`~.generateDesign`
+    """
+    return SyntheticPackager(generateDesign(name=name, **designKwargs), name)
+
+
+_cachedPackagers: Dict[Tuple[str, int], SyntheticPackager] = {}
+
+
+def mkCachedSyntheticPackager(name: str="synthetic_top", nPorts: int=10) -> SyntheticPackager:
+    """
+    Factory which returns the same packager for the same arguments
+    (the packager is shared by the jobs which use it)
+    """
+    key = (name, nPorts)
+    p = _cachedPackagers.get(key, None)
+    if p is None:
+        p = _cachedPackagers[key] = mkSyntheticPackager(name, nPorts=nPorts)
+    return p
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import StringIO
+import os
+import sys
+import unittest
+
+from ipCorePackager.busInterface import BusInterface, BusInterfaceTemplate
+from ipCorePackager.component import Component
+from ipCorePackager.fileKinds import DEFAULT_FILE_KINDS, FILE_SET, FileKind
+from ipCorePackager.helpers import ns, prettify
+from ipCorePackager.hwIOTree import iterHwIOLeafs
+from ipCorePackager.model import DEFAULT_VIEW_TEMPLATES, ViewTemplate
+from tests.packagerTestCase import SyntheticPackagerTestCase
+from tests.syntheticDesign import generateDesign, IP_SyntheticClk, SyntheticPackager
+
+
+class SyntheticPackagerTC(SyntheticPackagerTestCase):
+
+    def test_createPackage(self):
+        p = self.mkPackager(nPorts=200, depth=3, nBusInterfaces=6)
+        p.createPackage(self.test_dir)
+        ipDir = os.path.join(self.test_dir, "synthetic_top")
+        for f in ["component.xml", "component_hw.tcl", "xgui/gui.tcl",
+                  "src/synthetic_top/synthetic_top.vhd"]:
+            self.assertTrue(os.path.isfile(os.path.join(ipDir, f)), f)
+
+    def test_write_ip_xact_same_as_prettify(self):
+        p = self.mkPackager(nPorts=100, depth=4, nBusInterfaces=3)
+        c = Component(p)
+        c._files = ["src/synthetic_top/synthetic_top.vhd", "xgui/gui.tcl"]
+        c.vendor = "hwt"
+        c.library = "mylib"
+        c.description = "synthetic_top"
+        c.asignTopHwModule(p.top, p.name)
+        buff = StringIO()
+        c.write_ip_xact(buff)
+        ref = prettify(c.ip_xact())
+
+        def strip(s):
+            # revision is derived from time, it may differ between the calls
+            return [line for line in s.split("\n") if "xilinx:core" not in line]
+
+        self.assertEqual(strip(buff.getvalue()), strip(ref))
+
+    def test_write_quartus_tcl_same_as_quartus_tcl(self):
+        p = self.mkPackager(nPorts=100, depth=3, nParams=6, nBusInterfaces=3)
+        c = Component(p)
+        c._files = ["src/synthetic_top/synthetic_top.vhd", "xgui/gui.tcl"]
+        c.asignTopHwModule(p.top, p.name)
+        buff = StringIO()
+        c.write_quartus_tcl(buff)
+        self.assertEqual(buff.getvalue(), c.quartus_tcl())
+
+    def test_custom_view_templates(self):
+
+        class VhdlOnlyPackager(SyntheticPackager):
+            viewTemplates = DEFAULT_VIEW_TEMPLATES[:1] + (
+                ViewTemplate("xilinx_vhdlsynthesis", "VHDL Synthesis",
+                             "vhdlSource:vivado.xilinx.com:synthesis",
+                             "any_syn_fileSetName"),
+            )
+
+        p = VhdlOnlyPackager(generateDesign(nPorts=10), "synthetic_top")
+        c = Component(p)
+        c.asignTopHwModule(p.top, p.name)
+        self.assertEqual([v.name for v in c.model.views],
+                         ["xilinx_anylanguagesynthesis", "xilinx_vhdlsynthesis"])
+        v = c.model.views[1]
+        self.assertEqual(v.modelName, "synthetic_top")
+        self.assertEqual(v.fileSetRef.localName, "xilinx_anylanguagesynthesis")
+
+    def test_file_kinds(self):
+
+        class UcfPackager(SyntheticPackager):
+            fileKinds = DEFAULT_FILE_KINDS.copy()
+            fileKinds.register(FileKind("ucf", [".ucf"], [FILE_SET.SYNTHESIS],
+                                        None, "ucf", None))
+
+        p = UcfPackager(generateDesign(nPorts=4), "synthetic_top")
+        c = Component(p)
+        c._files = ["src/a.VHD", "src/b.sv", "src/c.xdc", "src/d.ucf",
+                    "xgui/gui.tcl"]
+        c.asignTopHwModule(p.top, p.name)
+        fileSets = c._xmlFileSets()
+        names = [[f.find("spirit:name", ns).text for f in fs.findall("spirit:file", ns)]
+                 for fs in fileSets]
+        self.assertEqual(names, [
+            ["src/a.VHD", "src/b.sv", "src/c.xdc", "src/d.ucf"],
+            ["src/a.VHD", "src/b.sv", "src/c.xdc"],
+            ["xgui/gui.tcl"],
+        ])
+        tcl = c.quartus_tcl()
+        self.assertIn("add_fileset_file a.VHD VHDL PATH src/a.VHD", tcl)
+        self.assertIn("add_fileset_file b.sv VERILOG PATH src/b.sv", tcl)
+        self.assertNotIn("d.ucf", tcl)
+        # the default registry is not modified
+        self.assertIsNone(DEFAULT_FILE_KINDS.classify("d.ucf"))
+
+    def test_deep_hwIO_tree(self):
+        depth = sys.getrecursionlimit() + 100
+        p = self.mkPackager(nPorts=depth, depth=depth, nBusInterfaces=1)
+        c = Component(p)
+        c.asignTopHwModule(p.top, p.name)
+        bus = [i for i in c.busInterfaces if i._name == "bus0"][0]
+        # clk, rst_n + one port per level of the bus
+        self.assertEqual(len(c.model.ports), depth + 2)
+        self.assertEqual(len(c.getBusInterface(bus)._portMaps), depth)
+        tcl = c.quartus_tcl()
+        self.assertEqual(tcl.count("add_interface_port bus0 "), depth)
+
+    def test_busInterface_template_shared(self):
+        p = self.mkPackager(nPorts=200, depth=3, nBusInterfaces=6)
+        c = Component(p)
+        c.asignTopHwModule(p.top, p.name)
+        byClass = {}
+        for i in c.busInterfaces:
+            if i._ipMeta is not None:
+                byClass.setdefault(i._ipMeta, []).append(c.getBusInterface(i))
+
+        bis = max(byClass.values(), key=len)
+        self.assertGreater(len(bis), 1)
+        bi0, bi1 = bis[:2]
+        self.assertIs(bi0.abstractionType, bi1.abstractionType)
+        self.assertEqual(bi0.abstractionType.name, bi0.busType.name + "_rtl")
+        # parameters added by postProcess are per interface
+        self.assertIsNot(bi0.busType, bi1.busType)
+        self.assertIsNot(bi0.parameters, bi1.parameters)
+        self.assertNotEqual(bi0.parameters[0].value.id, bi1.parameters[0].value.id)
+        for i in c.busInterfaces:
+            if i._ipMeta is None:
+                continue
+            bi = c.getBusInterface(i)
+            self.assertEqual(bi._portMaps,
+                             BusInterface.generatePortMap(bi.busType, i, p))
+            ref = {leaf.logicalName: leaf.physicalName
+                   for leaf in iterHwIOLeafs(i, p, bi.busType.map, onlyExtern=True)}
+            self.assertEqual(bi._portMaps, ref)
+
+    def test_busInterface_template_portMap_unresolved(self):
+        calls = []
+
+        class CountingPackager(SyntheticPackager):
+
+            def getInterfacePhysicalName(self, hwIO):
+                calls.append(hwIO)
+                return super(CountingPackager, self).getInterfacePhysicalName(hwIO)
+
+            def getInterfaceDirection(self, hwIO):
+                calls.append(hwIO)
+                return super(CountingPackager, self).getInterfaceDirection(hwIO)
+
+        p = CountingPackager(generateDesign(nPorts=50, depth=3, nBusInterfaces=2),
+                             "synthetic_top")
+        for intf in p.iterInterfaces(p.top):
+            biClass = intf._ipMeta
+            if biClass is None:
+                continue
+            leafs = list(iterHwIOLeafs(intf, p, biClass().map, onlyExtern=True,
+                                       resolvePorts=False))
+            self.assertTrue(leafs)
+            for leaf in leafs:
+                self.assertIsNone(leaf.physicalName)
+                self.assertIsNone(leaf.direction)
+            self.assertEqual(BusInterfaceTemplate.forBiClass(biClass).portMap(intf, p),
+                             {leaf.logicalName: leaf.hwIO._getHdlName() for leaf in leafs})
+        self.assertEqual(calls, [])
+
+    def test_name_of_composite_interface(self):
+        p = self.mkPackager(nPorts=20, nBusInterfaces=1)
+        bus = next(i for i in p.iterInterfaces(p.top)
+                   if i._ipMeta is not None and i._hwIOs)
+        # the port map needs a name for each child
+        with self.assertRaisesRegex(Exception, "has children"):
+            list(iterHwIOLeafs(bus, p, "CLK", onlyExtern=True))
+        with self.assertRaisesRegex(Exception, "has children"):
+            BusInterface.generatePortMap(IP_SyntheticClk(), bus, p)
+        with self.assertRaisesRegex(Exception, "has children"):
+            BusInterfaceTemplate.forBiClass(IP_SyntheticClk).portMap(bus, p)
+        # Quartus maps the whole interface to a single port
+        leaf, = iterHwIOLeafs(bus, p, "CLK", compositeLeafs=True)
+        self.assertIs(leaf.hwIO, bus)
+        self.assertEqual(leaf.logicalName, "CLK")
+
+    def mkDescribedComponent(self, p, withModel=True):
+        c = Component(p)
+        c._files = ["src/synthetic_top/synthetic_top.vhd", "xgui/gui.tcl"]
+        c.setTimestamp(0)
+        c.asignTopHwModule(p.top, p.name, withModel=withModel)
+        return c
+
+    @staticmethod
+    def componentOutputs(c):
+        xml = StringIO()
+        c.write_ip_xact(xml)
+        return xml.getvalue(), c.quartus_tcl()
+
+    def test_postProcess_sees_model(self):
+        seen = []
+
+        class RecordingClk(IP_SyntheticClk):
+
+            def postProcess(self, component, packager, thisIf):
+                seen.append((len(component.model.ports), len(component.model.views)))
+                super(RecordingClk, self).postProcess(component, packager, thisIf)
+
+        p = self.mkPackager(nPorts=20, nBusInterfaces=1)
+        clk, = [i for i in p.top._hwIOs if i._name == "clk"]
+        clk._ipMeta = RecordingClk
+        c = self.mkDescribedComponent(p)
+        # ports and views are registered before postProcess as in IP-XACT output
+        self.assertEqual(seen, [(len(c.model.ports), len(c.model.views))])
+        self.assertGreater(seen[0][0], 0)
+
+        seen.clear()
+        c = self.mkDescribedComponent(p, withModel=False)
+        self.assertEqual(seen, [(0, 0)])
+        self.assertTrue(all(not bi._portMaps for bi in c._bis.values()))
+
+    def test_asignTopHwModule_retry(self):
+
+        class FailingPackager(SyntheticPackager):
+            """
+            Raises once in the failHook after failAfter calls of it
+            """
+            failHook = None
+            failAfter = 0
+
+            def _maybeFail(self, name):
+                if name == self.failHook:
+                    if self.failAfter == 0:
+                        self.failHook = None
+                        raise RuntimeError("injected failure", name)
+                    self.failAfter -= 1
+
+            def getInterfaceType(self, hwIO):
+                self._maybeFail("getInterfaceType")
+                return super(FailingPackager, self).getInterfaceType(hwIO)
+
+            def getInterfaceLogicalName(self, hwIO):
+                self._maybeFail("getInterfaceLogicalName")
+                return super(FailingPackager, self).getInterfaceLogicalName(hwIO)
+
+        def mkPackager():
+            return FailingPackager(generateDesign(nPorts=60, depth=2, nBusInterfaces=3),
+                                   "synthetic_top")
+
+        ref = self.componentOutputs(self.mkDescribedComponent(mkPackager()))
+        # failures at different points of the description
+        for failHook, failAfter in [("getInterfaceType", 20),
+                                    ("getInterfaceLogicalName", 2),
+                                    ("getInterfaceLogicalName", 50),
+                                    ("getInterfaceLogicalName", 75)]:
+            p = mkPackager()
+            c = Component(p)
+            c._files = ["src/synthetic_top/synthetic_top.vhd", "xgui/gui.tcl"]
+            c.setTimestamp(0)
+            p.failHook = failHook
+            p.failAfter = failAfter
+            with self.assertRaises(RuntimeError):
+                c.asignTopHwModule(p.top, p.name)
+            self.assertIsNone(p.failHook, "the failure was injected")
+            # nothing was applied
+            self.assertEqual(len(c.model.ports), 0)
+            self.assertEqual(c.model.views, [])
+            self.assertEqual(c.busInterfaces, [])
+            self.assertEqual(c.parameters, [])
+            self.assertEqual(c._bis, {})
+
+            c.asignTopHwModule(p.top, p.name)
+            self.assertEqual(self.componentOutputs(c), ref, (failHook, failAfter))
+
+    def test_params_queried_once(self):
+        calls = []
+
+        class CountingPackager(SyntheticPackager):
+
+            def getParamPhysicalName(self, p):
+                calls.append(p)
+                return super(CountingPackager, self).getParamPhysicalName(p)
+
+        nParams = 10
+        top = generateDesign(nParams=nParams)
+        p = CountingPackager(top, "synthetic_top")
+        p.createPackage(self.test_dir)
+        self.assertEqual(len(calls), nParams)
+
+    def test_reproducible(self):
+        outputs = []
+        for i in range(2):
+            repo = os.path.join(self.test_dir, f"repo{i:d}")
+            p = self.mkPackager(nPorts=100, nBusInterfaces=3)
+            p.createPackage(repo, reproducible=True)
+            ipDir = os.path.join(repo, "synthetic_top")
+            files = {}
+            for f in ["component.xml", "component_hw.tcl", "xgui/gui.tcl"]:
+                with open(os.path.join(ipDir, f), "rb") as fp:
+                    files[f] = fp.read()
+            outputs.append(files)
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn(b"<xilinx:coreRevision>0</xilinx:coreRevision>",
+                      outputs[0]["component.xml"])
+        self.assertIn(b"1970-01-01T00:00:00Z", outputs[0]["component.xml"])
+
+    def test_timestamp(self):
+        p = self.mkPackager(nPorts=10)
+        p.createPackage(self.test_dir, timestamp=1700000000)
+        with open(os.path.join(self.test_dir, "synthetic_top", "component.xml")) as f:
+            xml = f.read()
+        self.assertIn("<xilinx:coreRevision>1700000000</xilinx:coreRevision>", xml)
+        self.assertIn("2023-11-14T22:13:20Z", xml)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import unittest
+
+from tests.packagerTestCase import SyntheticPackagerTestCase
+from tests.syntheticDesign import generateDesign, SyntheticPackager, SyntheticType
+
+
+class CountingPackager(SyntheticPackager):
+
+    def __init__(self, *args, **kwargs):
+        super(CountingPackager, self).__init__(*args, **kwargs)
+        self.serialized = []
+
+    def serializeType(self, hdlType):
+        self.serialized.append(hdlType)
+        return super(CountingPackager, self).serializeType(hdlType)
+
+
+class TypeQueryCacheTC(SyntheticPackagerTestCase):
+
+    def mkCountingPackager(self, typeCacheSize):
+        return CountingPackager(generateDesign(nPorts=4), "synthetic_top",
+                                typeCacheSize=typeCacheSize)
+
+    def test_hits_misses(self):
+        p = self.mkCountingPackager(16)
+        c = p.typeCache
+        t8 = SyntheticType(8)
+        self.assertEqual(c.serializeType(t8), "STD_LOGIC_VECTOR(7 DOWNTO 0)")
+        self.assertEqual(c.serializeType(t8), "STD_LOGIC_VECTOR(7 DOWNTO 0)")
+        # equal types share the item (SyntheticPackager.getTypeCacheKey)
+        self.assertEqual(c.serializeType(SyntheticType(8)), "STD_LOGIC_VECTOR(7 DOWNTO 0)")
+        self.assertEqual(c.serializeType(SyntheticType(1)), "STD_LOGIC")
+        self.assertEqual(len(p.serialized), 2)
+        # arguments are part of the key
+        self.assertEqual(c.getTypeWidth(t8), c.getTypeWidth(t8, do_eval=True))
+
+        st = c.stats()
+        self.assertEqual(st["serializeType"],
+                         {"hits": 2, "misses": 2, "evictions": 0, "size": 2})
+        self.assertEqual(st["getTypeWidth"]["misses"], 2)
+        c.resetStats()
+        self.assertEqual(c.stats()["serializeType"],
+                         {"hits": 0, "misses": 0, "evictions": 0, "size": 2})
+        c.clear()
+        self.assertEqual(c.stats()["serializeType"]["size"], 0)
+
+    def test_eviction(self):
+        p = self.mkCountingPackager(2)
+        c = p.typeCache
+        t = [SyntheticType(w) for w in (2, 3, 4)]
+        c.serializeType(t[0])
+        c.serializeType(t[1])
+        # t[0] becomes the most recently used, t[1] is evicted
+        c.serializeType(t[0])
+        c.serializeType(t[2])
+        self.assertEqual(c.stats()["serializeType"]["evictions"], 1)
+        self.assertEqual(c.stats()["serializeType"]["size"], 2)
+        del p.serialized[:]
+        c.serializeType(t[0])
+        c.serializeType(t[2])
+        self.assertEqual(p.serialized, [])
+        c.serializeType(t[1])
+        self.assertEqual(p.serialized, [t[1]])
+
+    def test_disabled_and_unbounded(self):
+        p = self.mkCountingPackager(0)
+        t8 = SyntheticType(8)
+        for _ in range(3):
+            p.typeCache.serializeType(t8)
+        self.assertEqual(len(p.serialized), 3)
+        self.assertEqual(p.typeCache.stats()["serializeType"],
+                         {"hits": 0, "misses": 3, "evictions": 0, "size": 0})
+
+        p = self.mkCountingPackager(None)
+        types = [SyntheticType(w) for w in range(1, 3000)]
+        for _ in range(2):
+            for t in types:
+                p.typeCache.serializeType(t)
+        self.assertEqual(len(p.serialized), len(types))
+        self.assertEqual(p.typeCache.stats()["serializeType"]["evictions"], 0)
+
+    def test_cached_same_as_uncached(self):
+        outputs = []
+        for typeCacheSize in (0, 4, None):
+            repo = os.path.join(self.test_dir, f"repo{typeCacheSize}")
+            p = SyntheticPackager(generateDesign(nPorts=200, nBusInterfaces=4),
+                                  "synthetic_top", typeCacheSize=typeCacheSize)
+            p.createPackage(repo, reproducible=True)
+            outputs.append(self.readPackage(os.path.join(repo, "synthetic_top")))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+    def test_pickle(self):
+        p = self.mkCountingPackager(8)
+        p.typeCache.serializeType(SyntheticType(8))
+        p2 = pickle.loads(pickle.dumps(p))
+        # cached items are not transferred
+        self.assertEqual(p2.typeCache.stats()["serializeType"]["size"], 0)
+        self.assertEqual(p2.typeCache.maxsize, 8)
+        self.assertIs(p2.typeCache._packager, p2)
+
+
+if __name__ == '__main__':
+    unittest.main()
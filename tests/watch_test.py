@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import sys
+import tempfile
+from threading import Thread
+import unittest
+
+from ipCorePackager.packageDir import MANIFEST_FILE_NAME, PackageManifest
+from ipCorePackager.watch import PackageWatcher
+from tests.syntheticDesign import generateDesign, SyntheticPackager
+
+
+class CountingPackager(SyntheticPackager):
+
+    def __init__(self, *args, **kwargs):
+        super(CountingPackager, self).__init__(*args, **kwargs)
+        self.calls = {"toHdlConversion": 0, "writeAutoGui": 0}
+
+    def toHdlConversion(self, top, topName, saveTo):
+        self.calls["toHdlConversion"] += 1
+        return super(CountingPackager, self).toHdlConversion(top, topName, saveTo)
+
+    def writeAutoGui(self, out, paramTable=None):
+        self.calls["writeAutoGui"] += 1
+        return super(CountingPackager, self).writeAutoGui(out, paramTable)
+
+
+class PackageWatcherTC(unittest.TestCase):
+    useInotify = False
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.srcDir = os.path.join(self.test_dir, "hdl")
+        os.makedirs(self.srcDir)
+        self.extra = [self.writeSrc("a.vhd", "-- a\n"), self.writeSrc("c.xdc", "# c\n")]
+        self.repo = os.path.join(self.test_dir, "repo")
+        self.top = generateDesign(nPorts=20, nBusInterfaces=2)
+        self.p = CountingPackager(self.top, "synthetic_top", self.extra)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def writeSrc(self, name: str, content: str):
+        f = os.path.join(self.srcDir, name)
+        with open(f, "w") as fp:
+            fp.write(content)
+        return f
+
+    def mkWatcher(self):
+        return PackageWatcher(self.p, self.repo, reproducible=True,
+                              debounce=0.05, pollInterval=0.01,
+                              useInotify=self.useInotify)
+
+    def readPackage(self, ipDir):
+        res = {}
+        for root, _, files in os.walk(ipDir):
+            for f in files:
+                fn = os.path.join(root, f)
+                with open(fn, "rb") as fp:
+                    res[os.path.relpath(fn, ipDir)] = fp.read()
+        return res
+
+    def assertSameAsFullPackaging(self, extra):
+        refRepo = os.path.join(self.test_dir, "ref")
+        SyntheticPackager(self.top, "synthetic_top", extra).createPackage(
+            refRepo, reproducible=True)
+        pkg = self.readPackage(os.path.join(self.repo, "synthetic_top"))
+        pkg.pop(MANIFEST_FILE_NAME, None)
+        self.assertEqual(pkg, self.readPackage(os.path.join(refRepo, "synthetic_top")))
+        shutil.rmtree(refRepo)
+
+    def test_refresh(self):
+        with self.mkWatcher() as w:
+            self.assertEqual(self.p.calls, {"toHdlConversion": 1, "writeAutoGui": 1})
+            xdc = self.extra[1]
+            self.writeSrc("c.xdc", "# c modified\n")
+            self.assertEqual(w.pollOnce(10), [xdc])
+            self.assertSameAsFullPackaging(self.extra)
+
+            os.remove(xdc)
+            self.assertEqual(w.pollOnce(10), [xdc])
+            self.assertSameAsFullPackaging(self.extra[:1])
+            with open(os.path.join(self.repo, "synthetic_top", "component.xml")) as f:
+                self.assertNotIn("c.xdc", f.read())
+
+            self.writeSrc("c.xdc", "# c again\n")
+            self.assertEqual(w.pollOnce(10), [xdc])
+            self.assertSameAsFullPackaging(self.extra)
+            self.assertEqual(w.refreshCount, 3)
+            # only the extra files were refreshed
+            self.assertEqual(self.p.calls, {"toHdlConversion": 1, "writeAutoGui": 1})
+
+            # touch does not cause refresh
+            st = os.stat(xdc)
+            os.utime(xdc, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+            self.assertEqual(w.pollOnce(10), [])
+            self.assertEqual(w.pollOnce(0.05), [])
+
+    def test_refresh_incremental(self):
+        w = PackageWatcher(self.p, self.repo, reproducible=True, incremental=True,
+                           debounce=0.05, pollInterval=0.01, useInotify=self.useInotify)
+        with w:
+            self.writeSrc("c.xdc", "# c modified\n")
+            self.assertEqual(w.pollOnce(10), [self.extra[1]])
+            ipDir = os.path.join(self.repo, "synthetic_top")
+            pkg = self.readPackage(ipDir)
+            # the manifest describes the refreshed package
+            run = self.p.createPackage(self.repo, reproducible=True, incremental=True)
+            self.assertTrue(run.upToDate)
+            self.assertEqual(self.p.calls, {"toHdlConversion": 1, "writeAutoGui": 1})
+            self.assertEqual(self.readPackage(ipDir), pkg)
+            self.assertSameAsFullPackaging(self.extra)
+
+            # removed extra file is removed from the manifest
+            os.remove(self.extra[1])
+            self.assertEqual(w.pollOnce(10), [self.extra[1]])
+        m = PackageManifest.load(os.path.join(ipDir, MANIFEST_FILE_NAME))
+        xdc = os.path.join("src", "synthetic_top", "c.xdc")
+        self.assertNotIn(xdc, m.outputs)
+        self.assertNotIn(xdc, m.hdlFiles)
+        self.assertIsNone(m.inputsDigest)
+
+    def test_build_new_files(self):
+        with self.mkWatcher() as w:
+            b = self.writeSrc("b.vhd", "-- b\n")
+            self.p.hdlFiles.append(b)
+            w.build()
+            self.writeSrc("b.vhd", "-- b modified\n")
+            self.assertEqual(w.pollOnce(10), [b])
+            self.assertSameAsFullPackaging(self.extra + [b])
+
+    def test_watch_debounce(self):
+        refreshed = []
+        with self.mkWatcher() as w:
+            w.debounce = 0.5
+            t = Thread(target=w.watch, args=(refreshed.append,))
+            t.start()
+            try:
+                for i in range(5):
+                    self.writeSrc("a.vhd", f"-- a {i:d}\n")
+                    self.writeSrc("c.xdc", f"# c {i:d}\n")
+                for _ in range(200):
+                    if refreshed:
+                        break
+                    t.join(0.05)
+            finally:
+                w.stop()
+                t.join()
+        self.assertEqual(refreshed, [sorted(self.extra)])
+        self.assertSameAsFullPackaging(self.extra)
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "requires inotify")
+class PackageWatcherInotifyTC(PackageWatcherTC):
+    useInotify = True
+
+
+if __name__ == "__main__":
+    unittest.main()
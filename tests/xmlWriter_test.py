@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import StringIO
+import unittest
+import xml.dom.minidom
+
+from ipCorePackager.helpers import mkSpiElm, appendSpiElem, appendXiElem, \
+    prettify, ns, spi_ns_prefix, mkXmlWriter
+import xml.etree.ElementTree as etree
+
+
+def minidom_prettify(elm):
+    for prefix, uri in ns.items():
+        etree.register_namespace(prefix, uri)
+    return xml.dom.minidom.parseString(etree.tostring(elm)).toprettyxml()
+
+
+class PrettyXmlWriterTC(unittest.TestCase):
+
+    def _mkTree(self):
+        c = mkSpiElm("component")
+        appendSpiElem(c, "name").text = 'a<b>&"c\'\r\nd'
+        appendSpiElem(c, "description").text = ""
+        appendSpiElem(c, "empty")
+        v = appendSpiElem(c, "value")
+        v.attrib[spi_ns_prefix + "id"] = 'x\n"y"\t<&>'
+        v.attrib["spirit:format"] = "long"
+        v.text = "  10 "
+        ve = appendSpiElem(c, "vendorExtensions")
+        f = appendXiElem(ve, "family")
+        f.text = "zynq"
+        f.attrib["xilinx:lifeCycle"] = "Production"
+        return c
+
+    def test_prettify_same_as_minidom(self):
+        c = self._mkTree()
+        self.assertEqual(prettify(c), minidom_prettify(c))
+
+    def test_streaming_same_as_minidom(self):
+        c = self._mkTree()
+        buff = StringIO()
+        w = mkXmlWriter(buff)
+        w.declaration()
+        w.start(c.tag, nsDecl=("spirit", "xilinx"))
+        for ch in c:
+            w.element(ch)
+        w.end()
+        self.assertEqual(buff.getvalue(), minidom_prettify(c))
+
+    def test_unknown_namespace(self):
+        e = etree.Element("{http://example.com}x")
+        with self.assertRaises(ValueError):
+            prettify(e)
+
+
+if __name__ == '__main__':
+    unittest.main()